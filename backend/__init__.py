@@ -12,7 +12,11 @@ from .routes import (
     debug, admin, auth, user, browse, taskboard, notifications, tags
 )
 from .util import db_status
+from .models import jobs
+from .models.token import start_sweeper
 from .util.http_errors import HTTPException
+from .util.json_provider import FastJSONProvider
+from .util.compression import compress_response
 from .util.error_handler import (
     http_error_handler,
     general_error_handler,
@@ -22,6 +26,10 @@ from .util.error_handler import (
 app = Flask(__name__)
 CORS(app)
 
+# Encode responses quickly, and compress them if they're large
+app.json = FastJSONProvider(app)
+app.after_request(compress_response)
+
 # Register error handlers
 app.register_error_handler(HTTPException, http_error_handler)
 app.register_error_handler(Exception, general_error_handler)
@@ -30,6 +38,11 @@ app.register_error_handler(WzException, werkzeug_error_handler)
 # Initialise the database
 db_status.init()
 
+# Run any background jobs left over from before the server was stopped, and
+# start deleting expired tokens, once it starts handling requests
+app.before_request(jobs.start)
+app.before_request(start_sweeper)
+
 # Register blueprint routes
 app.register_blueprint(debug, url_prefix="/debug")
 app.register_blueprint(admin, url_prefix='/admin')
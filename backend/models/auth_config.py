@@ -3,14 +3,68 @@
 
 Configuration of authentication options
 """
-from typing import cast
+import os
+from typing import Optional, cast
 from .tables import TAuthConfig
 from backend.util.db_queries import id_exists, get_by_id
 from backend.util.auth_check import do_auth_check
+from backend.util.cache import LruCache
+from backend.util.circuit_breaker import CircuitBreaker
 from backend.util import http_errors
 from backend.types.admin import RequestType
 
 
+BREAKER_FAILURES = 5
+"""
+Number of failed requests to the auth server in a row after which logins are
+rejected without contacting it
+"""
+
+BREAKER_RESET_TIMEOUT = 30.0
+"""
+Number of seconds to wait after the auth server fails before trying it again
+"""
+
+LOGIN_CACHE_SIZE = 1024
+"""Maximum number of successful logins to remember"""
+
+LOGIN_CACHE_ENV = "ENSEMBLE_AUTH_CACHE_SECONDS"
+"""
+Environment variable giving the number of seconds to remember successful
+logins for, so that logging in again soon after doesn't require a request to
+the auth server. Defaults to 0, which disables remembering logins.
+"""
+
+
+def login_cache_ttl() -> float:
+    """
+    Returns the number of seconds to remember successful logins for, which
+    can be configured using the `ENSEMBLE_AUTH_CACHE_SECONDS` environment
+    variable
+
+    ### Raises:
+    * `ValueError`: the configured number of seconds is invalid
+
+    ### Returns:
+    * `float`: number of seconds, or 0 if logins aren't remembered
+    """
+    seconds = float(os.getenv(LOGIN_CACHE_ENV, 0))
+    if seconds < 0:
+        raise ValueError("Login cache duration can't be negative")
+    return seconds
+
+
+# Tracks whether the auth server is working, so that logins fail quickly
+# while it isn't
+_breaker = CircuitBreaker(BREAKER_FAILURES, BREAKER_RESET_TIMEOUT)
+
+_logins: Optional[LruCache[str, bool]] = (
+    LruCache(LOGIN_CACHE_SIZE, login_cache_ttl())
+    if login_cache_ttl() > 0
+    else None
+)
+
+
 class AuthConfig:
     """
     Represents the auth configuration of the server
@@ -99,6 +153,8 @@ class AuthConfig:
 
         ### Raises:
         * `Forbidden`: if authentication failed
+
+        * `ServiceUnavailable`: if the auth server isn't responding
         """
         if not do_auth_check(
             self.address,
@@ -108,9 +164,21 @@ class AuthConfig:
             self.success_regex,
             username,
             password,
+            breaker=_breaker,
+            cache=_logins,
         ):
             raise http_errors.Forbidden("Incorrect username or password")
 
+    @classmethod
+    def clear_cache(cls) -> None:
+        """
+        Forget all remembered logins, as well as any failures of the auth
+        server. This must be called when the database is cleared.
+        """
+        _breaker.reset()
+        if _logins is not None:
+            _logins.clear()
+
     @property
     def address(self) -> str:
         """
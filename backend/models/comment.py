@@ -2,14 +2,16 @@
 # Backend / Models / Comment
 """
 from backend.types.comment import ICommentFullInfo
-from .tables import TReply, TComment, TCommentReacts
+from .tables import TReply, TComment, TCommentReacts, TPost
 from .user import User
 from .reply import Reply
 from backend.models.permissions import Permission
 from backend.models.post_queue import Queue
-from backend.util.db_queries import assert_id_exists, get_by_id
+from .search_index import SearchIndex
+from .reactions import COMMENT_COUNTER, toggle_reaction
+from backend.util.db_queries import get_by_id
 from backend.util.validators import assert_valid_str_field
-from backend.types.identifiers import CommentId
+from backend.types.identifiers import CommentId, ReplyId, UserId
 from backend.util import http_errors
 from typing import cast, TYPE_CHECKING
 from datetime import datetime
@@ -32,8 +34,32 @@ class Comment:
         ### Raises:
         * `IdNotFound`: comment does not exist
         """
-        assert_id_exists(TComment, id, "Comment")
         self.__id = id
+        self.__row = get_by_id(TComment, id, "Comment")
+
+    @classmethod
+    def from_row(cls, row: TComment) -> "Comment":
+        """
+        Create a comment object from a row that has already been loaded from
+        the database, without performing any additional queries
+
+        ### Args:
+        * `row` (`TComment`): row in the comments table
+
+        ### Returns:
+        * `Comment`: the comment object
+        """
+        comment = cls.__new__(cls)
+        comment.__id = CommentId(row.id)
+        comment.__row = row
+        return comment
+
+    def refresh(self) -> None:
+        """
+        Reload the comment's info from the database, discarding the existing
+        snapshot
+        """
+        self.__row = get_by_id(TComment, self.__id, "Comment")
 
     @classmethod
     def create(
@@ -71,6 +97,7 @@ class Comment:
             .run_sync()[0]
         )
         id = cast(CommentId, val["id"])
+        SearchIndex.update_post(post.id)
         return Comment(id)
 
     @property
@@ -82,8 +109,8 @@ class Comment:
         * `list[Reply]`: list of replies
         """
         return [
-            Reply(r["id"])
-            for r in TReply.select()
+            Reply.from_row(r)
+            for r in TReply.objects()
             .where(TReply.parent == self.__id)
             .order_by(TReply.id)
             .run_sync()
@@ -100,7 +127,8 @@ class Comment:
     def deleted(self, new_status: bool):
         row = self._get()
         row.deleted = new_status
-        row.save().run_sync()
+        row.save([TComment.deleted]).run_sync()
+        SearchIndex.update_post(row.parent)
 
     def delete(self):
         """
@@ -111,9 +139,9 @@ class Comment:
 
     def _get(self) -> TComment:
         """
-        Return a reference to the underlying database row
+        Return a reference to the snapshot of the underlying database row
         """
-        return get_by_id(TComment, self.__id)
+        return self.__row
 
     @property
     def id(self) -> CommentId:
@@ -134,7 +162,8 @@ class Comment:
         assert_valid_str_field(new_text, "comment")
         row = self._get()
         row.text = new_text
-        row.save().run_sync()
+        row.save([TComment.text]).run_sync()
+        SearchIndex.update_post(row.parent)
 
     @property
     def author(self) -> "User":
@@ -165,11 +194,7 @@ class Comment:
         ### Returns:
         * int: number of 'thanks' reacts
         """
-        return cast(
-            int,
-            TCommentReacts.count()
-            .where(TCommentReacts.comment == self.id).run_sync()
-        )
+        return self._get().thanks
 
     def __eq__(self, __o: object) -> bool:
         if isinstance(__o, Comment):
@@ -182,7 +207,13 @@ class Comment:
         """
         Returns whether the comment has been marked as accepted
         """
-        return self.parent.answered == self
+        return cast(
+            bool,
+            TPost.exists().where(
+                TPost.id == self._get().parent,
+                TPost.answered == self.id,
+            ).run_sync()
+        )
 
     def accepted_toggle(self, user: User):
         """
@@ -213,26 +244,20 @@ class Comment:
                    TCommentReacts.user == user.id).run_sync()
         )
 
-    def react(self, user: User):
+    def react(self, user: User) -> bool:
         """
         React to the comment if the user has not reacted to the comment
         Unreact to the comment if the user has reacted to the comment
 
         ### Args:
         * `user` (`User`): User reacting/un-reacting to the comment
+
+        ### Returns:
+        * `bool`: whether the user has now reacted to the comment
         """
-        if not self.has_reacted(user):
-            TCommentReacts(
-                {
-                    TCommentReacts.user: user.id,
-                    TCommentReacts.comment: self.id,
-                }
-            ).save().run_sync()
-        else:
-            TCommentReacts.delete()\
-                .where(TCommentReacts.user == user.id,
-                       TCommentReacts.comment == self.id)\
-                .run_sync()
+        reacted, count = toggle_reaction(COMMENT_COUNTER, self.id, user.id)
+        self._get().thanks = count
+        return reacted
 
     @property
     def timestamp(self) -> datetime:
@@ -251,14 +276,66 @@ class Comment:
         ### Returns:
         * ICommentFullInfo: Dictionary containing full info a comment
         """
-        return {
-            "comment_id": self.id,
-            "author": self.author.id,
-            "thanks": self.thanks,
-            "text": self.text,
-            "replies": [r.id for r in self.replies],
-            "timestamp": int(self.timestamp.timestamp()),
-            "user_reacted": self.has_reacted(user),
-            "accepted": self.accepted,
-            "deleted": self.deleted,
+        return Comment.full_info_list([self], user)[0]
+
+    @classmethod
+    def full_info_list(
+        cls,
+        comments: list["Comment"],
+        user: User,
+    ) -> list[ICommentFullInfo]:
+        """
+        Returns the full info of many comments at once.
+
+        The replies, reactions and accepted answers of all the comments are
+        each loaded using a single query, rather than one query per comment.
+
+        ### Args:
+        * `comments` (`list[Comment]`): comments to get the info of
+
+        * `user` (`User`): user viewing the comments
+
+        ### Returns:
+        * `list[ICommentFullInfo]`: full info of each comment, in the same
+          order as the given comments
+        """
+        if len(comments) == 0:
+            return []
+        ids = [c.id for c in comments]
+
+        replies: dict[int, list[ReplyId]] = {i: [] for i in ids}
+        for r in TReply.select(TReply.id, TReply.parent).where(
+            TReply.parent.is_in(ids)
+        ).order_by(TReply.id).run_sync():
+            replies[r["parent"]].append(ReplyId(r["id"]))
+
+        reacted = {
+            r["comment"]
+            for r in TCommentReacts.select(TCommentReacts.comment).where(
+                TCommentReacts.user == user.id,
+                TCommentReacts.comment.is_in(ids),
+            ).run_sync()
+        }
+
+        answers = {
+            r["answered"]
+            for r in TPost.select(TPost.answered).where(
+                TPost.id.is_in(list({c._get().parent for c in comments}))
+            ).run_sync()
         }
+
+        def info(comment: Comment) -> ICommentFullInfo:
+            row = comment._get()
+            return {
+                "comment_id": comment.id,
+                "author": UserId(row.author),
+                "thanks": row.thanks,
+                "text": row.text,
+                "replies": replies[comment.id],
+                "timestamp": int(row.timestamp.timestamp()),
+                "user_reacted": comment.id in reacted,
+                "accepted": comment.id in answers,
+                "deleted": row.deleted,
+            }
+
+        return [info(c) for c in comments]
@@ -0,0 +1,291 @@
+"""
+# Backend / Models / Jobs
+
+A queue of jobs which are run by a pool of worker threads, so that slow work
+(such as sending a notification to every user following a queue) doesn't
+hold up the request that caused it.
+
+Jobs are stored in the database, so they aren't lost if the server stops
+before they are run. Each job names a handler, registered using `handler`,
+and gives it a JSON payload. Handlers should only be given IDs rather than
+objects, and should cope with the things they refer to having been deleted
+in the meantime.
+
+If a job fails because the database is busy, it is retried after a delay.
+Any other error stops the job, leaving it in the table marked as failed so
+that it can be investigated.
+"""
+import json
+import logging
+import time
+import sqlite3
+import traceback
+from threading import Condition, Lock, Thread
+from typing import Any, Callable, Optional, cast
+from .tables import TJob
+from backend.util.db_engine import PooledSQLiteEngine
+
+
+WORKER_COUNT = 2
+"""Number of worker threads to run jobs with"""
+
+MAX_ATTEMPTS = 5
+"""Maximum number of times to try a job before giving up on it"""
+
+RETRY_DELAY = 0.1
+"""
+Number of seconds to wait before retrying a job the first time. This doubles
+with each attempt.
+"""
+
+CLAIM_TIMEOUT = 300.0
+"""
+Number of seconds after which a job that is still running is assumed to have
+been abandoned (for example because the server was stopped), and is run again
+"""
+
+POLL_INTERVAL = 5.0
+"""
+Number of seconds between checking the database for jobs while idle, in case
+they were added by a different process
+"""
+
+JobHandler = Callable[[Any], None]
+
+logger = logging.getLogger(__name__)
+
+__handlers: dict[str, JobHandler] = {}
+__changed = Condition()
+__version = 0
+__start_lock = Lock()
+__workers: list[Thread] = []
+
+
+def _engine() -> PooledSQLiteEngine:
+    engine = TJob._meta.db
+    assert isinstance(engine, PooledSQLiteEngine)
+    return engine
+
+
+def _is_busy(e: BaseException) -> bool:
+    """
+    Returns whether an exception was caused by the database being locked by
+    another connection
+    """
+    return isinstance(e, sqlite3.OperationalError) and (
+        "locked" in str(e) or "busy" in str(e)
+    )
+
+
+def _changed() -> None:
+    """Wake threads waiting for jobs to be added or finished"""
+    global __version
+    with __changed:
+        __version += 1
+        __changed.notify_all()
+
+
+def _wait(version: int, timeout: float) -> None:
+    """Wait until jobs are added or finished, or until the timeout expires"""
+    with __changed:
+        __changed.wait_for(lambda: __version != version, timeout)
+
+
+def _current_version() -> int:
+    with __changed:
+        return __version
+
+
+def handler(kind: str) -> Callable[[JobHandler], JobHandler]:
+    """
+    Decorator used to register the handler for a kind of job
+
+    ### Args:
+    * `kind` (`str`): name of the kind of job, which must be unique
+
+    ### Returns:
+    * `Callable[[JobHandler], JobHandler]`: decorator, which returns the
+      handler unchanged
+    """
+    def decorator(func: JobHandler) -> JobHandler:
+        assert kind not in __handlers, f"Duplicate job handler {kind!r}"
+        __handlers[kind] = func
+        return func
+    return decorator
+
+
+def enqueue(kind: str, payload: Any) -> None:
+    """
+    Add a job to the queue, returning without waiting for it to run
+
+    ### Args:
+    * `kind` (`str`): kind of job, as registered using `handler`
+
+    * `payload` (`Any`): JSON-serialisable value to give to the handler
+    """
+    assert kind in __handlers, f"No job handler for {kind!r}"
+    with _engine().connection() as connection:
+        connection.execute(
+            f'INSERT INTO {TJob._meta.tablename} '
+            f'(kind, payload, attempts, run_after, failed) '
+            f'VALUES (?, ?, 0, ?, 0)',
+            [kind, json.dumps(payload), time.time()],
+        )
+    start()
+    # Workers can't see the job until it has been committed
+    _engine().after_commit(_changed)
+
+
+def _claim() -> Optional[dict]:
+    """
+    Claim the next job that is ready to run, so that no other workers run it
+
+    ### Returns:
+    * `Optional[dict]`: row of the job, or `None` if no jobs are ready
+    """
+    table = TJob._meta.tablename
+    now = time.time()
+    # Take the write lock straight away, so that other workers can't claim
+    # the same job
+    with _engine().write_transaction() as connection:
+        job = connection.execute(
+            f'SELECT id, kind, payload, attempts FROM {table} '
+            f'WHERE failed = 0 AND run_after <= ? '
+            f'AND (claimed IS NULL OR claimed < ?) '
+            f'ORDER BY id LIMIT 1',
+            [now, now - CLAIM_TIMEOUT],
+        ).fetchone()
+        if job is not None:
+            connection.execute(
+                f'UPDATE {table} '
+                f'SET claimed = ?, attempts = attempts + 1 WHERE id = ?',
+                [now, job["id"]],
+            )
+            job["attempts"] += 1
+    return cast(Optional[dict], job)
+
+
+def _run(job: dict) -> None:
+    """
+    Run a claimed job, then remove it from the queue if it succeeded, or
+    schedule or fail it if it didn't
+    """
+    table = TJob._meta.tablename
+    try:
+        __handlers[job["kind"]](json.loads(job["payload"]))
+    except Exception as e:
+        with _engine().connection() as connection:
+            if _is_busy(e) and job["attempts"] < MAX_ATTEMPTS:
+                delay = RETRY_DELAY * 2 ** (job["attempts"] - 1)
+                connection.execute(
+                    f'UPDATE {table} '
+                    f'SET claimed = NULL, run_after = ? WHERE id = ?',
+                    [time.time() + delay, job["id"]],
+                )
+            else:
+                error = "".join(traceback.format_exception(e))
+                logger.exception(
+                    "Job %s (%s) failed", job["id"], job["kind"])
+                connection.execute(
+                    f'UPDATE {table} '
+                    f'SET claimed = NULL, failed = 1, error = ? WHERE id = ?',
+                    [error, job["id"]],
+                )
+    else:
+        with _engine().connection() as connection:
+            connection.execute(
+                f'DELETE FROM {table} WHERE id = ?', [job["id"]])
+
+
+def _next_run_after() -> Optional[float]:
+    """
+    Returns the earliest time that a job waiting to be retried can run, or
+    `None` if there are no such jobs
+    """
+    with _engine().connection() as connection:
+        return cast(Optional[float], connection.execute(
+            f'SELECT min(run_after) AS run_after '
+            f'FROM {TJob._meta.tablename} '
+            f'WHERE failed = 0 AND claimed IS NULL'
+        ).fetchone()["run_after"])
+
+
+def _work() -> None:
+    """
+    Main loop of each worker thread
+    """
+    while True:
+        version = _current_version()
+        try:
+            job = _claim()
+            if job is not None:
+                _run(job)
+                _changed()
+                continue
+            run_after = _next_run_after()
+        except Exception as e:
+            # Most likely the database is busy (or is being cleared), so back
+            # off for a bit before trying again
+            if not _is_busy(e):
+                traceback.print_exception(e)
+            run_after = time.time() + RETRY_DELAY
+        timeout = POLL_INTERVAL
+        if run_after is not None:
+            timeout = min(max(run_after - time.time(), 0), timeout)
+        _wait(version, timeout)
+
+
+def start() -> None:
+    """
+    Start the worker threads, if they aren't running already
+
+    This is called whenever a job is added, as well as when the server
+    handles a request, so that jobs left over from before a restart are run.
+    """
+    with __start_lock:
+        if len(__workers):
+            return
+        for i in range(WORKER_COUNT):
+            worker = Thread(target=_work, name=f"job-worker-{i}", daemon=True)
+            worker.start()
+            __workers.append(worker)
+
+
+def pending() -> int:
+    """
+    Returns the number of jobs that are waiting to run or are running,
+    excluding those that have failed
+
+    ### Returns:
+    * `int`: number of jobs
+    """
+    with _engine().connection() as connection:
+        return cast(int, connection.execute(
+            f'SELECT count(*) AS pending FROM {TJob._meta.tablename} '
+            f'WHERE failed = 0'
+        ).fetchone()["pending"])
+
+
+def drain(timeout: float) -> bool:
+    """
+    Wait until every job has either finished or failed. This is mainly
+    useful for testing, so that the effects of jobs can be checked.
+
+    ### Args:
+    * `timeout` (`float`): maximum number of seconds to wait
+
+    ### Returns:
+    * `bool`: whether all the jobs finished before the timeout expired
+    """
+    start()
+    end = time.monotonic() + timeout
+    while True:
+        version = _current_version()
+        if pending() == 0:
+            return True
+        remaining = end - time.monotonic()
+        if remaining <= 0:
+            return False
+        # Check again every so often, since jobs could be run by another
+        # process
+        _wait(version, min(remaining, RETRY_DELAY))
@@ -3,22 +3,87 @@
 
 Model for notifications.
 """
-from datetime import datetime
-from ..tables import TNotification
+import os
+import time
+from datetime import datetime, timedelta
+from ..tables import TNotification, _BaseTable
 from ..user import User
 from ..post import Post
 from ..comment import Comment
 from ..reply import Reply
 from ..post_queue import Queue
 from . import NotificationType
-from backend.util.db_queries import assert_id_exists, get_by_id
+from backend.util.db_engine import PooledSQLiteEngine
+from backend.util.db_queries import bulk_insert, get_by_id
+from backend.util.user_signal import UserSignal
 from backend.types.identifiers import NotificationId
 from backend.types.notifications import INotificationInfo
-from typing import cast, Optional, final
+from typing import Any, Callable, Optional, TypeVar, cast, final
 
 
 NOTIF_BODY_LEN = 50
 
+RECHECK_INTERVAL = 5.0
+"""
+Number of seconds between checking the database for new notifications while
+waiting for them, in case they were created by a different process
+"""
+
+RETENTION_DAYS = 90
+"""
+Default number of days to keep notifications for after they have been seen
+"""
+
+RETENTION_ENV = "ENSEMBLE_NOTIFICATION_RETENTION_DAYS"
+"""Environment variable used to override `RETENTION_DAYS`"""
+
+_notification_changes = UserSignal()
+"""
+Signal raised for a user whenever they receive new notifications, or their
+notifications are marked as seen or unseen
+"""
+
+
+def _notify(user_ids: list[int]) -> None:
+    """
+    Raise `_notification_changes` for the given users once the changes to
+    their notifications have been committed, since waiting threads won't see
+    them until then
+    """
+    engine = TNotification._meta.db
+    assert isinstance(engine, PooledSQLiteEngine)
+    engine.after_commit(lambda: _notification_changes.notify(user_ids))
+
+
+# Related rows that are loaded along with notifications when listing them, so
+# that their info can be given without any additional queries
+RELATED_COLUMNS = (
+    TNotification.user_from,
+    TNotification.post,
+    TNotification.comment,
+    TNotification.reply,
+    TNotification.queue,
+)
+
+M = TypeVar('M')
+
+
+def retention_period() -> timedelta:
+    """
+    Returns how long seen notifications are kept for, which can be configured
+    using the `ENSEMBLE_NOTIFICATION_RETENTION_DAYS` environment variable
+
+    ### Raises:
+    * `ValueError`: the configured number of days is invalid
+
+    ### Returns:
+    * `timedelta`: retention period
+    """
+    days = float(os.getenv(RETENTION_ENV, RETENTION_DAYS))
+    if days < 0:
+        raise ValueError("Notification retention period can't be negative")
+    return timedelta(days=days)
+
 
 def string_shorten(s: str, max_len: int) -> str:
     if len(s) > max_len:
@@ -26,6 +91,35 @@ def string_shorten(s: str, max_len: int) -> str:
     return s
 
 
+def load_related(
+    value: Any,
+    load: Callable[[Any], M],
+    from_row: Callable[[Any], M],
+) -> Optional[M]:
+    """
+    Returns the model object for a foreign key column of a notification
+
+    ### Args:
+    * `value` (`Any`): value of the column. This is the related row if it was
+      loaded along with the notification, otherwise it is its ID.
+
+    * `load` (`Callable[[Any], M]`): function to load the object from its ID
+
+    * `from_row` (`Callable[[Any], M]`): function to create the object from
+      its row
+
+    ### Returns:
+    * `Optional[M]`: model object, or `None` if the column is null
+    """
+    if isinstance(value, _BaseTable):
+        # Null foreign keys are loaded as rows with no ID
+        return from_row(value) if value.id is not None else None
+    elif value is not None:
+        return load(value)
+    else:
+        return None
+
+
 class Notification:
     """
     Represents a notification.
@@ -39,7 +133,9 @@ class Notification:
        `Xyz` is the type of notification).
     2. Define the `create` classmethod to only accept info required for that
        type of notification. It should call the `_create` classmethod with all
-       required info to create an entry in the database.
+       required info to create an entry in the database. If the notification
+       is sent to many users at once, also define a `create_for` classmethod
+       accepting a list of users, which calls `create_many`.
     3. Define the `get_info` method to return info about the notification.
     4. Create an enum entry for the notification type.
     5. Create a mapping from the notification type to the new subclass in
@@ -65,11 +161,13 @@ class Notification:
             return object.__new__(cls)
         # Otherwise, we need to figure out which kind of notification subclass
         # to construct
-        row = get_by_id(TNotification, id)
-        notif_type = NotificationType(row.notif_type)
-        # Use the mappings to instantiate the required subclass
-        from .mappings import mappings
-        return mappings[notif_type](id)
+        row = get_by_id(TNotification, id, "Notification")
+        # Python will call `__init__` on the returned object for us, since
+        # it's an instance of this class. Keep the row, so that it doesn't
+        # need to be loaded again there.
+        notif = object.__new__(cls._subclass_for(row))
+        notif.__row = row
+        return notif
 
     def __init__(self, id: NotificationId):
         """
@@ -82,8 +180,47 @@ class Notification:
         ### Raises:
         * `BadRequest`: notification does not exist
         """
-        assert_id_exists(TNotification, id)
         self.__id = id
+        # The row has already been loaded if `__new__` needed it to choose the
+        # subclass
+        if vars(self).get("_Notification__row") is None:
+            self.__row = get_by_id(TNotification, id, "Notification")
+
+    @staticmethod
+    def _subclass_for(row: TNotification) -> type['Notification']:
+        """
+        Returns the notification subclass used to represent the given row
+        """
+        # Use the mappings to find the required subclass
+        from .mappings import mappings
+        return mappings[NotificationType(row.notif_type)]
+
+    @classmethod
+    def from_row(cls, row: TNotification) -> 'Notification':
+        """
+        Create a notification object from a row that has already been loaded
+        from the database, without performing any additional queries.
+
+        As with the regular constructor, the correct subclass is applied
+        automatically.
+
+        ### Args:
+        * `row` (`TNotification`): row in the notifications table
+
+        ### Returns:
+        * `Notification`: the notification object
+        """
+        notif = object.__new__(cls._subclass_for(row))
+        notif.__id = NotificationId(row.id)
+        notif.__row = row
+        return notif
+
+    def refresh(self) -> None:
+        """
+        Reload the notification from the database, discarding the existing
+        snapshot
+        """
+        self.__row = get_by_id(TNotification, self.__id, "Notification")
 
     @classmethod
     def _create(
@@ -95,6 +232,7 @@ class Notification:
         comment: Optional[Comment] = None,
         reply: Optional[Reply] = None,
         queue: Optional[Queue] = None,
+        coalesce: bool = False,
     ) -> NotificationId:
         """
         Create a new notification in the database.
@@ -122,42 +260,286 @@ class Notification:
         * `queue` (`Optional[Queue]`, optional): queue associated with
           notification. Defaults to `None`.
 
+        * `coalesce` (`bool`, optional): whether to merge the notification
+          into an unseen notification of the same type about the same thing,
+          if there is one. Defaults to `False`.
+
+        ### Returns:
+        * `NotificationId`: ID of new (or merged) notification
+        """
+        return cls.create_many(
+            [user_to],
+            notif_type,
+            user_from,
+            post,
+            comment,
+            reply,
+            queue,
+            coalesce,
+        )[0].id
+
+    @classmethod
+    def create_many(
+        cls,
+        users_to: list[User],
+        notif_type: NotificationType,
+        user_from: Optional[User] = None,
+        post: Optional[Post] = None,
+        comment: Optional[Comment] = None,
+        reply: Optional[Reply] = None,
+        queue: Optional[Queue] = None,
+        coalesce: bool = False,
+    ) -> list['Notification']:
+        """
+        Create a new notification in the database for each of the given
+        users. All the notifications are inserted in bulk, within a single
+        transaction, so the number of queries doesn't depend on the number of
+        users.
+
+        When coalescing, users who already have an unseen notification of the
+        same type about the same thing have that notification replaced by a
+        new one, which counts the occurrences of both, so that repeated events
+        don't flood their notifications. Since the new notification has a new
+        ID, it is listed as the newest notification.
+
+        This should be wrapped around by subclasses to provide simpler
+        functionality. The arguments are the same as for `_create`, except
+        that a list of users to send the notification to is given.
+
+        ### Returns:
+        * `list[Notification]`: the new (or merged) notifications, in the same
+          order as the users
+        """
+        if len(users_to) == 0:
+            return []
+        timestamp = datetime.now()
+        transaction = TNotification._meta.db.atomic()
+        # Number of times each user has been sent the notification already
+        previous: dict[int, int] = {}
+        merged_ids: list[int] = []
+        if coalesce:
+            targets = [
+                (TNotification.post, post),
+                (TNotification.comment, comment),
+                (TNotification.reply, reply),
+                (TNotification.queue, queue),
+            ]
+            for r in TNotification.select(
+                TNotification.id,
+                TNotification.user_to,
+                TNotification.occurrences,
+            ).where(
+                TNotification.user_to.is_in([u.id for u in users_to]),
+                TNotification.notif_type == notif_type.value,
+                TNotification.seen == False,  # noqa: E712
+                *[
+                    c.is_null() if t is None else c == t.id
+                    for c, t in targets
+                ],
+            ).run_sync():
+                previous[r["user_to"]] = (
+                    previous.get(r["user_to"], 0) + r["occurrences"])
+                merged_ids.append(r["id"])
+        rows = [
+            TNotification(
+                {
+                    TNotification.user_to: u.id,
+                    TNotification.notif_type: notif_type.value,
+                    TNotification.user_from: (
+                        user_from.id if user_from is not None else None),
+                    TNotification.post: (
+                        post.id if post is not None else None),
+                    TNotification.comment: (
+                        comment.id if comment is not None else None),
+                    TNotification.reply: (
+                        reply.id if reply is not None else None),
+                    TNotification.seen: False,
+                    TNotification.queue: (
+                        queue.id if queue is not None else None),
+                    TNotification.timestamp: timestamp,
+                    TNotification.occurrences: previous.get(u.id, 0) + 1,
+                }
+            )
+            for u in users_to
+        ]
+        # Inserting sets the ID of each row
+        for query in bulk_insert(TNotification, rows):
+            transaction.add(query)
+        # Merged notifications are replaced rather than updated, so that they
+        # get a new ID, and are treated as new notifications when listing and
+        # waiting for them. They are deleted after inserting the new ones, so
+        # that SQLite can't reuse their IDs.
+        if len(merged_ids):
+            transaction.add(TNotification.delete().where(
+                TNotification.id.is_in(merged_ids)))
+        transaction.run_sync()
+        _notify([u.id for u in users_to])
+        return [Notification.from_row(r) for r in rows]
+
+    @classmethod
+    def all(
+        self,
+        user: User,
+        after_id: Optional[NotificationId] = None,
+        limit: Optional[int] = None,
+        before_id: Optional[NotificationId] = None,
+    ) -> list['Notification']:
+        """
+        Returns a list of notifications for a user, from newest to oldest
+
+        The posts, comments, replies, queues and users that the notifications
+        refer to are loaded in the same query.
+
+        ### Args:
+        * `user` (`User`): user to get notifications for
+
+        * `after_id` (`Optional[NotificationId]`): only return notifications
+          newer than the notification with this ID
+
+        * `limit` (`Optional[int]`): maximum number of notifications to
+          return
+
+        * `before_id` (`Optional[NotificationId]`): only return notifications
+          older than the notification with this ID. To get the next page of
+          notifications, give the ID of the last notification in the previous
+          page.
+        """
+        # The index on user_to also orders by ID, so each page is found
+        # without scanning the user's entire history
+        query = TNotification.objects(*RELATED_COLUMNS)\
+            .where(TNotification.user_to == user.id)\
+            .order_by(TNotification.id, ascending=False)
+        if after_id is not None:
+            query = query.where(TNotification.id > after_id)
+        if before_id is not None:
+            query = query.where(TNotification.id < before_id)
+        if limit is not None:
+            query = query.limit(limit)
+        return [Notification.from_row(n) for n in query.run_sync()]
+
+    @classmethod
+    def set_seen_many(
+        cls,
+        user: User,
+        value: bool,
+        ids: Optional[list[NotificationId]] = None,
+        up_to_id: Optional[NotificationId] = None,
+    ) -> None:
+        """
+        Mark many of a user's notifications as seen or unseen using a single
+        query. Notifications that don't belong to the user are ignored.
+
+        ### Args:
+        * `user` (`User`): user whose notifications to update
+
+        * `value` (`bool`): whether the notifications should count as seen
+
+        * `ids` (`Optional[list[NotificationId]]`): IDs of the notifications
+          to update
+
+        * `up_to_id` (`Optional[NotificationId]`): update all notifications
+          with this ID or older
+        """
+        query = TNotification.update({TNotification.seen: value})\
+            .where(TNotification.user_to == user.id)
+        if ids is not None:
+            if len(ids) == 0:
+                return
+            query = query.where(TNotification.id.is_in(ids))
+        if up_to_id is not None:
+            query = query.where(TNotification.id <= up_to_id)
+        query.run_sync()
+        _notify([user.id])
+
+    @classmethod
+    def unread_count(cls, user: User) -> int:
+        """
+        Returns the number of notifications the user hasn't seen yet
+
+        ### Args:
+        * `user` (`User`): user to count notifications for
+
         ### Returns:
-        * `NotificationId`: ID of new notification
-        """
-        val = TNotification(
-            {
-                TNotification.user_to: user_to.id,
-                TNotification.notif_type: notif_type.value,
-                TNotification.user_from: (
-                    user_from.id if user_from is not None else None),
-                TNotification.post: post.id if post is not None else None,
-                TNotification.comment: (
-                    comment.id if comment is not None else None),
-                TNotification.reply: reply.id if reply is not None else None,
-                TNotification.seen: False,
-                TNotification.queue: queue.id if queue is not None else None,
-                TNotification.timestamp: datetime.now(),
-            }
-        ).save().run_sync()[0]
-        return cast(NotificationId, val["id"])
+        * `int`: number of unseen notifications
+        """
+        return cast(
+            int,
+            TNotification.count().where(
+                TNotification.user_to == user.id,
+                TNotification.seen == False,  # noqa: E712
+            ).run_sync()
+        )
 
     @classmethod
-    def all(self, user: User) -> list['Notification']:
+    def latest_id(cls, user: User) -> Optional[NotificationId]:
         """
-        Returns a list of notifications for a user
+        Returns the ID of the newest notification sent to the user
+
+        ### Args:
+        * `user` (`User`): user to check
+
+        ### Returns:
+        * `Optional[NotificationId]`: ID of the notification, or `None` if
+          the user doesn't have any notifications
         """
-        notifs = TNotification.objects()\
+        row = TNotification.select(TNotification.id)\
             .where(TNotification.user_to == user.id)\
             .order_by(TNotification.id, ascending=False)\
+            .first()\
             .run_sync()
-        return [Notification(n.id) for n in notifs]
+        return None if row is None else NotificationId(row["id"])
+
+    @classmethod
+    def wait_for_new(
+        cls,
+        user: User,
+        after_id: Optional[NotificationId],
+        timeout: float,
+    ) -> list['Notification']:
+        """
+        Wait until the user receives notifications newer than the given
+        notification, then return them. Notifications created by this process
+        are returned immediately, and the database is re-checked every few
+        seconds to find notifications created by other processes.
+
+        This also returns early (possibly with no notifications) if any of the
+        user's notifications are marked as seen or unseen, so that the caller
+        can update the number of unseen notifications.
+
+        ### Args:
+        * `user` (`User`): user to wait for notifications for
+
+        * `after_id` (`Optional[NotificationId]`): ID of the newest
+          notification the caller knows about, or `None` if they don't know
+          about any
+
+        * `timeout` (`float`): maximum number of seconds to wait
+
+        ### Returns:
+        * `list[Notification]`: new notifications, from newest to oldest. This
+          is empty if the timeout expired.
+        """
+        deadline = time.monotonic() + timeout
+        while True:
+            # Get the version before checking, so that notifications created
+            # between checking and waiting still wake us up
+            version = _notification_changes.version(user.id)
+            notifs = cls.all(user, after_id)
+            remaining = deadline - time.monotonic()
+            if len(notifs) or remaining <= 0:
+                return notifs
+            if _notification_changes.wait(
+                user.id,
+                version,
+                min(remaining, RECHECK_INTERVAL),
+            ):
+                return cls.all(user, after_id)
 
     def _get(self) -> TNotification:
         """
-        Return a reference to the underlying database row
+        Return a reference to the snapshot of the underlying database row
         """
-        return get_by_id(TNotification, self.__id)
+        return self.__row
 
     @property
     def id(self) -> NotificationId:
@@ -184,15 +566,53 @@ class Notification:
     def seen(self, new_val: bool):
         row = self._get()
         row.seen = new_val
-        row.save().run_sync()
+        row.save([TNotification.seen]).run_sync()
+        _notify([row.user_to])
 
     @property
     def timestamp(self) -> int:
         """
-        Time when the notification was sent
+        Time when the notification was (most recently) sent
         """
         return int(self._get().timestamp.timestamp())
 
+    @property
+    def count(self) -> int:
+        """
+        Number of times the notification was sent, if similar notifications
+        were merged into it
+        """
+        return self._get().occurrences
+
+    @classmethod
+    def prune(cls, older_than: Optional[timedelta] = None) -> int:
+        """
+        Delete notifications that have been seen and were sent longer ago
+        than the given amount of time. Unseen notifications are always kept.
+
+        This is run regularly by the server's sweeper thread.
+
+        ### Args:
+        * `older_than` (`Optional[timedelta]`, optional): age of
+          notifications to delete. Defaults to `None` (use
+          `retention_period()`).
+
+        ### Returns:
+        * `int`: number of notifications deleted
+        """
+        if older_than is None:
+            older_than = retention_period()
+        query = TNotification.delete().where(
+            (TNotification.seen == True)  # noqa: E712
+            & (TNotification.timestamp < datetime.now() - older_than)
+        )
+        sql, args = query.querystrings[0].compile_string(
+            engine_type="sqlite")
+        engine = TNotification._meta.db
+        assert isinstance(engine, PooledSQLiteEngine)
+        with engine.connection() as connection:
+            return connection.execute(sql, args).rowcount
+
     @property
     def _user_from(self) -> Optional[User]:
         """
@@ -200,10 +620,7 @@ class Notification:
 
         This method is private and should only be accessed by subclasses.
         """
-        if (user_id := self._get().user_from) is not None:
-            return User(user_id)
-        else:
-            return None
+        return load_related(self._get().user_from, User, User.from_row)
 
     @property
     def _post(self) -> Optional[Post]:
@@ -212,10 +629,7 @@ class Notification:
 
         This method is private and should only be accessed by subclasses.
         """
-        if (post_id := self._get().post) is not None:
-            return Post(post_id)
-        else:
-            return None
+        return load_related(self._get().post, Post, Post.from_row)
 
     @property
     def _comment(self) -> Optional[Comment]:
@@ -224,10 +638,7 @@ class Notification:
 
         This method is private and should only be accessed by subclasses.
         """
-        if (comment_id := self._get().comment) is not None:
-            return Comment(comment_id)
-        else:
-            return None
+        return load_related(self._get().comment, Comment, Comment.from_row)
 
     @property
     def _reply(self) -> Optional[Reply]:
@@ -236,10 +647,7 @@ class Notification:
 
         This method is private and should only be accessed by subclasses.
         """
-        if (reply_id := self._get().reply) is not None:
-            return Reply(reply_id)
-        else:
-            return None
+        return load_related(self._get().reply, Reply, Reply.from_row)
 
     @property
     def _queue(self) -> Optional[Queue]:
@@ -248,10 +656,7 @@ class Notification:
 
         This method is private and should only be accessed by subclasses.
         """
-        if (queue_id := self._get().queue) is not None:
-            return Queue(queue_id)
-        else:
-            return None
+        return load_related(self._get().queue, Queue, Queue.from_row)
 
     @final
     def get_info(self) -> INotificationInfo:
@@ -67,7 +67,7 @@ class NotificationAccepted(Notification):
 
     def _get_info(self) -> INotificationInfo:
         # If they wrote the comment
-        if self.comment.author == self.user_to:
+        if self.comment._get().author == self._get().user_to:
             head = "Answer accepted"
         # If they wrote the original post
         else:
@@ -83,4 +83,5 @@ class NotificationAccepted(Notification):
             "comment": self.comment.id,
             "reply": None,
             "queue": None,
+            "count": self.count,
         }
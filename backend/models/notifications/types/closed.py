@@ -57,4 +57,5 @@ class NotificationClosed(Notification):
             "comment": None,
             "reply": None,
             "queue": None,
+            "count": self.count,
         }
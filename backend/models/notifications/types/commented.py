@@ -75,13 +75,14 @@ class NotificationCommented(Notification):
         return c
 
     def _get_info(self) -> INotificationInfo:
-        if self._reply is not None:
-            if self.comment.author == self.user_to:
+        reply = self._reply
+        if reply is not None:
+            if self.comment._get().author == self._get().user_to:
                 heading = "New reply to your comment"
             else:
                 heading = "New reply on your post"
-            body = self._reply.text
-            reply_id = self._reply.id
+            body = reply.text
+            reply_id = reply.id
         else:
             heading = "New comment on your post"
             body = self.comment.text
@@ -97,4 +98,5 @@ class NotificationCommented(Notification):
             "comment": self.comment.id,
             "reply": reply_id,
             "queue": None,
+            "count": self.count,
         }
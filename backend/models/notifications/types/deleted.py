@@ -56,25 +56,29 @@ class NotificationDeleted(Notification):
         ))
 
     def _get_info(self) -> INotificationInfo:
-        if self._reply is not None:
+        # The post, comment and reply are all stored in the notification, so
+        # we don't need to look up the parents of comments and replies
+        post = self._post
+        comment = self._comment
+        reply = self._reply
+        assert post is not None
+        if reply is not None:
+            assert comment is not None
             type = "reply"
-            title = self._reply.text
-            reply_id = self._reply.id
-            comment_id = self._reply.parent.id
-            post_id = self._reply.parent.parent.id
-        elif self._comment is not None:
+            title = reply.text
+            reply_id = reply.id
+            comment_id = comment.id
+        elif comment is not None:
             type = "comment"
-            title = self._comment.text
+            title = comment.text
             reply_id = None
-            comment_id = self._comment.id
-            post_id = self._comment.parent.id
+            comment_id = comment.id
         else:
-            assert self._post is not None
             type = "post"
-            title = self._post.heading
+            title = post.heading
             reply_id = None
             comment_id = None
-            post_id = self._post.id
+        post_id = post.id
         return {
             "notification_id": self.id,
             "timestamp": self.timestamp,
@@ -86,4 +90,5 @@ class NotificationDeleted(Notification):
             "comment": comment_id,
             "reply": reply_id,
             "queue": None,
+            "count": self.count,
         }
@@ -7,8 +7,15 @@ from backend.models.post import Post
 from backend.models.post_queue import Queue
 from .. import NotificationType
 from .. import Notification
+from ... import jobs
 from ...user import User
+from backend.util.exceptions import IdNotFound
+from backend.types.identifiers import PostId, QueueId, UserId
 from backend.types.notifications import INotificationInfo
+from typing import cast
+
+
+FAN_OUT_JOB = "notifications.queue_added"
 
 
 class NotificationQueueAdded(Notification):
@@ -46,6 +53,61 @@ class NotificationQueueAdded(Notification):
             queue=queue,
         ))
 
+    @classmethod
+    def create_for(
+        cls,
+        users_to: list[User],
+        user_from: User,
+        post: Post,
+        queue: Queue,
+    ) -> list['NotificationQueueAdded']:
+        """
+        Create notifications that a post was added to a queue for many users
+        at once
+
+        ### Args:
+        * `users_to` (`list[User]`): users receiving the notification
+
+        * `user_from` (`User`): user who added the post to the queue
+
+        * `post` (`Post`): post that was added
+
+        * `queue` (`Queue`): queue the post was added to
+
+        ### Returns:
+        * `list[NotificationQueueAdded]`: notification objects
+        """
+        return [
+            cast(NotificationQueueAdded, n)
+            for n in cls.create_many(
+                users_to,
+                NotificationType.QueueAdded,
+                user_from,
+                post,
+                queue=queue,
+            )
+        ]
+
+    @classmethod
+    def enqueue(cls, user_from: User, post: Post, queue: Queue) -> None:
+        """
+        Queue notifications that a post was added to a queue, to be sent to
+        every user following the queue (other than the user who added it) in
+        the background
+
+        ### Args:
+        * `user_from` (`User`): user who added the post to the queue
+
+        * `post` (`Post`): post that was added
+
+        * `queue` (`Queue`): queue the post was added to
+        """
+        jobs.enqueue(FAN_OUT_JOB, {
+            "user_from": user_from.id,
+            "post": post.id,
+            "queue": queue.id,
+        })
+
     @property
     def user_from(self) -> User:
         u = self._user_from
@@ -76,4 +138,25 @@ class NotificationQueueAdded(Notification):
             "comment": None,
             "reply": None,
             "queue": self.queue.id,
+            "count": self.count,
         }
+
+
+@jobs.handler(FAN_OUT_JOB)
+def _fan_out(payload: dict) -> None:
+    """
+    Send the notifications queued by `NotificationQueueAdded.enqueue`
+    """
+    try:
+        user_from = User(UserId(payload["user_from"]))
+        post = Post(PostId(payload["post"]))
+        queue = Queue(QueueId(payload["queue"]))
+    except IdNotFound:
+        # Something was deleted before the notifications were sent
+        return
+    NotificationQueueAdded.create_for(
+        [u for u in queue.get_followers() if u != user_from],
+        user_from,
+        post,
+        queue,
+    )
@@ -47,34 +47,48 @@ class NotificationReacted(Notification):
             comment = ref.parent
             reply = ref
 
+        # Reactions to the same thing are merged together, so that popular
+        # posts don't flood the author's notifications
         return NotificationReacted(cls._create(
             user_to,
             NotificationType.Reacted,
             post=post,
             comment=comment,
             reply=reply,
+            coalesce=True,
         ))
 
     def _get_info(self) -> INotificationInfo:
-        if self._reply is not None:
-            action = "Your reply received thanks"
-            title = self._reply.text
-            reply_id = self._reply.id
-            comment_id = self._reply.parent.id
-            post_id = self._reply.parent.parent.id
-        elif self._comment is not None:
-            action = "Your comment received thanks"
-            title = self._comment.text
+        post = self._post
+        comment = self._comment
+        reply = self._reply
+        assert post is not None
+        if reply is not None:
+            assert comment is not None
+            action = (
+                "Your reply received thanks" if self.count == 1
+                else f"Your reply received {self.count} thanks"
+            )
+            title = reply.text
+            reply_id = reply.id
+            comment_id = comment.id
+        elif comment is not None:
+            action = (
+                "Your comment received thanks" if self.count == 1
+                else f"Your comment received {self.count} thanks"
+            )
+            title = comment.text
             reply_id = None
-            comment_id = self._comment.id
-            post_id = self._comment.parent.id
+            comment_id = comment.id
         else:
-            assert self._post is not None
-            action = "Your post received a me too"
-            title = self._post.heading
+            action = (
+                "Your post received a me too" if self.count == 1
+                else f"Your post received {self.count} me toos"
+            )
+            title = post.heading
             reply_id = None
             comment_id = None
-            post_id = self._post.id
+        post_id = post.id
         return {
             "notification_id": self.id,
             "user_from": None,
@@ -86,4 +100,5 @@ class NotificationReacted(Notification):
             "comment": comment_id,
             "reply": reply_id,
             "queue": None,
+            "count": self.count,
         }
@@ -6,8 +6,16 @@ Notification for "Post reported"
 from backend.models.post import Post
 from .. import NotificationType
 from .. import Notification
+from ... import jobs
 from ...user import User
+from ...permissions import Permission
+from backend.util.exceptions import IdNotFound
+from backend.types.identifiers import PostId, UserId
 from backend.types.notifications import INotificationInfo
+from typing import cast
+
+
+FAN_OUT_JOB = "notifications.reported"
 
 
 class NotificationReported(Notification):
@@ -42,6 +50,47 @@ class NotificationReported(Notification):
             post,
         ))
 
+    @classmethod
+    def create_for(
+        cls,
+        users_to: list[User],
+        post: Post,
+    ) -> list['NotificationReported']:
+        """
+        Create notifications that a post was reported for many users at once
+
+        ### Args:
+        * `users_to` (`list[User]`): users receiving the notification
+
+        * `post` (`Post`): reference to the post
+
+        ### Returns:
+        * `list[NotificationReported]`: notification objects
+        """
+        return [
+            cast(NotificationReported, n)
+            for n in cls.create_many(
+                users_to,
+                NotificationType.Reported,
+                None,
+                post,
+            )
+        ]
+
+    @classmethod
+    def enqueue(cls, post: Post, reporter: User) -> None:
+        """
+        Queue notifications that a post was reported, to be sent to every
+        user who can view reports (other than the reporter and the author of
+        the post) in the background
+
+        ### Args:
+        * `post` (`Post`): post that was reported
+
+        * `reporter` (`User`): user who reported the post
+        """
+        jobs.enqueue(FAN_OUT_JOB, {"post": post.id, "reporter": reporter.id})
+
     @property
     def post(self) -> Post:
         p = self._post
@@ -60,4 +109,25 @@ class NotificationReported(Notification):
             "comment": None,
             "reply": None,
             "queue": None,
+            "count": self.count,
         }
+
+
+@jobs.handler(FAN_OUT_JOB)
+def _fan_out(payload: dict) -> None:
+    """
+    Send the notifications queued by `NotificationReported.enqueue`
+    """
+    try:
+        post = Post(PostId(payload["post"]))
+    except IdNotFound:
+        # The post was deleted before the notifications were sent
+        return
+    skipped = {UserId(payload["reporter"]), post.author.id}
+    NotificationReported.create_for(
+        [
+            u for u in User.all_with_permission(Permission.ViewReports)
+            if u.id not in skipped
+        ],
+        post,
+    )
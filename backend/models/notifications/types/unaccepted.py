@@ -77,4 +77,5 @@ class NotificationUnaccepted(Notification):
             "comment": self.comment.id,
             "reply": None,
             "queue": None,
+            "count": self.count,
         }
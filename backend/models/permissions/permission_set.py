@@ -6,10 +6,13 @@ that a user has. It also supports derived permissions, meaning that users can
 inherit permissions from a general permission set (eg tutors can have
 permissions that inherit from the tutor permission set).
 """
-from typing import Optional
+import time
+from typing import Any, Mapping, Optional
+from threading import Lock
 from .permission import Permission
 from ..tables import TPermissionGroup, TPermissionUser, TUser
-from backend.util.db_queries import assert_id_exists, get_by_id
+from backend.util.db_engine import PooledSQLiteEngine
+from backend.util.db_queries import bulk_update, get_by_id
 from backend.util.validators import assert_valid_str_field
 from backend.util.exceptions import MissingPermissionError
 from backend.util.http_errors import BadRequest
@@ -24,6 +27,93 @@ if TYPE_CHECKING:
     from backend.models.user import User
 
 
+COMPILED_TTL = 10.0
+"""
+Number of seconds before compiled permissions are loaded from the database
+again, so that changes made by other processes are noticed
+"""
+
+# Permissions are compiled into bitmasks, where bit `n` is set if the
+# permission with value `n` is allowed, so that checking a permission doesn't
+# require any database access. Any change to a permission group or a user's
+# permissions increments the version, which invalidates every compiled
+# bitmask, since changing a group affects all the users within it. The
+# version only covers changes made by this process, so bitmasks also expire
+# after `COMPILED_TTL`. Entries are stored as `(version, bitmask, expiry)`.
+_version = 0
+_version_lock = Lock()
+_compiled_groups: dict[PermissionGroupId, tuple[int, int, float]] = {}
+_compiled_users: dict[UserPermissionId, tuple[int, int, float]] = {}
+
+
+def _current_version() -> int:
+    """
+    Returns the current version of the compiled permissions
+    """
+    return _version
+
+
+def _bump_version() -> int:
+    """
+    Discard all compiled permissions, returning the new version
+    """
+    global _version
+    with _version_lock:
+        _version += 1
+        _compiled_groups.clear()
+        _compiled_users.clear()
+        return _version
+
+
+def _invalidate_compiled() -> int:
+    """
+    Discard all compiled permissions, returning the new version
+
+    If the changes are made within a transaction, other threads could
+    compile the old permissions again before it is committed, so they are
+    discarded again once it has been.
+    """
+    engine = TPermissionGroup._meta.db
+    assert isinstance(engine, PooledSQLiteEngine)
+    if engine.in_transaction:
+        engine.after_commit(_bump_version)
+    return _bump_version()
+
+
+def _get_compiled(
+    compiled: Mapping[Any, tuple[int, int, float]],
+    id: int,
+) -> Optional[int]:
+    """
+    Returns the compiled bitmask for the given ID if it is up to date
+    """
+    entry = compiled.get(id)
+    if (
+        entry is not None
+        and entry[0] == _version
+        and time.monotonic() < entry[2]
+    ):
+        return entry[1]
+    return None
+
+
+def _compiled_entry(version: int, mask: int) -> tuple[int, int, float]:
+    """
+    Returns an entry to store a newly compiled bitmask
+    """
+    return (version, mask, time.monotonic() + COMPILED_TTL)
+
+
+def _to_bitmask(values: list[int]) -> int:
+    """
+    Returns a bitmask containing the given permission values
+    """
+    mask = 0
+    for v in values:
+        mask |= 1 << v
+    return mask
+
+
 class PermissionSet:
     """
     Contains a collection of permissions that a user has access to.
@@ -72,6 +162,16 @@ class PermissionSet:
                 f"You don't have the {action.name} permission"
             )
 
+    @classmethod
+    def clear_cache(cls) -> None:
+        """
+        Discard all compiled permissions, so that they are loaded from the
+        database next time they are checked. This is called automatically
+        when permissions are modified, but must also be called when the
+        database is cleared.
+        """
+        _invalidate_compiled()
+
 
 class PermissionGroup(PermissionSet):
     """
@@ -85,8 +185,36 @@ class PermissionGroup(PermissionSet):
         ### Args:
         * `id` (`int`): ID of the preset
         """
-        assert_id_exists(TPermissionGroup, id)
         self.__id = id
+        self.__version = _current_version()
+        self.__row = get_by_id(TPermissionGroup, id, "PermissionGroup")
+
+    @classmethod
+    def from_row(cls, row: TPermissionGroup) -> 'PermissionGroup':
+        """
+        Create a permission group object from a row that has already been
+        loaded from the database, without performing any additional queries
+
+        ### Args:
+        * `row` (`TPermissionGroup`): row in the permission groups table
+
+        ### Returns:
+        * `PermissionGroup`: the permission group object
+        """
+        group = cls.__new__(cls)
+        group.__id = PermissionGroupId(row.id)
+        group.__version = _current_version()
+        group.__row = row
+        return group
+
+    def refresh(self) -> None:
+        """
+        Reload the permission group from the database, discarding the
+        existing snapshot
+        """
+        self.__version = _current_version()
+        self.__row = get_by_id(
+            TPermissionGroup, self.__id, "PermissionGroup")
 
     @classmethod
     def create(
@@ -126,8 +254,8 @@ class PermissionGroup(PermissionSet):
         """
         Returns a list of all available permission groups
         """
-        ids = TPermissionGroup.select(TPermissionGroup.id).run_sync()
-        return [cls(i['id']) for i in ids]
+        rows = TPermissionGroup.objects().run_sync()
+        return [cls.from_row(r) for r in rows]
 
     @classmethod
     def from_name(cls, name: str) -> 'PermissionGroup | None':
@@ -135,34 +263,50 @@ class PermissionGroup(PermissionSet):
         Returns a permission group with the given name, or None if one can't be
         found
         """
-        ids = TPermissionGroup\
-            .select(TPermissionGroup.id)\
+        row = TPermissionGroup\
+            .objects()\
             .where(TPermissionGroup.name == name)\
             .first()\
             .run_sync()
-        if ids is None:
+        if row is None:
             return None
         else:
-            return cls(ids['id'])
+            return cls.from_row(row)
 
     def __eq__(self, other: object) -> bool:
         if isinstance(other, PermissionGroup):
             return self.id == other.id
         return False
 
-    def delete(self) -> None:
+    def delete(
+        self,
+        transfer_group: Optional["PermissionGroup"] = None,
+    ) -> None:
         """
         Delete this permission group
-        """
-        TPermissionGroup.delete()\
-            .where(TPermissionGroup.id == self.id)\
-            .run_sync()
+
+        ### Args:
+        * `transfer_group` (`Optional[PermissionGroup]`, optional): group to
+          move the users in this group to. This is done using a single query,
+          in the same transaction as deleting the group.
+        """
+        transaction = TPermissionGroup._meta.db.atomic()
+        if transfer_group is not None:
+            transaction.add(bulk_update(
+                TPermissionUser,
+                {TPermissionUser.parent: transfer_group.id},
+                TPermissionUser.parent == self.id,
+            ))
+        transaction.add(
+            TPermissionGroup.delete().where(TPermissionGroup.id == self.id))
+        transaction.run_sync()
+        _invalidate_compiled()
 
     def _get(self) -> TPermissionGroup:
         """
-        Return a reference to the underlying database row
+        Return a reference to the snapshot of the underlying database row
         """
-        return get_by_id(TPermissionGroup, self.__id)
+        return self.__row
 
     @property
     def id(self) -> PermissionGroupId:
@@ -190,7 +334,7 @@ class PermissionGroup(PermissionSet):
     def name(self, new_name: str):
         row = self._get()
         row.name = new_name
-        row.save().run_sync()
+        row.save([TPermissionGroup.name]).run_sync()
 
     def get_users(self) -> list['User']:
         """
@@ -200,7 +344,7 @@ class PermissionGroup(PermissionSet):
         matches = TUser.objects()\
             .where(TUser.permissions.parent == self.id)\
             .run_sync()
-        return [User(m.id) for m in matches]
+        return [User.from_row(m) for m in matches]
 
     def can(self, action: Permission) -> bool:
         row = self._get()
@@ -215,6 +359,19 @@ class PermissionGroup(PermissionSet):
             # that have not logged in, to allow for public access?
             assert False
 
+    @classmethod
+    def _compiled(cls, id: PermissionGroupId) -> int:
+        """
+        Returns the bitmask of allowed permissions for the given group,
+        loading it from the database only if it hasn't been compiled yet
+        """
+        mask = _get_compiled(_compiled_groups, id)
+        if mask is None:
+            group = PermissionGroup(id)
+            mask = _to_bitmask(group._get().allowed)
+            _compiled_groups[id] = _compiled_entry(group.__version, mask)
+        return mask
+
     def update_allowed(self, actions: dict[Permission, bool]):
         """
         Add the given set of permissions to the allowed set of permissions,
@@ -226,7 +383,7 @@ class PermissionGroup(PermissionSet):
           permissions to allow or disallow. Each Permission should be set to
           `True` to allow, `False` to disallow.
         """
-        row = get_by_id(TPermissionGroup, self.__id)
+        row = self._get()
 
         allowed: list[int] = []
         disallowed: list[int] = []
@@ -242,6 +399,7 @@ class PermissionGroup(PermissionSet):
 
         row.save([TPermissionGroup.allowed, TPermissionGroup.disallowed])\
             .run_sync()
+        self.__version = _invalidate_compiled()
 
 
 class PermissionUser(PermissionSet):
@@ -256,8 +414,35 @@ class PermissionUser(PermissionSet):
         ### Args:
         * `id` (`int`): ID of the preset
         """
-        assert_id_exists(TPermissionUser, id)
         self.__id = id
+        self.__version = _current_version()
+        self.__row = get_by_id(TPermissionUser, id, "UserPermission")
+
+    @classmethod
+    def from_row(cls, row: TPermissionUser) -> 'PermissionUser':
+        """
+        Create a user permission set object from a row that has already been
+        loaded from the database, without performing any additional queries
+
+        ### Args:
+        * `row` (`TPermissionUser`): row in the user permissions table
+
+        ### Returns:
+        * `PermissionUser`: the user permission set object
+        """
+        permissions = cls.__new__(cls)
+        permissions.__id = UserPermissionId(row.id)
+        permissions.__version = _current_version()
+        permissions.__row = row
+        return permissions
+
+    def refresh(self) -> None:
+        """
+        Reload the user permission set from the database, discarding the
+        existing snapshot
+        """
+        self.__version = _current_version()
+        self.__row = get_by_id(TPermissionUser, self.__id, "UserPermission")
 
     @classmethod
     def create(cls, parent: PermissionGroup) -> 'PermissionUser':
@@ -288,12 +473,13 @@ class PermissionUser(PermissionSet):
         TPermissionUser.delete()\
             .where(TPermissionUser.id == self.id)\
             .run_sync()
+        _invalidate_compiled()
 
     def _get(self) -> TPermissionUser:
         """
-        Return a reference to the underlying database row
+        Return a reference to the snapshot of the underlying database row
         """
-        return get_by_id(TPermissionUser, self.__id)
+        return self.__row
 
     @property
     def id(self) -> UserPermissionId:
@@ -316,16 +502,28 @@ class PermissionUser(PermissionSet):
     def parent(self, new_parent: PermissionGroup):
         row = self._get()
         row.parent = new_parent.id
-        row.save().run_sync()
+        row.save([TPermissionUser.parent]).run_sync()
+        self.__version = _invalidate_compiled()
+
+    def _compiled(self) -> int:
+        """
+        Returns the bitmask of allowed permissions for this user, combining
+        their own permissions with those of their group. This only accesses
+        the database if the bitmask hasn't been compiled yet.
+        """
+        mask = _get_compiled(_compiled_users, self.id)
+        if mask is None:
+            row = self._get()
+            mask = _to_bitmask(row.allowed) | (
+                PermissionGroup._compiled(row.parent)
+                & ~_to_bitmask(row.disallowed)
+            )
+            _compiled_users[self.id] = _compiled_entry(
+                self.__version, mask)
+        return mask
 
     def can(self, action: Permission) -> bool:
-        row = self._get()
-        if action.value in row.allowed:
-            return True
-        elif action.value in row.disallowed:
-            return False
-        else:
-            return self.parent.can(action)
+        return bool(self._compiled() & (1 << action.value))
 
     def value(self, action: Permission) -> Optional[bool]:
         """
@@ -358,7 +556,7 @@ class PermissionUser(PermissionSet):
           permissions to allow or disallow. Each Permission should be set to
           `True` to allow, `False` to disallow, or `None` to leave as default.
         """
-        row = get_by_id(TPermissionUser, self.__id)
+        row = self._get()
 
         allowed: list[int] = []
         disallowed: list[int] = []
@@ -376,6 +574,7 @@ class PermissionUser(PermissionSet):
 
         row.save([TPermissionGroup.allowed, TPermissionGroup.disallowed])\
             .run_sync()
+        self.__version = _invalidate_compiled()
 
 
 def map_permissions_group(
@@ -1,9 +1,8 @@
 """
 # Backend / Models / Piccolo migrations
 
-Contains code for migrating the database if we ever need to make breaking
-changes.
-
-We should only need to use this once we get things stable to the point where
-there are no breaking changes.
+Contains code for migrating the database when we need to make changes that
+`create_db_tables_sync` can't, such as adding constraints and indexes to
+existing tables. Migrations are run automatically by
+`backend.util.db_status.init`.
 """
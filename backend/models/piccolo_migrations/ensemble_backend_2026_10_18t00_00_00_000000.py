@@ -0,0 +1,79 @@
+"""
+# Backend / Models / Piccolo migrations / Answered foreign key
+
+Make `TPost.answered` a foreign key referencing `TComment`, with posts that
+aren't answered storing null rather than `0`.
+
+SQLite can't add constraints to existing columns, so the posts table is
+rebuilt following the procedure described at
+https://www.sqlite.org/lang_altertable.html. This needs to happen with
+foreign keys disabled, otherwise dropping the old table would delete every
+comment, so it is run directly rather than through a `MigrationManager`
+(which runs it within a transaction, where foreign keys can't be disabled).
+"""
+import re
+from backend.models.tables import TPost, TComment
+from backend.util.db_engine import PooledSQLiteEngine
+
+ID = "2026-10-18T00:00:00:000000"
+VERSION = "0.103.0"
+DESCRIPTION = "Make TPost.answered a foreign key"
+
+ANSWERED_COLUMN = (
+    f'"answered" INTEGER REFERENCES {TComment._meta.tablename} (id) '
+    'ON DELETE SET NULL ON UPDATE CASCADE DEFAULT null'
+)
+
+
+async def forwards():
+    engine = TPost._meta.db
+    assert isinstance(engine, PooledSQLiteEngine)
+    table = TPost._meta.tablename
+    with engine.connection() as connection:
+        foreign_keys = connection.execute(
+            f"PRAGMA foreign_key_list({table})").fetchall()
+        if any(fk["from"] == "answered" for fk in foreign_keys):
+            # Tables created after the migration was added already have the
+            # constraint
+            return
+        schema = connection.execute(
+            "SELECT sql FROM sqlite_master WHERE type = 'table' AND name = ?",
+            [table],
+        ).fetchone()["sql"]
+        indexes = [
+            row["sql"] for row in connection.execute(
+                "SELECT sql FROM sqlite_master "
+                "WHERE type = 'index' AND tbl_name = ? AND sql IS NOT NULL",
+                [table],
+            ).fetchall()
+        ]
+        new_schema = re.sub(
+            r'"answered" INTEGER[^,)]*',
+            ANSWERED_COLUMN,
+            schema,
+        ).replace(f"CREATE TABLE {table}", f"CREATE TABLE {table}_new", 1)
+
+        connection.execute("PRAGMA foreign_keys = 0")
+        try:
+            connection.execute("BEGIN")
+            connection.execute(new_schema)
+            connection.execute(
+                f"INSERT INTO {table}_new SELECT * FROM {table}")
+            connection.execute(
+                f"UPDATE {table}_new SET answered = NULL "
+                f"WHERE answered NOT IN (SELECT id FROM "
+                f"{TComment._meta.tablename})"
+            )
+            connection.execute(f"DROP TABLE {table}")
+            connection.execute(f"ALTER TABLE {table}_new RENAME TO {table}")
+            for index in indexes:
+                connection.execute(index)
+            if connection.execute("PRAGMA foreign_key_check").fetchall():
+                raise ValueError("Foreign key constraint failed")
+            connection.execute("COMMIT")
+        except BaseException:
+            if connection.in_transaction:
+                connection.execute("ROLLBACK")
+            raise
+        finally:
+            connection.execute("PRAGMA foreign_keys = 1")
@@ -0,0 +1,178 @@
+"""
+# Backend / Models / Piccolo migrations / Indexes
+
+Add indexes for columns that are frequently used for lookups, as well as
+unique constraints for names and for relationships that shouldn't be
+duplicated.
+
+Indexes on single columns use the same names that Piccolo gives the indexes
+declared in `tables.py`, so they aren't duplicated for new databases.
+
+Older versions allowed duplicate names, so these are resolved before adding
+the unique constraints:
+
+* Tags with the same name are merged into the oldest one
+* Queues with the same name (other than the oldest) are renamed to include
+  their ID
+* Users with the same username or email can't be resolved automatically,
+  since that would change how they log in, so the migration fails, listing
+  the conflicting users so that they can be fixed by hand
+"""
+from piccolo.apps.migrations.auto.migration_manager import MigrationManager
+from backend.models.tables import (
+    TPermissionUser,
+    TUser,
+    TQueue,
+    TQueueFollow,
+    TPost,
+    TTag,
+    TPostTags,
+    TComment,
+    TReply,
+    TPostReacts,
+    TCommentReacts,
+    TReplyReacts,
+    TToken,
+    TNotification,
+)
+
+ID = "2026-10-18T00:00:01:000000"
+VERSION = "0.103.0"
+DESCRIPTION = "Add indexes and unique constraints"
+
+INDEXES = [
+    (TPermissionUser, ["parent"]),
+    (TPost, ["author"]),
+    (TPost, ["queue"]),
+    (TComment, ["parent"]),
+    (TReply, ["parent"]),
+    (TToken, ["user"]),
+    (TNotification, ["user_to"]),
+]
+"""Tables and columns to index"""
+
+UNIQUE_INDEXES = [
+    (TUser, ["username"]),
+    (TUser, ["email"]),
+    (TQueue, ["name"]),
+    (TTag, ["name"]),
+]
+"""
+Tables and columns to add unique constraints to. Any duplicates are resolved
+first by `resolve_duplicates`.
+"""
+
+UNIQUE_RELATIONSHIPS = [
+    (TQueueFollow, ["queue", "user"]),
+    (TPostTags, ["post", "tag"]),
+    (TPostReacts, ["post", "user"]),
+    (TCommentReacts, ["comment", "user"]),
+    (TReplyReacts, ["reply", "user"]),
+]
+"""
+Relationship tables to add unique constraints to. Any duplicate rows are
+removed first, since they don't carry any extra information.
+"""
+
+
+def index_sql(table, columns: list[str], unique: bool) -> str:
+    """
+    Returns the SQL to create an index if it doesn't exist
+    """
+    name = "_".join([table._meta.tablename] + columns)
+    if unique:
+        name += "_unique"
+    column_list = ", ".join(f'"{c}"' for c in columns)
+    return (
+        f"CREATE {'UNIQUE ' if unique else ''}INDEX IF NOT EXISTS {name} "
+        f"ON {table._meta.tablename} ({column_list})"
+    )
+
+
+async def find_duplicates(table, column: str) -> dict[str, list[int]]:
+    """
+    Returns the values of a column that are shared by multiple rows, mapped
+    to the IDs of those rows in order
+    """
+    name = table._meta.tablename
+    rows = await table.raw(
+        f'SELECT "{column}" AS value, group_concat(id) AS ids FROM ('
+        f'SELECT "{column}", id FROM {name} WHERE "{column}" IN ('
+        f'SELECT "{column}" FROM {name} '
+        f'GROUP BY "{column}" HAVING count(*) > 1) '
+        f'ORDER BY id) '
+        f'GROUP BY "{column}" ORDER BY "{column}"'
+    ).run()
+    return {
+        r["value"]: [int(i) for i in r["ids"].split(",")]
+        for r in rows
+    }
+
+
+async def resolve_duplicates():
+    """
+    Resolve duplicate values in the columns given in `UNIQUE_INDEXES`
+
+    ### Raises:
+    * `ValueError`: users share a username or email
+    """
+    conflicts = [
+        f"{column} {value!r} is used by users {', '.join(map(str, ids))}"
+        for column in ["username", "email"]
+        for value, ids in (await find_duplicates(TUser, column)).items()
+    ]
+    if len(conflicts):
+        raise ValueError(
+            "Users must have unique usernames and emails. Change or remove "
+            "these users, then restart the server: " + "; ".join(conflicts)
+        )
+
+    tags = TTag._meta.tablename
+    post_tags = TPostTags._meta.tablename
+    for ids in (await find_duplicates(TTag, "name")).values():
+        keep, *merge = ids
+        merge_list = ", ".join(map(str, merge))
+        # Duplicate post tags that this creates are removed along with the
+        # other duplicate relationships
+        await TPostTags.raw(
+            f"UPDATE {post_tags} SET tag = {keep} WHERE tag IN ({merge_list})"
+        ).run()
+        await TTag.raw(
+            f"DELETE FROM {tags} WHERE id IN ({merge_list})").run()
+
+    queues = TQueue._meta.tablename
+    for ids in (await find_duplicates(TQueue, "name")).values():
+        _, *rename = ids
+        await TQueue.raw(
+            f"UPDATE {queues} SET name = name || ' (' || id || ')' "
+            f"WHERE id IN ({', '.join(map(str, rename))})"
+        ).run()
+
+
+async def create_indexes():
+    """
+    Create the indexes and unique constraints
+    """
+    for table, columns in INDEXES:
+        await table.raw(index_sql(table, columns, False)).run()
+    await resolve_duplicates()
+    for table, columns in UNIQUE_INDEXES:
+        await table.raw(index_sql(table, columns, True)).run()
+    for table, columns in UNIQUE_RELATIONSHIPS:
+        column_list = ", ".join(f'"{c}"' for c in columns)
+        await table.raw(
+            f"DELETE FROM {table._meta.tablename} WHERE id NOT IN ("
+            f"SELECT min(id) FROM {table._meta.tablename} "
+            f"GROUP BY {column_list})"
+        ).run()
+        await table.raw(index_sql(table, columns, True)).run()
+
+
+async def forwards():
+    manager = MigrationManager(
+        migration_id=ID,
+        app_name="ensemble_backend",
+        description=DESCRIPTION,
+    )
+    manager.add_raw(create_indexes)
+    return manager
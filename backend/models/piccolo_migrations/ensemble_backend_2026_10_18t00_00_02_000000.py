@@ -0,0 +1,38 @@
+"""
+# Backend / Models / Piccolo migrations / Reaction counters
+
+Add columns counting the reactions to each post, comment and reply, then
+fill them in using the existing reactions.
+"""
+from piccolo.apps.migrations.auto.migration_manager import MigrationManager
+from backend.models.reactions import COUNTERS, repair_sql
+
+ID = "2026-10-18T00:00:02:000000"
+VERSION = "0.103.0"
+DESCRIPTION = "Add reaction counters"
+
+
+async def forwards():
+    manager = MigrationManager(
+        migration_id=ID,
+        app_name="ensemble_backend",
+        description=DESCRIPTION,
+    )
+
+    async def run():
+        for counter in COUNTERS:
+            table = counter.counter._meta.table
+            column = counter.counter._meta.db_column_name
+            columns = await table.raw(
+                f"PRAGMA table_info({table._meta.tablename})").run()
+            # Tables created after the migration was added already have the
+            # column
+            if all(c["name"] != column for c in columns):
+                await table.raw(
+                    f'ALTER TABLE {table._meta.tablename} '
+                    f'ADD COLUMN "{column}" INTEGER NOT NULL DEFAULT 0'
+                ).run()
+            await table.raw(repair_sql(counter)).run()
+
+    manager.add_raw(run)
+    return manager
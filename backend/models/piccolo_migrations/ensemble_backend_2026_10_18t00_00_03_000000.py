@@ -0,0 +1,35 @@
+"""
+# Backend / Models / Piccolo migrations / Notification occurrences
+
+Add a column counting how many times each notification was sent, so that
+similar notifications can be merged together.
+"""
+from piccolo.apps.migrations.auto.migration_manager import MigrationManager
+from backend.models.tables import TNotification
+
+ID = "2026-10-18T00:00:03:000000"
+VERSION = "0.103.0"
+DESCRIPTION = "Add TNotification.occurrences"
+
+
+async def forwards():
+    manager = MigrationManager(
+        migration_id=ID,
+        app_name="ensemble_backend",
+        description=DESCRIPTION,
+    )
+
+    async def run():
+        table = TNotification._meta.tablename
+        column = TNotification.occurrences._meta.db_column_name
+        columns = await TNotification.raw(f"PRAGMA table_info({table})").run()
+        # Tables created after the migration was added already have the
+        # column
+        if all(c["name"] != column for c in columns):
+            await TNotification.raw(
+                f'ALTER TABLE {table} '
+                f'ADD COLUMN "{column}" INTEGER NOT NULL DEFAULT 1'
+            ).run()
+
+    manager.add_raw(run)
+    return manager
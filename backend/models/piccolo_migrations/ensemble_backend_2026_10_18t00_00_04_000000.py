@@ -0,0 +1,43 @@
+"""
+# Backend / Models / Piccolo migrations / Token expiry
+
+Add a column storing when each token expires. Tokens created before this
+migration don't have an expiry in their JWT, so they are deleted, meaning
+that everyone needs to log in again.
+"""
+from piccolo.apps.migrations.auto.migration_manager import MigrationManager
+from backend.models.tables import TToken
+
+ID = "2026-10-18T00:00:04:000000"
+VERSION = "0.103.0"
+DESCRIPTION = "Add TToken.expires"
+
+
+async def forwards():
+    manager = MigrationManager(
+        migration_id=ID,
+        app_name="ensemble_backend",
+        description=DESCRIPTION,
+    )
+
+    async def run():
+        table = TToken._meta.tablename
+        column = TToken.expires._meta.db_column_name
+        columns = await TToken.raw(f"PRAGMA table_info({table})").run()
+        # Tables created after the migration was added already have the
+        # column
+        if all(c["name"] != column for c in columns):
+            await TToken.raw(f"DELETE FROM {table}").run()
+            # SQLite doesn't allow adding columns that default to the current
+            # time, but there aren't any rows left to give a value to anyway
+            await TToken.raw(
+                f'ALTER TABLE {table} ADD COLUMN "{column}" TIMESTAMP '
+                f"NOT NULL DEFAULT '1970-01-01 00:00:00'"
+            ).run()
+        await TToken.raw(
+            f'CREATE INDEX IF NOT EXISTS {table}_{column} '
+            f'ON {table} ("{column}")'
+        ).run()
+
+    manager.add_raw(run)
+    return manager
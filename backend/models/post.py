@@ -1,19 +1,30 @@
 """
 # Backend / Models / Post
 """
-from .tables import TComment, TPost, TPostReacts, TPostTags
+from .tables import TComment, TPost, TPostReacts, TPostTags, TReply
 from .user import User
 from .tag import Tag
 from .comment import Comment
+from .reply import Reply
 from .post_queue import Queue
 from .permissions import Permission
-from backend.util.db_queries import get_by_id, assert_id_exists
+from .search_index import SearchIndex
+from .reactions import POST_COUNTER, toggle_reaction
+from backend.util.db_queries import bulk_insert, get_by_id
 from backend.util.validators import assert_valid_str_field
-from backend.types.identifiers import PostId, CommentId
-from backend.types.post import IPostBasicInfo, IPostFullInfo
-from typing import cast
+from backend.types.identifiers import (
+    PostId,
+    CommentId,
+    TagId,
+    UserId,
+    QueueId,
+)
+from backend.types.post import IPostBasicInfo, IPostFullInfo, IPostThread
+from typing import cast, Optional
 from datetime import datetime
-from fuzzywuzzy import fuzz  # type: ignore
+from piccolo.query.methods.insert import Insert
+from piccolo.columns.combination import Combinable
+from piccolo.query.methods.objects import Objects
 
 
 class Post:
@@ -31,8 +42,32 @@ class Post:
         ### Raises:
         * `IdNotFound`: post does not exist
         """
-        assert_id_exists(TPost, id, "Post")
         self.__id = id
+        self.__row = get_by_id(TPost, id, "Post")
+
+    @classmethod
+    def from_row(cls, row: TPost) -> "Post":
+        """
+        Create a post object from a row that has already been loaded from the
+        database, without performing any additional queries
+
+        ### Args:
+        * `row` (`TPost`): row in the posts table
+
+        ### Returns:
+        * `Post`: the post object
+        """
+        post = cls.__new__(cls)
+        post.__id = PostId(row.id)
+        post.__row = row
+        return post
+
+    def refresh(self) -> None:
+        """
+        Reload the post's info from the database, discarding the existing
+        snapshot
+        """
+        self.__row = get_by_id(TPost, self.__id, "Post")
 
     @classmethod
     def create(
@@ -77,14 +112,10 @@ class Post:
             .run_sync()[0]
         )
         id = cast(PostId, val["id"])
+        SearchIndex.update_post(id)
         p = Post(id)
-        for t in tags:
-            TPostTags(
-                {
-                    TPostTags.post: id,
-                    TPostTags.tag: t.id,
-                }
-            ).save().run_sync()
+        for query in p.__insert_tags(tags):
+            query.run_sync()
         return p
 
     @classmethod
@@ -96,8 +127,8 @@ class Post:
         * `list[Post]`: list of posts
         """
         return [
-            Post(p["id"]) for p in
-            TPost.select().order_by(TPost.id, ascending=False).run_sync()
+            Post.from_row(p) for p in
+            TPost.objects().order_by(TPost.id, ascending=False).run_sync()
         ]
 
     def can_view(self, user: User) -> bool:
@@ -112,37 +143,108 @@ class Post:
         return True
 
     @classmethod
-    def can_view_list(cls, user: User) -> list["Post"]:
+    def can_view_list(
+        cls,
+        user: User,
+        limit: Optional[int] = None,
+        before_id: Optional[PostId] = None,
+    ) -> list["Post"]:
         """
         Returns a list of posts that the given user has permissions to view
+        in order of newest to oldest
+
+        The visibility of posts is checked within the database query, so only
+        the requested page of posts is loaded.
+
+        ### Args:
+        * `user` (`User`): user viewing the posts
+
+        * `limit` (`Optional[int]`, optional): maximum number of posts to
+          return. Defaults to `None` (no limit).
+
+        * `before_id` (`Optional[PostId]`, optional): only return posts older
+          than the post with this ID, used to fetch the next page of posts.
+          Defaults to `None` (start from the newest post).
+
         ### Returns:
         * `list[Post]`: list of posts
         """
-        permitted_list = [p for p in cls.all() if p.can_view(user)]
+        query = cls._visible_query(user)
+        if before_id is not None:
+            query = query.where(TPost.id < before_id)
+        if limit is not None:
+            query = query.limit(limit)
+        return [Post.from_row(p) for p in query.run_sync()]
+
+    @classmethod
+    def _visible_condition(cls, user: User) -> Optional[Combinable]:
+        """
+        Returns the condition for posts that the given user has permissions
+        to view, or `None` if they can view every post
+        """
+        if user.permissions.can(Permission.ViewPrivate):
+            return None
+        hidden_queues = [
+            Queue.get_closed_queue().id,
+            Queue.get_deleted_queue().id,
+        ]
+        return (
+            (
+                (TPost.private == False)  # noqa: E712
+                & TPost.queue.not_in(hidden_queues)
+            )
+            | (TPost.author == user.id)
+        )
 
-        return permitted_list
+    @classmethod
+    def _visible_query(cls, user: User) -> Objects:
+        """
+        Returns a query for all posts that the given user has permissions to
+        view, in order of newest to oldest
+        """
+        query = TPost.objects().order_by(TPost.id, ascending=False)
+        condition = cls._visible_condition(user)
+        if condition is not None:
+            query = query.where(condition)
+        return query
 
     @classmethod
-    def search_posts(cls, user: User, search_term: str) -> list["Post"]:
+    def search_posts(
+        cls,
+        user: User,
+        search_term: str,
+        limit: Optional[int] = None,
+        offset: int = 0,
+    ) -> list["Post"]:
         """
-        Returns a list of posts that match the search term
+        Returns a list of posts whose heading, text, comments or replies
+        match the search term, in order of how well they match
+
+        ### Args:
+        * `user` (`User`): user searching for posts
+
+        * `search_term` (`str`): term to search for
+
+        * `limit` (`Optional[int]`, optional): maximum number of posts to
+          return. Defaults to `None` (no limit).
+
+        * `offset` (`int`, optional): number of matching posts to skip, used
+          to fetch the next page of results. Defaults to `0`.
+
         ### Returns:
         * `list[Post]`: list of posts
         """
-        def sim_score(post: Post, search_term: str):
-            return (
-                fuzz.partial_ratio(post.heading, search_term) +
-                fuzz.partial_ratio(post.text, search_term)
-            ) / 2
-
-        matches = []
-        min_score = 35
-        for p in cls.can_view_list(user):
-            score = sim_score(p, search_term)
-            if score >= min_score:  # Filter out terrible matches
-                matches.append((p, score))
-        matches = sorted(matches, key=lambda x: (-x[1], -x[0].id))
-        return [p for p, _ in matches]
+        ranked = SearchIndex.search(
+            search_term,
+            cls._visible_condition(user),
+            limit,
+            offset,
+        )
+        if len(ranked) == 0:
+            return []
+        rows = TPost.objects().where(TPost.id.is_in(ranked)).run_sync()
+        posts = {p.id: Post.from_row(p) for p in rows}
+        return [posts[i] for i in ranked]
 
     @property
     def comments(self) -> list["Comment"]:
@@ -153,16 +255,17 @@ class Post:
         * `list[Comment]`: list of comments
         """
         comments = [
-            Comment(c["id"])
-            for c in TComment.select()
+            Comment.from_row(c)
+            for c in TComment.objects()
             .where(TComment.parent == self.__id)
             .order_by(TComment.id)
             .run_sync()
         ]
 
+        answered = self._get().answered
         return sorted(
             comments,
-            key=lambda x: (not x.accepted, -x.thanks, x.id)
+            key=lambda x: (x.id != answered, -x.thanks, x.id)
         )
 
     def delete(self):
@@ -176,20 +279,20 @@ class Post:
         """
         Whether this post is deleted or not
         """
-        return self.queue == Queue.get_deleted_queue()
+        return self._queue_id == Queue.get_deleted_queue().id
 
     @property
     def reported(self) -> bool:
         """
         Whether this post is reported or not
         """
-        return self.queue == Queue.get_reported_queue()
+        return self._queue_id == Queue.get_reported_queue().id
 
     def _get(self) -> TPost:
         """
-        Return a reference to the underlying database row
+        Return a reference to the snapshot of the underlying database row
         """
-        return get_by_id(TPost, self.__id)
+        return self.__row
 
     @property
     def id(self) -> PostId:
@@ -210,7 +313,8 @@ class Post:
         assert_valid_str_field(new_heading, "new heading")
         row = self._get()
         row.heading = new_heading
-        row.save().run_sync()
+        row.save([TPost.heading]).run_sync()
+        SearchIndex.update_post(self.id)
 
     @property
     def answered(self) -> Comment | None:
@@ -233,7 +337,7 @@ class Post:
             row.answered = comment.id
         else:
             row.answered = None
-        row.save().run_sync()
+        row.save([TPost.answered]).run_sync()
 
     @property
     def text(self) -> str:
@@ -247,7 +351,8 @@ class Post:
         assert_valid_str_field(new_text, "post")
         row = self._get()
         row.text = new_text
-        row.save().run_sync()
+        row.save([TPost.text]).run_sync()
+        SearchIndex.update_post(self.id)
 
     @property
     def author(self) -> "User":
@@ -273,7 +378,15 @@ class Post:
     def queue(self, new_queue: "Queue"):
         row = self._get()
         row.queue = new_queue.id
-        row.save().run_sync()
+        row.save([TPost.queue]).run_sync()
+
+    @property
+    def _queue_id(self) -> QueueId:
+        """
+        Identifier of the queue that the post belongs in, which can be
+        compared without loading the queue
+        """
+        return QueueId(self._get().queue)
 
     @property
     def tags(self) -> list[Tag]:
@@ -286,9 +399,9 @@ class Post:
         * list[Tag]: list of tags
         """
         tags = [
-            Tag(t["tag"])
+            Tag.from_row(t.tag)
             for t in
-            TPostTags.select().where(
+            TPostTags.objects(TPostTags.tag).where(
                 TPostTags.post == self.id
             ).run_sync()
         ]
@@ -296,14 +409,30 @@ class Post:
 
     @tags.setter
     def tags(self, new_tags: list[Tag]):
-        TPostTags.delete().where(TPostTags.post == self.id).run_sync()
-        for t in new_tags:
-            TPostTags(
-                {
-                    TPostTags.post: self.id,
-                    TPostTags.tag: t.id,
-                }
-            ).save().run_sync()
+        transaction = TPostTags._meta.db.atomic()
+        transaction.add(
+            TPostTags.delete().where(TPostTags.post == self.id))
+        for query in self.__insert_tags(new_tags):
+            transaction.add(query)
+        transaction.run_sync()
+
+    def __insert_tags(self, tags: list[Tag]) -> list[Insert]:
+        """
+        Returns queries that attach the given tags to this post
+
+        ### Args:
+        * `tags` (`list[Tag]`): tags to attach
+
+        ### Returns:
+        * `list[Insert]`: queries to run (in a transaction)
+        """
+        return bulk_insert(TPostTags, [
+            TPostTags({
+                TPostTags.post: self.id,
+                TPostTags.tag: t.id,
+            })
+            for t in tags
+        ])
 
     @property
     def me_too(self) -> int:
@@ -313,10 +442,7 @@ class Post:
         ### Returns:
         * int: number of 'me too' reacts
         """
-        return cast(
-            int,
-            TPostReacts.count().where(TPostReacts.post == self.id).run_sync()
-        )
+        return self._get().me_too
 
     def has_reacted(self, user: User) -> bool:
         """
@@ -329,24 +455,20 @@ class Post:
                    TPostReacts.user == user.id).run_sync()
         )
 
-    def react(self, user: User):
+    def react(self, user: User) -> bool:
         """
         React to the post if the user has not reacted to the post
         Unreact to the post if the user has reacted to the post
 
         ### Args:
         * `user` (`User`): User reacting/un-reacting to the post
+
+        ### Returns:
+        * `bool`: whether the user has now reacted to the post
         """
-        if not self.has_reacted(user):
-            TPostReacts(
-                {
-                    TPostReacts.user: user.id,
-                    TPostReacts.post: self.id,
-                }
-            ).save().run_sync()
-        else:
-            TPostReacts.delete().where(TPostReacts.user == user.id,
-                                       TPostReacts.post == self.id).run_sync()
+        reacted, count = toggle_reaction(POST_COUNTER, self.id, user.id)
+        self._get().me_too = count
+        return reacted
 
     @property
     def timestamp(self) -> datetime:
@@ -372,7 +494,7 @@ class Post:
     def private(self, new_private: bool):
         row = self._get()
         row.private = new_private
-        row.save().run_sync()
+        row.save([TPost.private]).run_sync()
 
     @property
     def anonymous(self) -> bool:
@@ -388,7 +510,7 @@ class Post:
     def anonymous(self, new_anonymous: bool):
         row = self._get()
         row.anonymous = new_anonymous
-        row.save().run_sync()
+        row.save([TPost.anonymous]).run_sync()
 
     @property
     def closed(self) -> bool:
@@ -398,7 +520,7 @@ class Post:
         ### Returns:
         * bool: closed
         """
-        return self.queue == Queue.get_closed_queue()
+        return self._queue_id == Queue.get_closed_queue().id
 
     def closed_toggle(self):
         """
@@ -440,19 +562,76 @@ class Post:
         ### Returns:
         * IPostBasicInfo: Dictionary containing basic info a post
         """
-        return {
-            "author": self.author.id if self.can_view_op(user) else None,
-            "heading": self.heading,
-            "post_id": PostId(self.id),
-            "tags": [t.id for t in self.tags],
-            "me_too": self.me_too,
-            "private": self.private,
-            "closed": self.closed,
-            "deleted": self.deleted,
-            "reported": self.reported_perspective(user),
-            "anonymous": self.anonymous,
-            "answered": self.answered is not None,
-        }
+        return Post.basic_info_list([self], user)[0]
+
+    @classmethod
+    def basic_info_list(
+        cls,
+        posts: list["Post"],
+        user: User,
+    ) -> list[IPostBasicInfo]:
+        """
+        Returns the basic info of many posts at once.
+
+        Rather than looking up the info for each post individually, this uses
+        a fixed number of queries no matter how many posts are given, so it
+        should be preferred when listing posts.
+
+        ### Args:
+        * `posts` (`list[Post]`): posts to get the info of
+
+        * `user` (`User`): user viewing the posts
+
+        ### Returns:
+        * `list[IPostBasicInfo]`: basic info of each post, in the same order
+          as the given posts
+        """
+        if len(posts) == 0:
+            return []
+        ids = [p.id for p in posts]
+
+        # Permissions of the viewer only need to be checked once
+        can_view_op = user.permissions.can(Permission.ViewAnonymousOP)
+        can_view_reports = user.permissions.can(Permission.ViewReports)
+
+        deleted_queue = Queue.get_deleted_queue().id
+        closed_queue = Queue.get_closed_queue().id
+        reported_queue = Queue.get_reported_queue().id
+
+        # Ordered by name so that each post's tags are sorted alphabetically
+        tags: dict[int, list[TagId]] = {i: [] for i in ids}
+        for r in TPostTags.select(
+            TPostTags.post,
+            TPostTags.tag,
+        ).where(
+            TPostTags.post.is_in(ids)
+        ).order_by(
+            TPostTags.tag.name
+        ).run_sync():
+            tags[r["post"]].append(TagId(r["tag"]))
+
+        def info(post: Post) -> IPostBasicInfo:
+            row = post._get()
+            show_author = (
+                not row.anonymous
+                or row.author == user.id
+                or can_view_op
+            )
+            return {
+                "author": UserId(row.author) if show_author else None,
+                "heading": row.heading,
+                "post_id": post.id,
+                "tags": tags[post.id],
+                "me_too": row.me_too,
+                "private": row.private,
+                "closed": row.queue == closed_queue,
+                "deleted": row.queue == deleted_queue,
+                "reported": row.queue == reported_queue and can_view_reports,
+                "anonymous": row.anonymous,
+                "answered": bool(row.answered),
+            }
+
+        return [info(p) for p in posts]
 
     def full_info(self, user: User) -> IPostFullInfo:
         """
@@ -461,21 +640,63 @@ class Post:
         ### Returns:
         * IPostFullInfo: Dictionary containing full info a post
         """
+        return self.__full_info(user, self.comments)
+
+    def __full_info(
+        self,
+        user: User,
+        comments: list[Comment],
+    ) -> IPostFullInfo:
+        """
+        Returns the full info of a post, given its comments in sorted order
+        """
+        row = self._get()
         return {
             "post_id": self.id,
-            "author": self.author.id if self.can_view_op(user) else None,
-            "heading": self.heading,
+            "author": UserId(row.author) if self.can_view_op(user) else None,
+            "heading": row.heading,
             "tags": [t.id for t in self.tags],
-            "me_too": self.me_too,
-            "text": self.text,
-            "timestamp": int(self.timestamp.timestamp()),
-            "comments": [c.id for c in self.comments],
-            "private": self.private,
-            "anonymous": self.anonymous,
+            "me_too": row.me_too,
+            "text": row.text,
+            "timestamp": int(row.timestamp.timestamp()),
+            "comments": [c.id for c in comments],
+            "private": row.private,
+            "anonymous": row.anonymous,
             "closed": self.closed,
             "deleted": self.deleted,
             "reported": self.reported_perspective(user),
             "user_reacted": self.has_reacted(user),
-            "answered": self.answered.id if self.answered else None,
+            "answered": CommentId(row.answered) if row.answered else None,
             "queue": self.queue.name
         }
+
+    def thread(self, user: User) -> IPostThread:
+        """
+        Returns the full info of a post, along with the full info of all its
+        comments and all their replies.
+
+        The comments and replies are each loaded using a handful of queries,
+        regardless of how many there are.
+
+        ### Args:
+        * `user` (`User`): user viewing the post
+
+        ### Returns:
+        * `IPostThread`: info of the post, its comments and their replies
+        """
+        comments = self.comments
+        if len(comments):
+            replies = [
+                Reply.from_row(r)
+                for r in TReply.objects()
+                .where(TReply.parent.is_in([c.id for c in comments]))
+                .order_by(TReply.id)
+                .run_sync()
+            ]
+        else:
+            replies = []
+        return {
+            "post": self.__full_info(user, comments),
+            "comments": Comment.full_info_list(comments, user),
+            "replies": Reply.full_info_list(replies, user),
+        }
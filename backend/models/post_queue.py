@@ -1,19 +1,40 @@
 """
 # Backend / Models / Queue
 """
+import sqlite3
 from .tables import TQueue, TQueueFollow, TPost
-from backend.util.db_queries import assert_id_exists, get_by_id
+from backend.util.db_queries import bulk_update, get_by_id
 from backend.types.identifiers import QueueId
 from backend.util.validators import assert_valid_str_field
 from backend.util import http_errors
-from backend.types.queue import IQueueFullInfo, IQueueBasicInfo
+from backend.types.queue import (
+    IQueueFullInfo,
+    IQueueBasicInfo,
+    IQueueBoard,
+    IQueueBoardInfo,
+)
 from resources import consts
-from typing import cast, TYPE_CHECKING
+from typing import cast, Optional, TYPE_CHECKING
 from .user import User
 if TYPE_CHECKING:
     from .post import Post
 
 
+SYSTEM_QUEUES = (
+    consts.MAIN_QUEUE,
+    consts.REPORTED_QUEUE,
+    consts.CLOSED_QUEUE,
+    consts.ANSWERED_QUEUE,
+    consts.DELETED_QUEUE,
+)
+"""Names of the immutable queues created when the forum is set up"""
+
+# Rows of the system queues that have already been looked up, by name. These
+# queues can't be renamed or deleted, so their rows never change until the
+# database is cleared, at which point `Queue.clear_cache` must be called.
+_system_queues: dict[str, TQueue] = {}
+
+
 class Queue:
     """
     Represents a queue
@@ -30,14 +51,38 @@ class Queue:
         ### Raises:
         `IdNotFound`: queue does not exist
         """
-        assert_id_exists(TQueue, id, "Queue")
         self.__id = id
+        self.__row = get_by_id(TQueue, id, "Queue")
+
+    @classmethod
+    def from_row(cls, row: TQueue) -> "Queue":
+        """
+        Create a queue object from a row that has already been loaded from the
+        database, without performing any additional queries
+
+        ### Args:
+        * `row` (`TQueue`): row in the queues table
+
+        ### Returns:
+        * `Queue`: the queue object
+        """
+        queue = cls.__new__(cls)
+        queue.__id = QueueId(row.id)
+        queue.__row = row
+        return queue
+
+    def refresh(self) -> None:
+        """
+        Reload the queue's info from the database, discarding the existing
+        snapshot
+        """
+        self.__row = get_by_id(TQueue, self.__id, "Queue")
 
     def _get(self) -> TQueue:
         """
-        Return a reference to the underlying database row
+        Return a reference to the snapshot of the underlying database row
         """
-        return get_by_id(TQueue, self.__id)
+        return self.__row
 
     @property
     def id(self) -> QueueId:
@@ -66,21 +111,23 @@ class Queue:
         """
         assert_valid_str_field(name, "queue name")
 
-        if name in (q.name for q in cls.all()):
+        # Names are unique within the database, so we don't need to check
+        # every other queue first
+        try:
+            val = (
+                TQueue(
+                    {
+                        TQueue.name: name,
+                        TQueue.immutable: immutable,
+                        TQueue.view_only: view_only
+                    }
+                )
+                .save()
+                .run_sync()[0]
+            )
+        except sqlite3.IntegrityError:
             raise http_errors.BadRequest(
                 "There is already a queue with that name")
-
-        val = (
-            TQueue(
-                {
-                    TQueue.name: name,
-                    TQueue.immutable: immutable,
-                    TQueue.view_only: view_only
-                }
-            )
-            .save()
-            .run_sync()[0]
-        )
         id = cast(QueueId, val["id"])
         return Queue(id)
 
@@ -100,14 +147,17 @@ class Queue:
     @name.setter
     def name(self, new_name: str):
         assert_valid_str_field(new_name, "queue name")
-        if new_name in (q.name for q in self.all() if q.id != self.id):
-            raise http_errors.BadRequest(
-                "There is already a queue with that name")
         row = self._get()
         if row.immutable:
             raise http_errors.BadRequest('Cannot rename immutable queues')
+        old_name = row.name
         row.name = new_name
-        row.save().run_sync()
+        try:
+            row.save([TQueue.name]).run_sync()
+        except sqlite3.IntegrityError:
+            row.name = old_name
+            raise http_errors.BadRequest(
+                "There is already a queue with that name")
 
     def following(self, user: "User") -> bool:
         """
@@ -127,16 +177,21 @@ class Queue:
         Toggle whether the user is following the queue or not
         """
         if not self.following(user):
-            TQueueFollow({
-                TQueueFollow.queue: self.id,
-                TQueueFollow.user: user.id
-            }).save().run_sync()
+            try:
+                TQueueFollow({
+                    TQueueFollow.queue: self.id,
+                    TQueueFollow.user: user.id
+                }).save().run_sync()
+            except sqlite3.IntegrityError:
+                # Another request followed the queue at the same time, so
+                # they are already following it
+                pass
         else:
             TQueueFollow\
                 .delete()\
                 .where(
-                    TQueueFollow.queue == self.id
-                    and TQueueFollow.user == user.id
+                    (TQueueFollow.queue == self.id)
+                    & (TQueueFollow.user == user.id)
                 ).run_sync()
 
     def get_followers(self) -> list["User"]:
@@ -144,9 +199,9 @@ class Queue:
         Return the list of users following this queue
         """
         return [
-            User(follow_ref.user)
+            User.from_row(follow_ref.user)
             for follow_ref in TQueueFollow
-            .objects()
+            .objects(TQueueFollow.user)
             .where(TQueueFollow.queue == self.id)
             .run_sync()
         ]
@@ -164,32 +219,50 @@ class Queue:
         Get the list of all available queues
         """
         # IDEA: custom ordering of queues in the future
-        main_queue = [
-            Queue(q.id)
-            for q in TQueue.objects()
-            .where(TQueue.name == consts.MAIN_QUEUE)  # noqa: E712
-            .run_sync()
-        ]
-        view_only_queues = [
-            Queue(q.id)
-            for q in TQueue.objects()
-            .where(TQueue.view_only == True)  # noqa: E712
-            .run_sync()
-        ]
-        specialised_queues = [
-            Queue(q.id)
-            for q in TQueue.objects()
-            .where(TQueue.immutable == False)  # noqa: E712
-            .order_by(TQueue.name)
-            .run_sync()
+        # There are only ever a few queues, so load them all at once and sort
+        # them here
+        rows = TQueue.objects().order_by(TQueue.id).run_sync()
+        main_queue = [q for q in rows if q.name == consts.MAIN_QUEUE]
+        view_only_queues = [q for q in rows if q.view_only]
+        specialised_queues = sorted(
+            (q for q in rows if not q.immutable),
+            key=lambda q: cast(str, q.name),
+        )
+        return [
+            Queue.from_row(q)
+            for q in main_queue + specialised_queues + view_only_queues
         ]
-        return main_queue + specialised_queues + view_only_queues
 
     @classmethod
     def get_queue(cls, queue_name: str) -> "Queue":
-        q = TQueue.objects()\
-            .where(TQueue.name == queue_name).first().run_sync()
-        return Queue(q.id)
+        """
+        Gets a queue by its name
+
+        The system queues are only looked up the first time they are
+        requested, after which they are served from a cache.
+
+        ### Args:
+        * `queue_name` (`str`): name of the queue
+
+        ### Returns:
+        * `Queue`: the queue
+        """
+        q = _system_queues.get(queue_name)
+        if q is None:
+            q = TQueue.objects()\
+                .where(TQueue.name == queue_name).first().run_sync()
+            if q is not None and queue_name in SYSTEM_QUEUES:
+                _system_queues[queue_name] = q
+        return Queue.from_row(q)
+
+    @classmethod
+    def clear_cache(cls) -> None:
+        """
+        Forget the cached system queues, so that they are looked up again
+        next time they are requested. This must be called whenever the
+        system queues are recreated.
+        """
+        _system_queues.clear()
 
     @classmethod
     def get_main_queue(cls) -> "Queue":
@@ -241,18 +314,32 @@ class Queue:
         """
         return cls.get_queue(consts.REPORTED_QUEUE)
 
-    def posts(self) -> list["Post"]:
+    def posts(self, user: Optional["User"] = None) -> list["Post"]:
         """
         List of all posts in the given queue
         Posts are sorted from oldest to newest
 
+        ### Args:
+        * `user` (`Optional[User]`, optional): only list the posts that this
+          user can view, in the same way as `board`. Defaults to `None` (list
+          every post).
+
         ### Returns:
         * `list[Post]`: posts
         """
         from .post import Post
+        if user is not None:
+            return [
+                Post.from_row(p)
+                for p in reversed(
+                    Post._visible_query(user)
+                    .where(TPost.queue == self.id)
+                    .run_sync()
+                )
+            ]
         return [
-            Post(c["id"])
-            for c in TPost.select()
+            Post.from_row(c)
+            for c in TPost.objects()
             .where(TPost.queue == self.id)
             .order_by(TPost.id, ascending=True)
             .run_sync()
@@ -268,15 +355,25 @@ class Queue:
         row = self._get()
         if row.immutable:
             raise http_errors.BadRequest('Cannot delete immutable queues')
-        # Send posts back to original queue
+        # Send posts back to original queue, using a single query rather than
+        # saving each post, and making sure that deleting the queue can't
+        # happen without the posts being moved
         main_queue = self.get_main_queue()
-        for p in self.posts():
-            p.queue = main_queue
-        TQueue.delete().where(TQueue.id == self.id).run_sync()
+        transaction = TQueue._meta.db.atomic()
+        transaction.add(
+            bulk_update(
+                TPost,
+                {TPost.queue: main_queue.id},
+                TPost.queue == self.id,
+            ),
+            TQueue.delete().where(TQueue.id == self.id),
+        )
+        transaction.run_sync()
 
     def full_info(self, user: "User") -> IQueueFullInfo:
         """
-        Returns the full info of a queue
+        Returns the full info of a queue, listing the posts in it that the
+        user can view
 
         ### Returns:
         * IPostFullInfo: Dictionary containing full info a queue
@@ -286,7 +383,7 @@ class Queue:
             "queue_name": self.name,
             "view_only": self.view_only,
             "following": self.following(user),
-            "posts": [c.id for c in self.posts()],
+            "posts": [c.id for c in self.posts(user)],
         }
 
     def basic_info(self, user: "User") -> IQueueBasicInfo:
@@ -296,9 +393,74 @@ class Queue:
         ### Returns:
         * IPostBasicInfo: Dictionary containing full info a queue
         """
-        return {
-            "queue_id": self.id,
-            "queue_name": self.name,
-            "view_only": self.view_only,
-            "following": self.following(user),
+        return Queue.basic_info_list([self], user)[0]
+
+    @classmethod
+    def basic_info_list(
+        cls,
+        queues: list["Queue"],
+        user: "User",
+    ) -> list[IQueueBasicInfo]:
+        """
+        Returns the basic info of many queues at once, looking up which of
+        them the user follows using a single query
+
+        ### Args:
+        * `queues` (`list[Queue]`): queues to get the info of
+
+        * `user` (`User`): user viewing the queues
+
+        ### Returns:
+        * `list[IQueueBasicInfo]`: basic info of each queue, in the same order
+          as the given queues
+        """
+        if len(queues) == 0:
+            return []
+        followed = {
+            r["queue"]
+            for r in TQueueFollow.select(TQueueFollow.queue).where(
+                (TQueueFollow.user == user.id)
+                & TQueueFollow.queue.is_in([q.id for q in queues])
+            ).run_sync()
         }
+        return [
+            {
+                "queue_id": q.id,
+                "queue_name": q.name,
+                "view_only": q.view_only,
+                "following": q.id in followed,
+            }
+            for q in queues
+        ]
+
+    @classmethod
+    def board(cls, user: "User") -> IQueueBoard:
+        """
+        Returns every queue along with the basic info of the posts in it that
+        the user can view, as shown on the taskboard.
+
+        This uses a fixed number of queries, no matter how many queues and
+        posts there are.
+
+        ### Args:
+        * `user` (`User`): user viewing the taskboard
+
+        ### Returns:
+        * `IQueueBoard`: queues and their posts
+        """
+        from .post import Post
+        # Posts are listed from oldest to newest within each queue
+        posts = [
+            Post.from_row(p)
+            for p in reversed(Post._visible_query(user).run_sync())
+        ]
+        queue_posts: dict[QueueId, list] = {}
+        for p, info in zip(posts, Post.basic_info_list(posts, user)):
+            queue_posts.setdefault(p._get().queue, []).append(info)
+        return {"queues": [
+            cast(IQueueBoardInfo, {
+                **info,
+                "posts": queue_posts.get(info["queue_id"], []),
+            })
+            for info in cls.basic_info_list(cls.all(), user)
+        ]}
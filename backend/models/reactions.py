@@ -0,0 +1,151 @@
+"""
+# Backend / Models / Reactions
+
+Helpers for reacting to posts, comments and replies.
+
+The number of reactions to each post, comment and reply is stored in a
+counter column on its row, so that it doesn't need to be counted every time
+it is shown. The counters are updated in the same transaction as the
+reactions themselves, but can be recalculated using `repair_counters` if they
+ever get out of sync (for example if a user who reacted is removed).
+"""
+from typing import NamedTuple
+from piccolo.columns import Column
+from .tables import (
+    TPost,
+    TComment,
+    TReply,
+    TPostReacts,
+    TCommentReacts,
+    TReplyReacts,
+)
+from backend.util.db_engine import PooledSQLiteEngine
+
+
+class ReactionCounter(NamedTuple):
+    """
+    Describes where reactions to a type of object are stored, and where they
+    are counted
+    """
+
+    target: Column
+    """Column of the reactions table referencing the object reacted to"""
+
+    counter: Column
+    """Column storing the number of reactions to each object"""
+
+    @property
+    def reacts_table(self) -> str:
+        return self.target._meta.table._meta.tablename
+
+    @property
+    def counted_table(self) -> str:
+        return self.counter._meta.table._meta.tablename
+
+
+POST_COUNTER = ReactionCounter(TPostReacts.post, TPost.me_too)
+"""'Me too' reactions to posts"""
+
+COMMENT_COUNTER = ReactionCounter(TCommentReacts.comment, TComment.thanks)
+"""'Thanks' reactions to comments"""
+
+REPLY_COUNTER = ReactionCounter(TReplyReacts.reply, TReply.thanks)
+"""'Thanks' reactions to replies"""
+
+COUNTERS = (POST_COUNTER, COMMENT_COUNTER, REPLY_COUNTER)
+
+
+def _engine() -> PooledSQLiteEngine:
+    engine = TPost._meta.db
+    assert isinstance(engine, PooledSQLiteEngine)
+    return engine
+
+
+def toggle_reaction(
+    counter: ReactionCounter,
+    target_id: int,
+    user_id: int,
+) -> tuple[bool, int]:
+    """
+    React to an object if the user hasn't reacted to it, otherwise remove
+    their reaction. The reaction and the counter are updated within a single
+    transaction, so concurrent toggles can't leave the counter inaccurate.
+
+    ### Args:
+    * `counter` (`ReactionCounter`): type of object to react to
+
+    * `target_id` (`int`): ID of the object to react to
+
+    * `user_id` (`int`): ID of the user reacting
+
+    ### Returns:
+    * `tuple[bool, int]`: whether the user has now reacted, and the new
+      number of reactions
+    """
+    fk = counter.target._meta.db_column_name
+    column = counter.counter._meta.db_column_name
+    # Take the write lock straight away, so the reaction can't change
+    # between checking and updating it
+    with _engine().write_transaction() as connection:
+        removed = connection.execute(
+            f'DELETE FROM {counter.reacts_table} '
+            f'WHERE "user" = ? AND "{fk}" = ?',
+            [user_id, target_id],
+        ).rowcount
+        if removed:
+            delta = -removed
+        else:
+            connection.execute(
+                f'INSERT INTO {counter.reacts_table} ("user", "{fk}") '
+                f'VALUES (?, ?)',
+                [user_id, target_id],
+            )
+            delta = 1
+        connection.execute(
+            f'UPDATE {counter.counted_table} '
+            f'SET "{column}" = max("{column}" + ?, 0) WHERE id = ?',
+            [delta, target_id],
+        )
+        count = connection.execute(
+            f'SELECT "{column}" FROM {counter.counted_table} '
+            f'WHERE id = ?',
+            [target_id],
+        ).fetchone()[column]
+    return not removed, count
+
+
+def repair_sql(counter: ReactionCounter) -> str:
+    """
+    Returns the SQL to recalculate the counters of a type of object from its
+    reactions table, updating only the counters that are incorrect
+
+    ### Args:
+    * `counter` (`ReactionCounter`): type of object to recalculate
+
+    ### Returns:
+    * `str`: SQL query
+    """
+    fk = counter.target._meta.db_column_name
+    column = counter.counter._meta.db_column_name
+    count = (
+        f'(SELECT count(*) FROM {counter.reacts_table} r '
+        f'WHERE r."{fk}" = {counter.counted_table}.id)'
+    )
+    return (
+        f'UPDATE {counter.counted_table} SET "{column}" = {count} '
+        f'WHERE "{column}" != {count}'
+    )
+
+
+def repair_counters() -> int:
+    """
+    Recalculate every reaction counter from the reaction tables
+
+    ### Returns:
+    * `int`: number of counters that were incorrect
+    """
+    with _engine().connection() as connection:
+        return sum(
+            connection.execute(repair_sql(counter)).rowcount
+            for counter in COUNTERS
+        )
@@ -4,9 +4,11 @@
 from backend.types.reply import IReplyFullInfo
 from .tables import TReply, TReplyReacts
 from .user import User
-from backend.util.db_queries import assert_id_exists, get_by_id
+from .search_index import SearchIndex
+from .reactions import REPLY_COUNTER, toggle_reaction
+from backend.util.db_queries import get_by_id
 from backend.util.validators import assert_valid_str_field
-from backend.types.identifiers import ReplyId
+from backend.types.identifiers import ReplyId, UserId
 from typing import cast, TYPE_CHECKING
 from datetime import datetime
 if TYPE_CHECKING:
@@ -28,8 +30,32 @@ class Reply:
         ### Raises:
         * `IdNotFound`: reply does not exist
         """
-        assert_id_exists(TReply, id, "Reply")
         self.__id = id
+        self.__row = get_by_id(TReply, id, "Reply")
+
+    @classmethod
+    def from_row(cls, row: TReply) -> "Reply":
+        """
+        Create a reply object from a row that has already been loaded from the
+        database, without performing any additional queries
+
+        ### Args:
+        * `row` (`TReply`): row in the replies table
+
+        ### Returns:
+        * `Reply`: the reply object
+        """
+        reply = cls.__new__(cls)
+        reply.__id = ReplyId(row.id)
+        reply.__row = row
+        return reply
+
+    def refresh(self) -> None:
+        """
+        Reload the reply's info from the database, discarding the existing
+        snapshot
+        """
+        self.__row = get_by_id(TReply, self.__id, "Reply")
 
     @classmethod
     def create(
@@ -67,6 +93,7 @@ class Reply:
             .run_sync()[0]
         )
         id = cast(ReplyId, val["id"])
+        SearchIndex.update_post(comment.parent.id)
         return Reply(id)
 
     @property
@@ -80,7 +107,8 @@ class Reply:
     def deleted(self, new_status: bool):
         row = self._get()
         row.deleted = new_status
-        row.save().run_sync()
+        row.save([TReply.deleted]).run_sync()
+        SearchIndex.update_post(self.parent.parent.id)
 
     def delete(self):
         """
@@ -91,9 +119,9 @@ class Reply:
 
     def _get(self) -> TReply:
         """
-        Return a reference to the underlying database row
+        Return a reference to the snapshot of the underlying database row
         """
-        return get_by_id(TReply, self.__id)
+        return self.__row
 
     @property
     def id(self) -> ReplyId:
@@ -114,7 +142,8 @@ class Reply:
         assert_valid_str_field(new_text, "reply")
         row = self._get()
         row.text = new_text
-        row.save().run_sync()
+        row.save([TReply.text]).run_sync()
+        SearchIndex.update_post(self.parent.parent.id)
 
     @property
     def author(self) -> "User":
@@ -145,11 +174,7 @@ class Reply:
         ### Returns:
         * int: number of 'thanks' reacts
         """
-        return cast(
-            int,
-            TReplyReacts.count()
-            .where(TReplyReacts.reply == self.id).run_sync()
-        )
+        return self._get().thanks
 
     def has_reacted(self, user: User) -> bool:
         """
@@ -162,26 +187,20 @@ class Reply:
                    TReplyReacts.user == user.id).run_sync()
         )
 
-    def react(self, user: User):
+    def react(self, user: User) -> bool:
         """
         React to the reply if the user has not reacted to the reply
         Unreact to the reply if the user has reacted to the reply
 
         ### Args:
         * `user` (`User`): User reacting/un-reacting to the reply
+
+        ### Returns:
+        * `bool`: whether the user has now reacted to the reply
         """
-        if not self.has_reacted(user):
-            TReplyReacts(
-                {
-                    TReplyReacts.user: user.id,
-                    TReplyReacts.reply: self.id,
-                }
-            ).save().run_sync()
-        else:
-            TReplyReacts.delete()\
-                .where(TReplyReacts.user == user.id,
-                       TReplyReacts.reply == self.id)\
-                .run_sync()
+        reacted, count = toggle_reaction(REPLY_COUNTER, self.id, user.id)
+        self._get().thanks = count
+        return reacted
 
     @property
     def timestamp(self) -> datetime:
@@ -200,12 +219,49 @@ class Reply:
         ### Returns:
         * IReplyFullInfo: Dictionary containing full info a reply
         """
-        return {
-            "reply_id": self.id,
-            "author": self.author.id,
-            "thanks": self.thanks,
-            "text": self.text,
-            "timestamp": int(self.timestamp.timestamp()),
-            "user_reacted": self.has_reacted(user),
-            "deleted": self.deleted,
+        return Reply.full_info_list([self], user)[0]
+
+    @classmethod
+    def full_info_list(
+        cls,
+        replies: list["Reply"],
+        user: User,
+    ) -> list[IReplyFullInfo]:
+        """
+        Returns the full info of many replies at once.
+
+        This uses a single query to find which replies the user has reacted
+        to, rather than one query per reply.
+
+        ### Args:
+        * `replies` (`list[Reply]`): replies to get the info of
+
+        * `user` (`User`): user viewing the replies
+
+        ### Returns:
+        * `list[IReplyFullInfo]`: full info of each reply, in the same order
+          as the given replies
+        """
+        if len(replies) == 0:
+            return []
+        reacted = {
+            r["reply"]
+            for r in TReplyReacts.select(TReplyReacts.reply).where(
+                TReplyReacts.user == user.id,
+                TReplyReacts.reply.is_in([r.id for r in replies]),
+            ).run_sync()
         }
+
+        def info(reply: Reply) -> IReplyFullInfo:
+            row = reply._get()
+            return {
+                "reply_id": reply.id,
+                "author": UserId(row.author),
+                "thanks": row.thanks,
+                "text": row.text,
+                "timestamp": int(row.timestamp.timestamp()),
+                "user_reacted": reply.id in reacted,
+                "deleted": row.deleted,
+            }
+
+        return [info(r) for r in replies]
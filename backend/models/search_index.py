@@ -0,0 +1,300 @@
+"""
+# Backend / Models / Search Index
+
+Full-text search index for posts, backed by SQLite's FTS5 extension.
+
+Each post is stored as a single document, with its heading, its text, and the
+text of all its comments and replies (its "discussion") stored in separate
+columns so they can be weighted differently when ranking. The row ID of each
+document is the ID of the post it represents.
+
+Two indexes are kept:
+
+* `t_search`: tokenised into words (with stemming) and ranked using BM25.
+
+* `t_search_trigram`: tokenised into trigrams, used as a fallback when a
+  search doesn't match any words exactly (eg due to typos or partial words).
+  Searches for words shorter than a trigram use `LIKE` on this index, which
+  requires scanning it.
+
+The index needs to be updated whenever the text of a post, comment or reply
+changes, which is done by calling `SearchIndex.update_post`.
+"""
+import re
+from typing import cast, Optional
+from piccolo.columns.combination import Combinable
+from .tables import TPost, TComment, TReply
+from backend.types.identifiers import PostId
+
+
+SEARCH_TABLE = "t_search"
+"""Name of the word-based search index"""
+
+TRIGRAM_TABLE = "t_search_trigram"
+"""Name of the trigram-based search index"""
+
+TOKENIZERS = {
+    SEARCH_TABLE: "porter unicode61",
+    TRIGRAM_TABLE: "trigram",
+}
+"""Tokenizer used by each search index"""
+
+COLUMNS = ["heading", "text", "discussion"]
+"""Columns of each search index"""
+
+WEIGHTS = "2.0, 2.0, 1.0"
+"""BM25 weights for the heading, text and discussion columns"""
+
+# Selects the document for each post. This is used to insert documents into
+# both indexes, for both single posts, and when rebuilding the entire index.
+DOCUMENT_QUERY = f"""
+SELECT
+    p.id,
+    p.heading,
+    p.text,
+    coalesce((
+        SELECT group_concat(c.text, ' ')
+        FROM {TComment._meta.tablename} c
+        WHERE c.parent = p.id AND NOT c.deleted
+    ), '') || ' ' || coalesce((
+        SELECT group_concat(r.text, ' ')
+        FROM {TReply._meta.tablename} r
+        JOIN {TComment._meta.tablename} c ON r.parent = c.id
+        WHERE c.parent = p.id AND NOT r.deleted
+    ), '')
+FROM {TPost._meta.tablename} p
+"""
+
+
+def search_words(search_term: str) -> list[str]:
+    """
+    Split a search term into the words used to query the index
+
+    ### Args:
+    * `search_term` (`str`): search term
+
+    ### Returns:
+    * `list[str]`: lowercase words within the search term
+    """
+    return re.findall(r"\w+", search_term.lower())
+
+
+def escape_like(word: str) -> str:
+    """
+    Escape the characters of a word that have a special meaning in a `LIKE`
+    pattern, using `\\` as the escape character
+
+    ### Args:
+    * `word` (`str`): word to escape
+
+    ### Returns:
+    * `str`: escaped word
+    """
+    return re.sub(r"([\\%_])", r"\\\1", word)
+
+
+def trigrams(word: str) -> list[str]:
+    """
+    Returns the trigrams (3-character substrings) of the given word
+
+    ### Args:
+    * `word` (`str`): word to split
+
+    ### Returns:
+    * `list[str]`: trigrams, or an empty list if the word is too short
+    """
+    return [word[i:i+3] for i in range(len(word) - 2)]
+
+
+class SearchIndex:
+    """
+    Represents the full-text search index of posts
+    """
+
+    @classmethod
+    def init(cls) -> None:
+        """
+        Create the search indexes if they don't exist yet.
+
+        If the indexes needed to be created (for example when upgrading an
+        existing database), they are filled using the existing posts.
+        """
+        created = False
+        for table, tokenizer in TOKENIZERS.items():
+            exists = TPost.raw(
+                "SELECT count(*) AS n FROM sqlite_master WHERE name = {}",
+                table,
+            ).run_sync()[0]["n"]
+            if not exists:
+                TPost.raw(
+                    f"CREATE VIRTUAL TABLE {table} USING fts5("
+                    f"heading, text, discussion, tokenize='{tokenizer}')"
+                ).run_sync()
+                created = True
+        if created:
+            cls.rebuild()
+
+    @classmethod
+    def drop(cls) -> None:
+        """
+        Remove the search indexes from the database
+        """
+        for table in TOKENIZERS:
+            TPost.raw(f"DROP TABLE IF EXISTS {table}").run_sync()
+
+    @classmethod
+    def rebuild(cls) -> None:
+        """
+        Clear the search indexes, then re-index every post in the forum.
+        """
+        for table in TOKENIZERS:
+            TPost.raw(f"DELETE FROM {table}").run_sync()
+            TPost.raw(
+                f"INSERT INTO {table}(rowid, heading, text, discussion) "
+                + DOCUMENT_QUERY
+            ).run_sync()
+
+    @classmethod
+    def update_post(cls, post_id: PostId) -> None:
+        """
+        Update the indexed document of a post. This should be called whenever
+        the heading or text of the post, or the text of one of its comments
+        or replies changes.
+
+        ### Args:
+        * `post_id` (`PostId`): post to re-index
+        """
+        for table in TOKENIZERS:
+            TPost.raw(
+                f"DELETE FROM {table} WHERE rowid = {{}}",
+                post_id,
+            ).run_sync()
+            TPost.raw(
+                f"INSERT INTO {table}(rowid, heading, text, discussion) "
+                + DOCUMENT_QUERY
+                + "WHERE p.id = {}",
+                post_id,
+            ).run_sync()
+
+    @classmethod
+    def search(
+        cls,
+        search_term: str,
+        condition: Optional[Combinable] = None,
+        limit: Optional[int] = None,
+        offset: int = 0,
+    ) -> list[PostId]:
+        """
+        Returns the IDs of posts matching the search term, from the best match
+        to the worst match.
+
+        Posts match if any of the words in the search term start a word in
+        the post. If no posts match, we fall back to matching trigrams of the
+        search term, which tolerates typos and partial words. Words too short
+        to have any trigrams are instead matched anywhere in the post, with
+        the newest posts first.
+
+        Matches are filtered, ranked and paged within the database, so only
+        the requested page of results is loaded.
+
+        ### Args:
+        * `search_term` (`str`): term to search for
+
+        * `condition` (`Optional[Combinable]`, optional): condition on
+          `TPost` that matching posts must meet, for example to only include
+          posts the user can view. Defaults to `None` (all posts).
+
+        * `limit` (`Optional[int]`, optional): maximum number of posts to
+          return. Defaults to `None` (no limit).
+
+        * `offset` (`int`, optional): number of matching posts to skip.
+          Defaults to `0`.
+
+        ### Returns:
+        * `list[PostId]`: IDs of matching posts
+        """
+        words = search_words(search_term)
+        if len(words) == 0:
+            return []
+        page = (condition, limit, offset)
+        match = " OR ".join(f'"{w}"*' for w in words)
+        if cls.__match(SEARCH_TABLE, match, condition, 1, 0):
+            return cls.__match(SEARCH_TABLE, match, *page)
+        grams = {g for w in words for g in trigrams(w)}
+        if len(grams):
+            return cls.__match(
+                TRIGRAM_TABLE,
+                " OR ".join(f'"{g}"' for g in sorted(grams)),
+                *page,
+            )
+        # Every word is too short to have any trigrams, so fall back to
+        # finding them anywhere in the text
+        patterns = [f"%{escape_like(w)}%" for w in words]
+        return cls.__query(
+            TRIGRAM_TABLE,
+            "(" + " OR ".join(
+                f"{TRIGRAM_TABLE}.{column} LIKE {{}} ESCAPE '\\'"
+                for _ in patterns
+                for column in COLUMNS
+            ) + ")",
+            [p for p in patterns for _ in COLUMNS],
+            None,
+            *page,
+        )
+
+    @classmethod
+    def __match(
+        cls,
+        table: str,
+        match: str,
+        condition: Optional[Combinable],
+        limit: Optional[int],
+        offset: int,
+    ) -> list[PostId]:
+        """
+        Run a match query on a search index, ranking results using BM25
+        """
+        return cls.__query(
+            table,
+            f"{table} MATCH {{}}",
+            [match],
+            f"bm25({table}, {WEIGHTS})",
+            condition,
+            limit,
+            offset,
+        )
+
+    @classmethod
+    def __query(
+        cls,
+        table: str,
+        where: str,
+        args: list,
+        rank: Optional[str],
+        condition: Optional[Combinable],
+        limit: Optional[int],
+        offset: int,
+    ) -> list[PostId]:
+        """
+        Query a search index, joined with the posts so that they can be
+        filtered by the given condition. Results are sorted by the given
+        ranking, then from newest to oldest.
+        """
+        posts = TPost._meta.tablename
+        if condition is not None:
+            where += " AND {}"
+            args = args + [condition.querystring]
+        order = f"{table}.rowid DESC"
+        if rank is not None:
+            order = f"{rank}, {order}"
+        results = TPost.raw(
+            f"SELECT {table}.rowid AS id FROM {table} "
+            f"JOIN {posts} ON {posts}.id = {table}.rowid "
+            f"WHERE {where} ORDER BY {order} "
+            # A negative limit means there is no limit
+            "LIMIT {} OFFSET {}",
+            *args,
+            -1 if limit is None else limit,
+            offset,
+        ).run_sync()
+        return [PostId(r["id"]) for r in cast(list[dict], results)]
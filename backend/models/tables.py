@@ -4,6 +4,11 @@
 Contains the definitions for tables used within the database.
 
 All tables should begin with T to distinguish them from their model classes.
+
+Indexes on single columns are declared here. Unique constraints, indexes on
+multiple columns, and the foreign key of `TPost.answered` can't be declared
+using Piccolo, so they are added by the migrations in `piccolo_migrations`,
+which are run whenever the database is initialised.
 """
 
 from piccolo.table import Table
@@ -15,6 +20,7 @@ from piccolo.columns import (
     ForeignKey,
     Timestamp,
     Boolean,
+    Real,
 )
 
 
@@ -52,7 +58,7 @@ class TPermissionUser(_BaseTable):
 
     allowed = Array(Integer())
     disallowed = Array(Integer())
-    parent = ForeignKey(TPermissionGroup)
+    parent = ForeignKey(TPermissionGroup, index=True)
 
 
 class TUser(_BaseTable):
@@ -87,19 +93,23 @@ class TPost(_BaseTable):
     Table containing all posts
     """
 
-    author = ForeignKey(TUser)
+    author = ForeignKey(TUser, index=True)
     heading = Text()
     text = Text()
     timestamp = Timestamp()
-    queue = ForeignKey(TQueue)
+    queue = ForeignKey(TQueue, index=True)
     private = Boolean()
     anonymous = Boolean()
-    answered = Integer(null=True)
-    # FIXME
-    # answered = ForeignKey("TComment", null=True)
-    # For some reason this causes an error:
-    # ValueError: Can't find a Table subclass called
-    # TComment in backend.models.tables
+    me_too = Integer()
+    """Number of 'me too' reactions, as per `TPostReacts`"""
+    answered = Integer(null=True, default=None)
+    """
+    Comment that was accepted as the answer, if any
+
+    This references `TComment`, but Piccolo can't declare foreign keys that
+    form a cycle (it fails with "Can't find a Table subclass called
+    TComment"), so the foreign key is added by a migration.
+    """
 
 
 class TTag(_BaseTable):
@@ -117,10 +127,12 @@ class TComment(_BaseTable):
     """
 
     author = ForeignKey(TUser)
-    parent = ForeignKey(TPost)
+    parent = ForeignKey(TPost, index=True)
     deleted = Boolean()
     text = Text()
     timestamp = Timestamp()
+    thanks = Integer()
+    """Number of 'thanks' reactions, as per `TCommentReacts`"""
 
 
 class TReply(_BaseTable):
@@ -129,10 +141,12 @@ class TReply(_BaseTable):
     """
 
     author = ForeignKey(TUser)
-    parent = ForeignKey(TComment)
+    parent = ForeignKey(TComment, index=True)
     deleted = Boolean()
     text = Text()
     timestamp = Timestamp()
+    thanks = Integer()
+    """Number of 'thanks' reactions, as per `TReplyReacts`"""
 
 
 class TPostReacts(_BaseTable):
@@ -167,7 +181,10 @@ class TToken(_BaseTable):
     Table containing mapping of token IDs to user IDs
     """
 
-    user = ForeignKey(TUser)
+    user = ForeignKey(TUser, index=True)
+
+    expires = Timestamp(index=True)
+    """When the token expires, unless it is refreshed before then"""
 
 
 class TNotification(_BaseTable):
@@ -178,14 +195,20 @@ class TNotification(_BaseTable):
     notif_type = Integer()
     """Type of notification (as per notifications.NotificationType)"""
 
-    user_to = ForeignKey(TUser)
+    user_to = ForeignKey(TUser, index=True)
     """User the notification is directed to"""
 
     seen = Boolean()
     """Whether the notification has been seen"""
 
     timestamp = Timestamp()
-    """When the notification was sent"""
+    """When the notification was (most recently) sent"""
+
+    occurrences = Integer(default=1)
+    """
+    Number of times the notification was sent, since unseen notifications
+    about the same thing can be merged together
+    """
 
     user_from = ForeignKey(TUser, null=True)
     """User who gave the notification, if any"""
@@ -209,3 +232,33 @@ class TExamMode(_BaseTable):
     """
 
     exam_mode = Boolean()
+
+
+class TJob(_BaseTable):
+    """
+    Table containing background jobs that are waiting to be run
+    """
+
+    kind = Text()
+    """Name of the handler that runs the job"""
+
+    payload = Text()
+    """JSON-encoded arguments given to the handler"""
+
+    attempts = Integer(default=0)
+    """Number of times the job has been started"""
+
+    run_after = Real(index=True)
+    """Time (in seconds since the epoch) before which the job shouldn't run"""
+
+    claimed = Real(null=True, default=None)
+    """
+    Time at which a worker started running the job, or `None` if it isn't
+    running
+    """
+
+    failed = Boolean(default=False)
+    """Whether the job failed, and won't be retried"""
+
+    error = Text(null=True, default=None)
+    """Error that caused the job to fail"""
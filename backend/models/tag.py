@@ -1,6 +1,7 @@
+import sqlite3
 from .tables import TTag
 from backend.types.tag import ITagBasicInfo
-from backend.util.db_queries import get_by_id, assert_id_exists
+from backend.util.db_queries import get_by_id
 from backend.util.validators import assert_valid_str_field
 from backend.types.identifiers import TagId
 from backend.util import http_errors
@@ -20,8 +21,32 @@ class Tag:
         * `id` (`TagId`): Tag id
 
         """
-        assert_id_exists(TTag, id, "TTag")
         self.__id = id
+        self.__row = get_by_id(TTag, id, "Tag")
+
+    @classmethod
+    def from_row(cls, row: TTag) -> "Tag":
+        """
+        Create a tag object from a row that has already been loaded from the
+        database, without performing any additional queries
+
+        ### Args:
+        * `row` (`TTag`): row in the tags table
+
+        ### Returns:
+        * `Tag`: the tag object
+        """
+        tag = cls.__new__(cls)
+        tag.__id = TagId(row.id)
+        tag.__row = row
+        return tag
+
+    def refresh(self) -> None:
+        """
+        Reload the tag's info from the database, discarding the existing
+        snapshot
+        """
+        self.__row = get_by_id(TTag, self.__id, "Tag")
 
     @classmethod
     def create(
@@ -38,18 +63,19 @@ class Tag:
         * `Tag`: the Tag object
         """
         assert_valid_str_field(name, "name")
-        if name in (t.name for t in cls.all()):
+        try:
+            val = (
+                TTag(
+                    {
+                        TTag.name: name,
+                    }
+                )
+                .save()
+                .run_sync()[0]
+            )
+        except sqlite3.IntegrityError:
             raise http_errors.BadRequest(
                 "There is already a tag with that name")
-        val = (
-            TTag(
-                {
-                    TTag.name: name,
-                }
-            )
-            .save()
-            .run_sync()[0]
-        )
         id = cast(TagId, val["id"])
         return Tag(id)
 
@@ -62,15 +88,15 @@ class Tag:
         * `list[Tag]`: list of tags
         """
         return [
-            Tag(p["id"]) for p in
-            TTag.select().order_by(TTag.name).run_sync()
+            Tag.from_row(p) for p in
+            TTag.objects().order_by(TTag.name).run_sync()
         ]
 
     def _get(self) -> TTag:
         """
-        Return a reference to the underlying database row
+        Return a reference to the snapshot of the underlying database row
         """
-        return get_by_id(TTag, self.__id)
+        return self.__row
 
     @property
     def id(self) -> TagId:
@@ -84,8 +110,14 @@ class Tag:
     def name(self, new_name):
         assert_valid_str_field(new_name, "new name")
         row = self._get()
+        old_name = row.name
         row.name = new_name
-        row.save().run_sync()
+        try:
+            row.save([TTag.name]).run_sync()
+        except sqlite3.IntegrityError:
+            row.name = old_name
+            raise http_errors.BadRequest(
+                "There is already a tag with that name")
 
     def delete(self):
         """
@@ -1,14 +1,36 @@
 """
 # Backend / Models / Token
+
+Tokens expire after a while (a week by default, configurable using the
+`ENSEMBLE_TOKEN_TTL_HOURS` environment variable), unless they are refreshed
+before then. The expiry is stored both in the JWT, so that expired tokens can
+be rejected without looking them up, and in the database, so that expired
+tokens can be swept away.
+
+The same sweeper thread also prunes old notifications that have been seen, as
+per `Notification.prune`.
+
+Recently authenticated tokens are cached in each process, so that they don't
+need to be looked up for every request. Invalidating a token (eg by logging
+out) evicts it from the cache of the process that handled it straight away,
+but other processes can keep accepting it for up to `SESSION_CACHE_TTL`
+seconds (10 by default), until their cached entry expires.
 """
+import os
 import jwt
+import traceback
+from datetime import datetime, timedelta
+from threading import Lock, Thread
+from time import sleep
 from .tables import TToken
 from .user import User
-from backend.types.identifiers import TokenId
+from .notifications import Notification
+from backend.types.identifiers import TokenId, UserId
 from backend.types.auth import JWT
-from backend.util.db_queries import assert_id_exists, get_by_id
+from backend.util.cache import LruCache
+from backend.util.db_queries import get_by_id
 from backend.util.exceptions import AuthenticationError, IdNotFound
-from typing import cast
+from typing import Callable, Optional, cast
 
 
 SECRET = (  # TODO
@@ -18,6 +40,86 @@ SECRET = (  # TODO
     "securely stored, so that it's different for every instance of the server."
 )
 
+SESSION_CACHE_SIZE = 4096
+"""Maximum number of tokens to remember as recently authenticated"""
+
+SESSION_CACHE_TTL = 10.0
+"""
+Number of seconds before a recently authenticated token is checked again.
+This limits how long other processes accept a token after it is invalidated.
+"""
+
+# Maps the IDs of recently authenticated tokens to the ID of the user who owns
+# them, so that authenticating doesn't require looking up the token for every
+# request. Entries must be evicted as soon as their token is invalidated.
+_sessions: LruCache[TokenId, UserId] = LruCache(
+    SESSION_CACHE_SIZE,
+    SESSION_CACHE_TTL,
+)
+
+TTL_HOURS = 24 * 7
+"""Default number of hours before a token expires"""
+
+TTL_ENV = "ENSEMBLE_TOKEN_TTL_HOURS"
+"""Environment variable used to override `TTL_HOURS`"""
+
+SWEEP_INTERVAL = 3600.0
+"""
+Number of seconds between deleting expired tokens and pruning old
+notifications
+"""
+
+SWEEP_BATCH_SIZE = 500
+"""Maximum number of expired tokens to delete using a single query"""
+
+__sweeper_lock = Lock()
+__sweeper: Optional[Thread] = None
+
+
+def token_ttl() -> timedelta:
+    """
+    Returns how long tokens last before they expire, which can be configured
+    using the `ENSEMBLE_TOKEN_TTL_HOURS` environment variable
+
+    ### Raises:
+    * `ValueError`: the configured number of hours is invalid
+
+    ### Returns:
+    * `timedelta`: token lifetime
+    """
+    hours = float(os.getenv(TTL_ENV, TTL_HOURS))
+    if hours <= 0:
+        raise ValueError("Token lifetime must be positive")
+    return timedelta(hours=hours)
+
+
+def start_sweeper() -> None:
+    """
+    Start a thread which regularly deletes expired tokens and old
+    notifications, if it isn't running already
+    """
+    global __sweeper
+    with __sweeper_lock:
+        if __sweeper is not None:
+            return
+        __sweeper = Thread(target=_sweep_forever, name="token-sweeper",
+                           daemon=True)
+        __sweeper.start()
+
+
+def _sweep_forever() -> None:
+    """
+    Main loop of the sweeper thread
+    """
+    sweeps: list[Callable[[], int]] = [Token.sweep, Notification.prune]
+    while True:
+        for sweep in sweeps:
+            try:
+                sweep()
+            except Exception as e:
+                traceback.print_exception(e)
+        sleep(SWEEP_INTERVAL)
+
 
 class Token:
     """
@@ -27,16 +129,16 @@ class Token:
 
     def __init__(self, id: TokenId) -> None:
         try:
-            assert_id_exists(TToken, id, "Token")
+            self.__row = get_by_id(TToken, id, "Token")
         except IdNotFound:
             raise AuthenticationError("Token invalidated")
         self.__id = id
 
     def _get(self) -> TToken:
         """
-        Return a reference to the underlying database row
+        Return a reference to the snapshot of the underlying database row
         """
-        return get_by_id(TToken, self.__id)
+        return self.__row
 
     @classmethod
     def create(self, user: "User") -> "Token":
@@ -49,12 +151,15 @@ class Token:
         ### Returns:
         * `Token`: token
         """
-        val = TToken({TToken.user: user.id}).save().run_sync()[0]
+        val = TToken({
+            TToken.user: user.id,
+            TToken.expires: datetime.now() + token_ttl(),
+        }).save().run_sync()[0]
         id = cast(TokenId, val["id"])
         return Token(id)
 
     @classmethod
-    def fromJWT(self, token: JWT) -> "Token":
+    def fromJWT(cls, token: JWT) -> "Token":
         """
         Get a token given a JWT string
 
@@ -70,30 +175,90 @@ class Token:
         ### Returns:
         * `Token`: token object
         """
+        token_id, user_id = cls.__decode(token)
+        return cls.__check(token_id, user_id)
+
+    @classmethod
+    def authenticate(cls, token: JWT) -> User:
+        """
+        Returns the user who owns the given JWT
+
+        Tokens that were authenticated recently are remembered, so that they
+        don't need to be looked up in the database again.
+
+        ### Args:
+        * `jwt` (`str`): JWT string
+
+        ### Raises:
+        * `Forbidden`: when the token fails to decode or doesn't match up
+          correctly.
+
+        ### Returns:
+        * `User`: owner of the token
+        """
+        token_id, user_id = cls.__decode(token)
+        if _sessions.get(token_id) != user_id:
+            cls.__check(token_id, user_id)
+        try:
+            return User(user_id)
+        except IdNotFound:
+            _sessions.evict(token_id)
+            raise AuthenticationError("User no longer exists")
+
+    @classmethod
+    def __decode(cls, token: JWT) -> tuple[TokenId, UserId]:
+        """
+        Decode a JWT, returning the token ID and user ID it contains
+        """
         try:
-            decoded = jwt.decode(token, SECRET, algorithms=["HS256"])
-        except jwt.DecodeError:
+            decoded = jwt.decode(
+                token,
+                SECRET,
+                algorithms=["HS256"],
+                options={"require": ["exp"]},
+            )
+        except jwt.ExpiredSignatureError:
+            raise AuthenticationError(
+                "The provided token has expired. Please log in again.")
+        except jwt.InvalidTokenError:
             raise AuthenticationError(
                 "The provided token failed to decode. This could mean that it "
                 "has been tampered with, or is no-longer valid."
             )
-        user_id = decoded["user_id"]
-        token_id = decoded["token_id"]
+        return decoded["token_id"], decoded["user_id"]
+
+    @classmethod
+    def __check(cls, token_id: TokenId, user_id: UserId) -> "Token":
+        """
+        Ensure that the token exists and belongs to the given user, then
+        remember it as recently authenticated
+        """
         t = Token(token_id)
-        if t.user.id != user_id:
+        if t._get().user != user_id:
             raise AuthenticationError(
                 "The user associated with this token doesn't "
                 "match the information stored on the server."
             )
+        if t.expires <= datetime.now():
+            raise AuthenticationError(
+                "The provided token has expired. Please log in again.")
+        _sessions.put(token_id, user_id)
         return t
 
     @property
-    def id(self) -> int:
+    def id(self) -> TokenId:
         """
         Identifier of the token
         """
         return self.__id
 
+    @property
+    def expires(self) -> datetime:
+        """
+        When the token expires, unless it is refreshed
+        """
+        return self._get().expires
+
     @property
     def user(self) -> User:
         """
@@ -117,13 +282,67 @@ class Token:
                 {
                     "user_id": self.user.id,
                     "token_id": self.id,
+                    "exp": int(self.expires.timestamp()),
                 },
                 SECRET,
             ),
         )
 
+    def refresh(self) -> "Token":
+        """
+        Extend the lifetime of this token, so that it expires a full token
+        lifetime from now. JWTs encoded before refreshing still expire at
+        their original time, so the token should be encoded again.
+
+        ### Returns:
+        * `Token`: this token
+        """
+        expires = datetime.now() + token_ttl()
+        TToken.update({TToken.expires: expires}) \
+            .where(TToken.id == self.id).run_sync()
+        self.__row.expires = expires
+        return self
+
     def invalidate(self):
         """
         Invalidate this token so that it can no-longer be used.
         """
         TToken.delete().where(TToken.id == self.id).run_sync()
+        _sessions.evict(self.id)
+
+    @classmethod
+    def sweep(cls, batch_size: int = SWEEP_BATCH_SIZE) -> int:
+        """
+        Delete all expired tokens, a batch at a time so that the database
+        isn't locked for long. Their JWTs have all expired, so they are
+        already rejected without being looked up.
+
+        ### Args:
+        * `batch_size` (`int`, optional): maximum number of tokens to delete
+          using each query
+
+        ### Returns:
+        * `int`: number of tokens deleted
+        """
+        now = datetime.now()
+        deleted = 0
+        while True:
+            ids = [
+                r["id"] for r in TToken.select(TToken.id)
+                .where(TToken.expires <= now)
+                .limit(batch_size)
+                .run_sync()
+            ]
+            if len(ids):
+                TToken.delete().where(TToken.id.is_in(ids)).run_sync()
+            deleted += len(ids)
+            if len(ids) < batch_size:
+                return deleted
+
+    @classmethod
+    def clear_cache(cls) -> None:
+        """
+        Forget all recently authenticated tokens. This must be called when
+        the database is cleared.
+        """
+        _sessions.clear()
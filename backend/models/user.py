@@ -1,16 +1,45 @@
 """
 # Backend / Models / User
 """
-from .tables import TUser
-from .permissions import PermissionGroup, PermissionUser
+import sqlite3
+from piccolo.columns.combination import WhereRaw
+from .tables import TUser, TPermissionUser, TPermissionGroup
+from .permissions import PermissionGroup, PermissionUser, Permission
+from backend.util import http_errors
+from backend.util.db_engine import PooledSQLiteEngine
 from backend.util.exceptions import MatchNotFound
-from backend.util.db_queries import assert_id_exists, get_by_id
+from backend.util.db_queries import get_by_id
 from backend.util.validators import assert_email_valid, assert_valid_str_field
 from backend.types.identifiers import UserId
 from backend.types.user import IUserProfile, IUserBasicInfo
 from typing import Optional, cast, Callable
 
 
+def _engine() -> PooledSQLiteEngine:
+    engine = TUser._meta.db
+    assert isinstance(engine, PooledSQLiteEngine)
+    return engine
+
+
+# Matches users who have a permission, checking their own allowed and
+# disallowed permissions before falling back to those of their group. The
+# permission arrays are stored as JSON, so we use `json_each` to search them.
+HAS_PERMISSION_SQL = f"""
+EXISTS (
+    SELECT 1
+    FROM {TPermissionUser._meta.tablename} pu
+    JOIN {TPermissionGroup._meta.tablename} g ON pu.parent = g.id
+    WHERE pu.id = {TUser._meta.tablename}.permissions AND (
+        {{}} IN (SELECT value FROM json_each(pu.allowed))
+        OR (
+            {{}} NOT IN (SELECT value FROM json_each(pu.disallowed))
+            AND {{}} IN (SELECT value FROM json_each(g.allowed))
+        )
+    )
+)
+"""
+
+
 class User:
     """
     Represents a user of Ensemble
@@ -25,8 +54,35 @@ class User:
         ### Raises:
         * `BadRequest`: user does not exist
         """
-        assert_id_exists(TUser, id)
         self.__id = id
+        self.__row = get_by_id(TUser, id, "User")
+        self.__permissions: Optional[PermissionUser] = None
+
+    @classmethod
+    def from_row(cls, row: TUser) -> 'User':
+        """
+        Create a user object from a row that has already been loaded from the
+        database, without performing any additional queries
+
+        ### Args:
+        * `row` (`TUser`): row in the users table
+
+        ### Returns:
+        * `User`: the user object
+        """
+        user = cls.__new__(cls)
+        user.__id = UserId(row.id)
+        user.__row = row
+        user.__permissions = None
+        return user
+
+    def refresh(self) -> None:
+        """
+        Reload the user's info from the database, discarding the existing
+        snapshot
+        """
+        self.__row = get_by_id(TUser, self.__id, "User")
+        self.__permissions = None
 
     @classmethod
     def create(
@@ -56,34 +112,45 @@ class User:
 
         ### Returns:
         * `User`: the user object
+
+        ### Raises:
+        * `BadRequest`: a user with that username or email already exists
         """
         assert_valid_str_field(username, "Username")
         if email is not None:
             assert_email_valid(email)
-        val = TUser(
-            {
-                TUser.username: username,
-                TUser.name_first: name_first,
-                TUser.name_last: name_last,
-                TUser.email: email,
-                TUser.pronouns: None,
-                TUser.permissions: PermissionUser.create(permissions_base).id,
-            }
-        ).save().run_sync()[0]
+        try:
+            # So that the user's permissions aren't left behind if the user
+            # can't be created
+            with _engine().write_transaction():
+                permissions = PermissionUser.create(permissions_base)
+                val = TUser(
+                    {
+                        TUser.username: username,
+                        TUser.name_first: name_first,
+                        TUser.name_last: name_last,
+                        TUser.email: email,
+                        TUser.pronouns: None,
+                        TUser.permissions: permissions.id,
+                    }
+                ).save().run_sync()[0]
+        except sqlite3.IntegrityError:
+            raise http_errors.BadRequest(
+                "There is already a user with that username or email")
         id = cast(UserId, val["id"])
         return User(id)
 
     @classmethod
     def all(cls) -> list['User']:
         """
-        Returns a list of all users
+        Returns a list of all users, with their permissions preloaded
 
         ### Returns:
         * `list[User]`: list of users
         """
         return list(map(
-            lambda u: User(u.id),
-            cast(list, TUser.objects().run_sync())
+            User.from_row,
+            cast(list, TUser.objects(TUser.permissions).run_sync())
         ))
 
     @classmethod
@@ -105,6 +172,28 @@ class User:
             cls.all(),
         ))
 
+    @classmethod
+    def all_with_permission(cls, action: Permission) -> list['User']:
+        """
+        Returns a list of all users who have the given permission, finding
+        them using a single query
+
+        ### Args:
+        * `action` (`Permission`): permission to check for
+
+        ### Returns:
+        * `list[User]`: list of users with the permission
+        """
+        return list(map(
+            User.from_row,
+            cast(list, TUser.objects().where(WhereRaw(
+                HAS_PERMISSION_SQL,
+                action.value,
+                action.value,
+                action.value,
+            )).run_sync())
+        ))
+
     @classmethod
     def from_username(cls, username: str) -> 'User':
         """
@@ -122,7 +211,7 @@ class User:
             .run_sync()
         if result is None:
             raise MatchNotFound(f"User with username {username} not found")
-        return User(result.id)
+        return User.from_row(result)
 
     @classmethod
     def from_email(cls, email: str) -> 'User':
@@ -141,7 +230,7 @@ class User:
             .run_sync()
         if result is None:
             raise MatchNotFound(f"User with email {email} not found")
-        return User(result.id)
+        return User.from_row(result)
 
     def __eq__(self, __o: object) -> bool:
         if isinstance(__o, User):
@@ -151,9 +240,9 @@ class User:
 
     def _get(self) -> TUser:
         """
-        Return a reference to the underlying database row
+        Return a reference to the snapshot of the underlying database row
         """
-        return get_by_id(TUser, self.__id)
+        return self.__row
 
     @property
     def id(self) -> UserId:
@@ -181,7 +270,7 @@ class User:
         assert_valid_str_field(new_name, "First name")
         row = self._get()
         row.name_first = new_name
-        row.save().run_sync()
+        row.save([TUser.name_first]).run_sync()
 
     @property
     def name_last(self) -> str:
@@ -195,7 +284,7 @@ class User:
         assert_valid_str_field(new_name, "Last name")
         row = self._get()
         row.name_last = new_name
-        row.save().run_sync()
+        row.save([TUser.name_last]).run_sync()
 
     @property
     def email(self) -> str:
@@ -208,8 +297,14 @@ class User:
     def email(self, new_email: str):
         assert_email_valid(new_email)
         row = self._get()
+        old_email = row.email
         row.email = new_email
-        row.save().run_sync()
+        try:
+            row.save([TUser.email]).run_sync()
+        except sqlite3.IntegrityError:
+            row.email = old_email
+            raise http_errors.BadRequest(
+                "There is already a user with that email")
 
     @property
     def pronouns(self) -> Optional[str]:
@@ -224,11 +319,21 @@ class User:
             assert_valid_str_field(new_pronouns, "pronouns")
         row = self._get()
         row.pronouns = new_pronouns
-        row.save().run_sync()
+        row.save([TUser.pronouns]).run_sync()
 
     @property
     def permissions(self) -> PermissionUser:
-        return PermissionUser(self._get().permissions)
+        """
+        The user's permissions. These are only loaded the first time they are
+        accessed, unless they were loaded along with the user.
+        """
+        if self.__permissions is None:
+            perms = self._get().permissions
+            if isinstance(perms, TPermissionUser):
+                self.__permissions = PermissionUser.from_row(perms)
+            else:
+                self.__permissions = PermissionUser(perms)
+        return self.__permissions
 
     def basic_info(self) -> IUserBasicInfo:
         """
@@ -100,8 +100,6 @@ def remove(user: User, *_) -> dict:
     if group.immutable:
         raise BadRequest("Cannot remove immutable groups")
 
-    # Find users in group to delete, and transfer them to the transfer group
-    for u in group.get_users():
-        u.permissions.parent = transfer_group
-    group.delete()
+    # Transfer users in the group to the transfer group as it is deleted
+    group.delete(transfer_group)
     return {}
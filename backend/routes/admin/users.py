@@ -10,12 +10,14 @@ from backend.models import User, PermissionGroup, Permission
 from backend.util.validators import assert_email_valid, assert_valid_str_field
 from backend.util import http_errors
 from backend.util.tokens import uses_token
+from backend.util.transactions import uses_transaction
 
 
 users = Blueprint('users', 'users')
 
 
 @users.post('/register')
+@uses_transaction
 @uses_token
 def register(user: User, *_) -> IUserIdList:
     # TODO: Improve error messages to be more helpful to user
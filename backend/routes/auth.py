@@ -8,7 +8,7 @@ from flask import Blueprint, request
 from backend.models import User, AuthConfig, Token, Permission
 from backend.util import http_errors
 from backend.util.tokens import uses_token
-from backend.types.auth import IAuthInfo, JWT, IUserPermissions
+from backend.types.auth import IAuthInfo, IAuthRefresh, JWT, IUserPermissions
 
 
 auth = Blueprint('auth', 'auth')
@@ -65,6 +65,12 @@ def logout() -> dict:
     return {}
 
 
+@auth.post('/refresh')
+@uses_token
+def refresh(_, token: JWT) -> IAuthRefresh:
+    return {"token": Token.fromJWT(token).refresh().encode()}
+
+
 @auth.get('/permissions')
 @uses_token
 def permissions(user: User, *_) -> IUserPermissions:
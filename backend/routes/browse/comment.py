@@ -21,6 +21,7 @@ from backend.types.comment import (
 )
 from backend.types.react import IUserReacted
 from backend.util.tokens import uses_token
+from backend.util.transactions import uses_transaction
 from backend.util import http_errors
 
 comment = Blueprint("comment", "comment")
@@ -35,6 +36,7 @@ def view(user: User, *_) -> ICommentFullInfo:
 
 
 @comment.post("/create")
+@uses_transaction
 @uses_token
 def create(user: User, *_) -> ICommentId:
     user.permissions.assert_can(Permission.PostComment)
@@ -102,18 +104,19 @@ def react(user: User, *_) -> IUserReacted:
     user.permissions.assert_can(Permission.PostView)
     data = json.loads(request.data)
     comment = Comment(data["comment_id"])
-    comment.react(user)
+    reacted = comment.react(user)
 
-    if user != comment.author and comment.has_reacted(user):
+    if user != comment.author and reacted:
         NotificationReacted.create(
             comment.author,
             comment,
         )
 
-    return {"user_reacted": comment.has_reacted(user)}
+    return {"user_reacted": reacted}
 
 
 @comment.put("/accept")
+@uses_transaction
 @uses_token
 def accept(user: User, *_) -> ICommentAccepted:
     user.permissions.assert_can(Permission.PostView)
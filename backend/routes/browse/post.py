@@ -15,6 +15,7 @@ from backend.models import Permission, Post, User, Queue, ExamMode, Tag
 from backend.types.identifiers import PostId, TagId
 from backend.types.post import (
     IPostFullInfo,
+    IPostThread,
     IPostClosed,
     IPostBasicInfoList,
     IPostId,
@@ -22,22 +23,48 @@ from backend.types.post import (
 from backend.types.react import IUserReacted
 from backend.util import http_errors
 from backend.util.tokens import uses_token
+from backend.util.transactions import uses_transaction
 
 post = Blueprint("post", "post")
 
+PAGE_SIZE = 50
+"""Number of posts to list if no limit is given"""
+
+MAX_PAGE_SIZE = 200
+"""Maximum number of posts that can be listed at once"""
+
 
 @post.get("/list")
 @uses_token
 def post_list(user: User, *_) -> IPostBasicInfoList:
     user.permissions.assert_can(Permission.PostView)
     search_term: str = request.args["search_term"]
+    limit = request.args.get("limit", PAGE_SIZE, type=int)
+    before_id = request.args.get("before_id", type=int)
+    offset = request.args.get("offset", type=int)
+    if not 1 <= limit <= MAX_PAGE_SIZE:
+        raise http_errors.BadRequest(
+            f"Limit must be between 1 and {MAX_PAGE_SIZE}")
     if len(search_term) > 0:
-        posts_info = [p.basic_info(user)
-                      for p in Post.search_posts(user, search_term)]
+        # Search results are ordered by relevance rather than by ID, so they
+        # are paginated using an offset
+        if before_id is not None:
+            raise http_errors.BadRequest(
+                "Search results must be paginated using offset")
+        if offset is not None and offset < 0:
+            raise http_errors.BadRequest("Offset must not be negative")
+        posts = Post.search_posts(user, search_term, limit, offset or 0)
     else:
-        posts_info = [p.basic_info(user) for p in Post.can_view_list(user)]
+        if offset is not None:
+            raise http_errors.BadRequest(
+                "Posts must be paginated using before_id")
+        posts = Post.can_view_list(
+            user,
+            limit,
+            PostId(before_id) if before_id is not None else None,
+        )
 
-    return {"posts": posts_info}
+    return {"posts": Post.basic_info_list(posts, user)}
 
 
 @post.get("/view")
@@ -53,7 +80,21 @@ def view(user: User, *_) -> IPostFullInfo:
     return post.full_info(user)
 
 
+@post.get("/thread")
+@uses_token
+def thread(user: User, *_) -> IPostThread:
+    user.permissions.assert_can(Permission.PostView)
+    post_id = PostId(request.args["post_id"])
+    post = Post(post_id)
+    if not post.can_view(user):
+        raise http_errors.Forbidden(
+            "Do not have permissions to view this post"
+        )
+    return post.thread(user)
+
+
 @post.post("/create")
+@uses_transaction
 @uses_token
 def create(user: User, *_) -> IPostId:
     user.permissions.assert_can(Permission.PostCreate)
@@ -74,6 +115,7 @@ def create(user: User, *_) -> IPostId:
 
 
 @post.put("/edit")
+@uses_transaction
 @uses_token
 def edit(user: User, *_) -> dict:
     user.permissions.assert_can(Permission.PostCreate)
@@ -106,6 +148,7 @@ def edit(user: User, *_) -> dict:
 
 
 @post.delete("/delete")
+@uses_transaction
 @uses_token
 def delete(user: User, *_) -> dict:
     user.permissions.assert_can(Permission.PostCreate)
@@ -128,15 +171,15 @@ def react(user: User, *_) -> IUserReacted:
     user.permissions.assert_can(Permission.PostView)
     data = json.loads(request.data)
     post = Post(data["post_id"])
-    post.react(user)
+    reacted = post.react(user)
 
-    if user != post.author and post.has_reacted(user):
+    if user != post.author and reacted:
         NotificationReacted.create(
             post.author,
             post,
         )
 
-    return {"user_reacted": post.has_reacted(user)}
+    return {"user_reacted": reacted}
 
 
 @post.put("/close")
@@ -164,11 +207,7 @@ def report_post(user: User, *_):
     post = Post(data["post_id"])
     post.queue = Queue.get_reported_queue()
 
-    for u in User.all_where(
-        lambda u: u.permissions.can(Permission.ViewReports)
-    ):
-        if u not in [user, post.author]:
-            NotificationReported.create(u, post)
+    NotificationReported.enqueue(post, user)
 
     return {}
 
@@ -15,6 +15,7 @@ from backend.types.identifiers import ReplyId
 from backend.types.reply import IReplyFullInfo, IReplyId
 from backend.types.react import IUserReacted
 from backend.util.tokens import uses_token
+from backend.util.transactions import uses_transaction
 from backend.util import http_errors
 
 reply = Blueprint("reply", "reply")
@@ -30,6 +31,7 @@ def view(user: User, *_) -> IReplyFullInfo:
 
 
 @reply.post("/create")
+@uses_transaction
 @uses_token
 def create(user: User, *_) -> IReplyId:
     user.permissions.assert_can(Permission.PostComment)
@@ -101,12 +103,12 @@ def react(user: User, *_) -> IUserReacted:
     user.permissions.assert_can(Permission.PostView)
     data = json.loads(request.data)
     reply = Reply(data["reply_id"])
-    reply.react(user)
+    reacted = reply.react(user)
 
-    if user != reply.author and reply.has_reacted(user):
+    if user != reply.author and reacted:
         NotificationReacted.create(
             reply.author,
             reply,
         )
 
-    return {"user_reacted": reply.has_reacted(user)}
+    return {"user_reacted": reacted}
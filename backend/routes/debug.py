@@ -8,16 +8,21 @@ import sys
 import json
 from colorama import Fore
 from flask import Blueprint, request
-from backend.models import User, Token, Permission
+from backend.models import User, Token, Permission, jobs
 from backend.util import http_errors, db_status, setup
 from backend.util.debug import debug_active
-from backend.types.debug import IEcho, IEnabled
+from backend.types.debug import IEcho, IEnabled, IDbSettings
+from backend.models.tables import TUser
+from backend.util.db_engine import PooledSQLiteEngine
 from backend.types.auth import IAuthInfo
 from backend.types.errors import IErrorInfo
 from typing import NoReturn
 
 __debug = Blueprint('debug', 'debug')
 
+DRAIN_TIMEOUT = 30
+"""Maximum number of seconds to wait for background jobs to finish"""
+
 
 @__debug.get('/enabled')
 def enabled() -> IEnabled:
@@ -43,6 +48,26 @@ def clear() -> dict:
     return {}
 
 
+@__debug.post('/drain_jobs')
+def drain_jobs() -> dict:
+    if not jobs.drain(DRAIN_TIMEOUT):
+        raise http_errors.InternalServerError(
+            f"Background jobs didn't finish within {DRAIN_TIMEOUT} seconds")
+    return {}
+
+
+@__debug.get('/db_settings')
+def db_settings() -> IDbSettings:
+    engine = TUser._meta.db
+    if not isinstance(engine, PooledSQLiteEngine):  # pragma: no cover
+        raise http_errors.BadRequest(
+            "The database engine doesn't support pragma settings")
+    return {
+        "configured": engine.pragmas,
+        "active": engine.active_pragmas(),
+    }
+
+
 @__debug.get('/fail')
 def fail() -> NoReturn:
     raise Exception("You brought this upon yourself.")
@@ -4,28 +4,75 @@
 Notification routes
 """
 import json
+from typing import Optional
 from flask import Blueprint, request
 from backend.util import http_errors
 from backend.models import Notification, User
 from backend.util.tokens import uses_token
 from backend.types.identifiers import NotificationId
-from backend.types.notifications import INotificationList
+from backend.types.notifications import (
+    INotificationList,
+    INotificationUnreadCount,
+    INotificationPoll,
+)
 
 
 notifications = Blueprint('notifications', 'notifications')
 
+POLL_TIMEOUT = 25.0
+"""Default number of seconds to wait for new notifications when polling"""
+
+MAX_POLL_TIMEOUT = 60.0
+"""Maximum number of seconds to wait for new notifications when polling"""
+
+MAX_SEEN_MANY = 500
+"""
+Maximum number of notification IDs that can be given to `seen_many`. Larger
+selections should use `up_to_id` instead.
+"""
+
 
 @notifications.get('/list')
 @uses_token
 def list_notifs(user: User, *_) -> INotificationList:
+    limit = request.args.get("limit", type=int)
+    before_id = request.args.get("before_id", type=NotificationId)
+    if limit is not None and limit < 1:
+        raise http_errors.BadRequest("Limit must be a positive integer")
     return {
         "notifications": list(map(
             lambda n: n.get_info(),
-            Notification.all(user),
+            Notification.all(user, limit=limit, before_id=before_id),
         ))
     }
 
 
+@notifications.get('/unread_count')
+@uses_token
+def unread_count(user: User, *_) -> INotificationUnreadCount:
+    return {"unread_count": Notification.unread_count(user)}
+
+
+@notifications.get('/poll')
+@uses_token
+def poll(user: User, *_) -> INotificationPoll:
+    after_id = request.args.get("after_id", type=NotificationId)
+    timeout = request.args.get("timeout", POLL_TIMEOUT, type=float)
+    if not 0 <= timeout <= MAX_POLL_TIMEOUT:
+        raise http_errors.BadRequest(
+            f"Timeout must be between 0 and {MAX_POLL_TIMEOUT} seconds")
+    if after_id is None:
+        # IDs start at 1, so if there are no notifications yet, any new
+        # notification will be returned
+        after_id = Notification.latest_id(user) or NotificationId(0)
+    notifs = Notification.wait_for_new(user, after_id, timeout)
+    return {
+        "notifications": [n.get_info() for n in notifs],
+        "unread_count": Notification.unread_count(user),
+        "last_id": notifs[0].id if len(notifs) else after_id,
+    }
+
+
 @notifications.put('/seen')
 @uses_token
 def seen(user: User, *_) -> dict:
@@ -37,3 +84,33 @@ def seen(user: User, *_) -> dict:
                                     "to user")
     notif.seen = value
     return {}
+
+
+@notifications.put('/seen_many')
+@uses_token
+def seen_many(user: User, *_) -> dict:
+    data = json.loads(request.data)
+    value: bool = data["value"]
+    ids: Optional[list[NotificationId]] = data.get("notification_ids")
+    up_to_id: Optional[NotificationId] = data.get("up_to_id")
+    if (ids is None) == (up_to_id is None):
+        raise http_errors.BadRequest(
+            "Exactly one of notification_ids and up_to_id must be given")
+    # Bools are ints in Python, but they aren't valid IDs
+    if not isinstance(value, bool):
+        raise http_errors.BadRequest("value must be a boolean")
+    if ids is not None and (
+        not isinstance(ids, list)
+        or any(not isinstance(i, int) or isinstance(i, bool) for i in ids)
+    ):
+        raise http_errors.BadRequest(
+            "notification_ids must be a list of integers")
+    if ids is not None and len(ids) > MAX_SEEN_MANY:
+        raise http_errors.BadRequest(
+            f"At most {MAX_SEEN_MANY} notification_ids can be given")
+    if up_to_id is not None and (
+        not isinstance(up_to_id, int) or isinstance(up_to_id, bool)
+    ):
+        raise http_errors.BadRequest("up_to_id must be an integer")
+    Notification.set_seen_many(user, value, ids, up_to_id)
+    return {}
@@ -8,7 +8,7 @@ from flask import Blueprint, request
 from backend.models import User, Queue, Post, Permission
 from backend.models.notifications import NotificationQueueAdded
 from backend.types.identifiers import QueueId, PostId
-from backend.types.queue import IQueueFullInfo, IQueueList
+from backend.types.queue import IQueueFullInfo, IQueueList, IQueueBoard
 from backend.util.tokens import uses_token
 from backend.util.validators import assert_valid_str_field
 from backend.types.queue import IQueueId
@@ -22,7 +22,14 @@ taskboard = Blueprint('taskboard', 'taskboard')
 @uses_token
 def queue_list(user: User, *_) -> IQueueList:
     user.permissions.assert_can(Permission.ViewTaskboard)
-    return {"queues": list(map(lambda q: q.basic_info(user), Queue.all()))}
+    return {"queues": Queue.basic_info_list(Queue.all(), user)}
+
+
+@taskboard.get("/board")
+@uses_token
+def board(user: User, *_) -> IQueueBoard:
+    user.permissions.assert_can(Permission.ViewTaskboard)
+    return Queue.board(user)
 
 
 @taskboard.post("/queue_list/create")
@@ -92,14 +99,7 @@ def queue_post_add(user: User, *_) -> dict:
 
     post.queue = queue
 
-    for u in queue.get_followers():
-        if u != user:
-            NotificationQueueAdded.create(
-                u,
-                user,
-                post,
-                queue,
-            )
+    NotificationQueueAdded.enqueue(user, post, queue)
 
     return {}
 
@@ -106,7 +106,7 @@ def edit_email(user: User, *_) -> dict:
     subject = User(UserId(data['user_id']))
 
     try:
-        if User.from_email(email) != user:
+        if User.from_email(email) != subject:
             raise http_errors.BadRequest("Duplicate email")
     except MatchNotFound:
         pass
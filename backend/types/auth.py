@@ -27,6 +27,15 @@ class IAuthInfo(TypedDict):
     permissions: list[IPermissionValueGroup]
 
 
+class IAuthRefresh(TypedDict):
+    """
+    A refreshed token, returned when refreshing a token
+
+    * `token`: `JWT`
+    """
+    token: JWT
+
+
 class IUserPermissions(TypedDict):
     """
     Info on the permissions of a current user
@@ -7,3 +7,8 @@ class IEcho(TypedDict):
 
 class IEnabled(TypedDict):
     value: bool
+
+
+class IDbSettings(TypedDict):
+    configured: dict[str, str]
+    active: dict[str, str]
@@ -32,6 +32,9 @@ class INotificationInfo(TypedDict):
       this property is non-null, then `comment` and `post` will also be
       defined.
     * `queue` (`int`, optional): ID of queue related to the notification
+    * `count` (`int`): number of times the notification was sent, since
+      similar notifications (such as reactions to the same post) are merged
+      together while they are unseen
     """
     notification_id: NotificationId
     user_from: Optional[UserId]
@@ -43,6 +46,7 @@ class INotificationInfo(TypedDict):
     comment: Optional[CommentId]
     reply: Optional[ReplyId]
     queue: Optional[QueueId]
+    count: int
 
 
 class INotificationList(TypedDict):
@@ -65,5 +69,31 @@ class INotificationList(TypedDict):
               `post` will also be defined.
             * `queue` (`int`, optional): ID of queue related to the
               notification.
+            * `count` (`int`): number of times the notification was sent,
+              since similar unseen notifications are merged together
     """
     notifications: list[INotificationInfo]
+
+
+class INotificationUnreadCount(TypedDict):
+    """
+    Number of notifications that haven't been seen
+
+    * `unread_count` (`int`): number of unseen notifications
+    """
+    unread_count: int
+
+
+class INotificationPoll(TypedDict):
+    """
+    New notifications, given when polling for them
+
+    * `notifications`: list of new notifications, from newest to oldest, in
+      the same format as `INotificationInfo`
+    * `unread_count` (`int`): number of unseen notifications
+    * `last_id` (`int`): ID of the newest notification, to be given when
+      polling again, or `0` if there are no notifications
+    """
+    notifications: list[INotificationInfo]
+    unread_count: int
+    last_id: NotificationId
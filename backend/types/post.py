@@ -1,5 +1,7 @@
 from typing import TypedDict, Optional
 from .identifiers import CommentId, PostId, UserId, TagId
+from .comment import ICommentFullInfo
+from .reply import IReplyFullInfo
 
 
 class IPostBasicInfo(TypedDict):
@@ -104,3 +106,18 @@ class IPostClosed(TypedDict):
     * `closed`: `bool`
     """
     closed: bool
+
+
+class IPostThread(TypedDict):
+    """
+    Full info about a post, its comments and their replies
+
+    * `post` (`IPostFullInfo`): info about the post
+    * `comments` (`list[ICommentFullInfo]`): info about each comment, in the
+      same order as `post["comments"]`
+    * `replies` (`list[IReplyFullInfo]`): info about every reply to the
+      comments, from oldest to newest
+    """
+    post: IPostFullInfo
+    comments: list[ICommentFullInfo]
+    replies: list[IReplyFullInfo]
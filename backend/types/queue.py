@@ -1,5 +1,6 @@
 from typing import TypedDict
 from .identifiers import QueueId, PostId
+from .post import IPostBasicInfo
 
 
 class IQueueId(TypedDict):
@@ -58,3 +59,31 @@ class IQueueList(TypedDict):
             * `posts` (`list[int]`): list of post IDs in the queue
     """
     queues: list[IQueueBasicInfo]
+
+
+class IQueueBoardInfo(TypedDict):
+    """
+    Info about a queue and the posts in it, as shown on the taskboard
+
+    * `queue_name` (`str`): name of queue
+    * `queue_id` (`QueueId`): ID of queue
+    * `view_only` (`bool`): whether queue is view only (posts can't be moved
+      to/from it)
+    * `following` (`bool`): whether the user is following it
+    * `posts` (`list[IPostBasicInfo]`): basic info of the posts in the queue
+      that the user can view, from oldest to newest
+    """
+    queue_id: QueueId
+    queue_name: str
+    view_only: bool
+    following: bool
+    posts: list[IPostBasicInfo]
+
+
+class IQueueBoard(TypedDict):
+    """
+    Every queue and the posts in them, as shown on the taskboard
+
+    * `queues`: list of `IQueueBoardInfo`
+    """
+    queues: list[IQueueBoardInfo]
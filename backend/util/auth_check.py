@@ -2,11 +2,70 @@
 # Backend / Util / Auth check
 
 Code for checking authentication
+
+Requests to the auth server are made using a shared session, so that
+connections are kept alive between logins rather than each login needing a
+new connection (and TLS handshake). Every request has a timeout, so that an
+unresponsive auth server can't hold up the server indefinitely.
 """
 import re
+import hmac
+import os
 import requests
-from typing import Literal
+from hashlib import sha256
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from typing import Literal, Optional
 from . import http_errors
+from .cache import LruCache
+from .circuit_breaker import CircuitBreaker
+
+
+POOL_SIZE = 10
+"""Maximum number of connections to keep open to each host"""
+
+CONNECT_TIMEOUT = 3.05
+"""Number of seconds to wait while connecting to the auth server"""
+
+READ_TIMEOUT = 10.0
+"""Number of seconds to wait for the auth server to respond"""
+
+CONNECT_RETRIES = 1
+"""
+Number of times to retry connecting to the auth server. Requests that reached
+the server are never retried.
+"""
+
+_session = requests.Session()
+_adapter = HTTPAdapter(
+    pool_connections=POOL_SIZE,
+    pool_maxsize=POOL_SIZE,
+    max_retries=Retry(
+        total=CONNECT_RETRIES,
+        connect=CONNECT_RETRIES,
+        read=0,
+        redirect=0,
+        status=0,
+        other=0,
+    ),
+)
+_session.mount("http://", _adapter)
+_session.mount("https://", _adapter)
+
+# Caches of successful logins are keyed by a salted hash of the credentials,
+# so that they aren't kept in memory. The salt is different for every process.
+_salt = os.urandom(32)
+
+
+def _cache_key(*values: str) -> str:
+    """
+    Returns a salted hash of the given values
+    """
+    return hmac.new(
+        _salt,
+        "\0".join(values).encode(),
+        sha256,
+    ).hexdigest()
 
 
 def do_auth_check(
@@ -17,6 +76,8 @@ def do_auth_check(
     success_regex: str,
     username: str,
     password: str,
+    breaker: Optional[CircuitBreaker] = None,
+    cache: Optional[LruCache[str, bool]] = None,
 ) -> bool:
     """
     Returns whether the authentication has worked for a particular user
@@ -36,54 +97,95 @@ def do_auth_check(
 
     * `password` (`str`): password to check
 
+    * `breaker` (`Optional[CircuitBreaker]`, optional): circuit breaker
+      tracking failures of the auth server. If given, requests aren't made
+      while it is open.
+
+    * `cache` (`Optional[LruCache[str, bool]]`, optional): cache used to
+      remember successful logins. If given, logins that succeeded recently
+      are accepted without making a request.
+
+    ### Raises:
+    * `BadRequest`: the auth server couldn't be reached or gave an error
+
+    * `ServiceUnavailable`: the auth server timed out, or has failed too
+      many times recently
+
     ### Returns:
     * `bool`: whether the authentication succeeded
     """
+    key = _cache_key(
+        address,
+        request_type,
+        username_param,
+        password_param,
+        success_regex,
+        username,
+        password,
+    )
+    if cache is not None and cache.get(key):
+        return True
+
+    if breaker is not None and not breaker.allow():
+        raise http_errors.ServiceUnavailable(
+            "The auth server is currently unavailable. Please try again "
+            "later."
+        )
+    credentials = {
+        username_param: username,
+        password_param: password,
+    }
     try:
         match request_type:
-            case "get":
-                res = requests.get(
-                    address,
-                    params={
-                        username_param: username,
-                        password_param: password,
-                    }
-                )
-            case "post":
-                res = requests.post(
+            case "get" | "delete":
+                res = _session.request(
+                    request_type,
                     address,
-                    json={
-                        username_param: username,
-                        password_param: password,
-                    }
+                    params=credentials,
+                    timeout=(CONNECT_TIMEOUT, READ_TIMEOUT),
                 )
-            case "put":
-                res = requests.put(
+            case "post" | "put":
+                res = _session.request(
+                    request_type,
                     address,
-                    json={
-                        username_param: username,
-                        password_param: password,
-                    }
+                    json=credentials,
+                    timeout=(CONNECT_TIMEOUT, READ_TIMEOUT),
                 )
-            case "delete":
-                res = requests.delete(
-                    address,
-                    params={
-                        username_param: username,
-                        password_param: password,
-                    }
-                )
-    # Check for basic errors
+    # Check for basic errors. Connection timeouts are also connection
+    # errors, so timeouts need to be checked first.
+    except requests.Timeout:
+        if breaker is not None:
+            breaker.record_failure()
+        raise http_errors.ServiceUnavailable(
+            f"The auth server at {address} took too long to respond."
+        )
     except requests.ConnectionError:
+        if breaker is not None:
+            breaker.record_failure()
         raise http_errors.BadRequest(
             f"Unable to connect to {address} for login auth. Please double "
             f"check the address."
         )
     except requests.exceptions.InvalidSchema:
+        # The address is misconfigured, which doesn't mean that the auth
+        # server is down
+        if breaker is not None:
+            breaker.record_skipped()
         raise http_errors.BadRequest(
             f"Invalid schema for {address} when checking login auth. Please "
             f"ensure your address contains the schema (such as http://)."
         )
+    except BaseException:
+        # Make sure that a trial request always gives the breaker a result
+        if breaker is not None:
+            breaker.record_failure()
+        raise
+    if breaker is not None:
+        # Only errors on the auth server's end mean that it's unavailable
+        if res.status_code >= 500:
+            breaker.record_failure()
+        else:
+            breaker.record_success()
     # Make sure the request worked properly
     if res.status_code != 200:
         c = res.status_code
@@ -98,8 +200,11 @@ def do_auth_check(
         )
 
     try:
-        return re.match(success_regex, res.text) is not None
+        success = re.match(success_regex, res.text) is not None
     except re.error as e:
         raise http_errors.BadRequest(
             f"Invalid regular expression {success_regex}"
         ) from e
+    if cache is not None and success:
+        cache.put(key, True)
+    return success
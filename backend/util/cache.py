@@ -0,0 +1,93 @@
+"""
+# Backend / Util / Cache
+
+A small thread-safe cache with a bounded size, where entries expire after a
+set amount of time
+"""
+import time
+from collections import OrderedDict
+from threading import Lock
+from typing import Generic, Hashable, Optional, TypeVar
+
+K = TypeVar('K', bound=Hashable)
+V = TypeVar('V')
+
+
+class LruCache(Generic[K, V]):
+    """
+    A least-recently-used cache with expiring entries
+
+    Once the cache is full, adding an entry removes the entry that was used
+    least recently. Entries are also discarded once they are older than the
+    given time-to-live, so that changes made outside this process are picked
+    up eventually.
+    """
+
+    def __init__(self, max_size: int, ttl: float) -> None:
+        """
+        Create a cache
+
+        ### Args:
+        * `max_size` (`int`): maximum number of entries to store
+
+        * `ttl` (`float`): number of seconds that entries stay valid for
+        """
+        self.__max_size = max_size
+        self.__ttl = ttl
+        self.__entries: OrderedDict[K, tuple[float, V]] = OrderedDict()
+        self.__lock = Lock()
+
+    def get(self, key: K) -> Optional[V]:
+        """
+        Returns the value stored for the given key, or `None` if it isn't in
+        the cache or has expired
+
+        ### Args:
+        * `key` (`K`): key to look up
+
+        ### Returns:
+        * `Optional[V]`: cached value
+        """
+        with self.__lock:
+            entry = self.__entries.get(key)
+            if entry is None:
+                return None
+            expiry, value = entry
+            if expiry < time.monotonic():
+                del self.__entries[key]
+                return None
+            self.__entries.move_to_end(key)
+            return value
+
+    def put(self, key: K, value: V) -> None:
+        """
+        Store a value in the cache, removing the least recently used entry if
+        the cache is full
+
+        ### Args:
+        * `key` (`K`): key to store the value under
+
+        * `value` (`V`): value to store
+        """
+        with self.__lock:
+            self.__entries[key] = (time.monotonic() + self.__ttl, value)
+            self.__entries.move_to_end(key)
+            while len(self.__entries) > self.__max_size:
+                self.__entries.popitem(last=False)
+
+    def evict(self, key: K) -> None:
+        """
+        Remove the entry for the given key, if there is one
+
+        ### Args:
+        * `key` (`K`): key to remove
+        """
+        with self.__lock:
+            self.__entries.pop(key, None)
+
+    def clear(self) -> None:
+        """
+        Remove all entries from the cache
+        """
+        with self.__lock:
+            self.__entries.clear()
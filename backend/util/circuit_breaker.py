@@ -0,0 +1,103 @@
+"""
+# Backend / Util / Circuit Breaker
+
+A circuit breaker, used to stop sending requests to a service that keeps
+failing, so that requests fail straight away rather than each waiting for the
+service to time out.
+"""
+import time
+from threading import Lock
+
+
+class CircuitBreaker:
+    """
+    Tracks the failures of a service
+
+    The breaker starts off closed, allowing requests. Once enough requests
+    fail in a row it opens, rejecting all requests. After a while, a single
+    trial request is allowed through; if it succeeds the breaker closes
+    again, otherwise it stays open for another while.
+    """
+
+    def __init__(self, failure_threshold: int, reset_timeout: float) -> None:
+        """
+        Create a circuit breaker
+
+        ### Args:
+        * `failure_threshold` (`int`): number of failures in a row that opens
+          the breaker
+
+        * `reset_timeout` (`float`): number of seconds to stay open before
+          allowing a trial request
+        """
+        self.__failure_threshold = failure_threshold
+        self.__reset_timeout = reset_timeout
+        self.__failures = 0
+        self.__opened_at = 0.0
+        self.__trial_running = False
+        self.__lock = Lock()
+
+    @property
+    def is_open(self) -> bool:
+        """
+        Whether the breaker is currently open (including while a trial request
+        is being made)
+        """
+        with self.__lock:
+            return self.__failures >= self.__failure_threshold
+
+    def allow(self) -> bool:
+        """
+        Returns whether a request should be made. If this returns `True`, the
+        result of the request must be given using `record_success`,
+        `record_failure` or `record_skipped`.
+
+        ### Returns:
+        * `bool`: whether to make the request
+        """
+        with self.__lock:
+            if self.__failures < self.__failure_threshold:
+                return True
+            if self.__trial_running or (
+                time.monotonic() < self.__opened_at + self.__reset_timeout
+            ):
+                return False
+            self.__trial_running = True
+            return True
+
+    def record_success(self) -> None:
+        """
+        Record that a request succeeded, closing the breaker
+        """
+        with self.__lock:
+            self.__failures = 0
+            self.__trial_running = False
+
+    def record_failure(self) -> None:
+        """
+        Record that a request failed, opening the breaker if there have been
+        too many failures
+        """
+        with self.__lock:
+            self.__failures += 1
+            self.__trial_running = False
+            if self.__failures >= self.__failure_threshold:
+                self.__opened_at = time.monotonic()
+
+    def record_skipped(self) -> None:
+        """
+        Record that a request wasn't made, or failed for a reason that says
+        nothing about whether the server is available. This leaves the state
+        of the breaker unchanged, except that another trial request can be
+        made.
+        """
+        with self.__lock:
+            self.__trial_running = False
+
+    def reset(self) -> None:
+        """
+        Close the breaker, forgetting any failures
+        """
+        with self.__lock:
+            self.__failures = 0
+            self.__trial_running = False
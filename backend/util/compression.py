@@ -0,0 +1,97 @@
+"""
+# Backend / Util / Compression
+
+Compression of responses, so that large responses (such as the list of posts)
+take less time to download on slow connections.
+
+Responses are compressed using the best encoding that the client accepts,
+preferring Brotli if the `brotli` package is installed, then gzip. Small
+responses aren't compressed, since the time taken to compress them outweighs
+the time saved sending them.
+"""
+import gzip
+from flask import Response, request
+from typing import cast
+
+try:
+    import brotli  # type: ignore
+except ImportError:
+    HAS_BROTLI = False
+else:  # pragma: no cover
+    HAS_BROTLI = True
+
+
+MIN_SIZE = 1024
+"""Minimum size of a response (in bytes) for it to be compressed"""
+
+GZIP_LEVEL = 6
+"""Compression level to use for gzip, from 1 (fastest) to 9 (smallest)"""
+
+BROTLI_QUALITY = 5
+"""Quality to use for Brotli, from 0 (fastest) to 11 (smallest)"""
+
+COMPRESSIBLE_TYPES = {"application/json", "text/html", "text/plain"}
+"""Mimetypes of responses that are worth compressing"""
+
+
+def supported_encodings() -> list[str]:
+    """
+    Returns the encodings that responses can be compressed with, in order of
+    preference
+
+    ### Returns:
+    * `list[str]`: names of encodings
+    """
+    return ["br", "gzip"] if HAS_BROTLI else ["gzip"]
+
+
+def compress(data: bytes, encoding: str) -> bytes:
+    """
+    Compress data using the given encoding
+
+    ### Args:
+    * `data` (`bytes`): data to compress
+
+    * `encoding` (`str`): encoding to use, from `supported_encodings`
+
+    ### Returns:
+    * `bytes`: compressed data
+    """
+    if encoding == "br":  # pragma: no cover
+        return cast(bytes, brotli.compress(data, quality=BROTLI_QUALITY))
+    else:
+        return gzip.compress(data, compresslevel=GZIP_LEVEL, mtime=0)
+
+
+def compress_response(response: Response) -> Response:
+    """
+    Compress a response if it is large enough, and the client accepts a
+    supported encoding. This should be registered to run after each request.
+
+    ### Args:
+    * `response` (`Response`): response to compress
+
+    ### Returns:
+    * `Response`: the same response, compressed if appropriate
+    """
+    if (
+        response.direct_passthrough
+        or response.is_streamed
+        or response.status_code < 200
+        or response.status_code >= 300
+        or "Content-Encoding" in response.headers
+        or response.mimetype not in COMPRESSIBLE_TYPES
+    ):
+        return response
+    # Whether the response is compressed depends on this header, so caches
+    # need to take it into account
+    response.vary.add("Accept-Encoding")
+    encoding = request.accept_encodings.best_match(supported_encodings())
+    if encoding is None:
+        return response
+    data = response.get_data()
+    if len(data) < MIN_SIZE:
+        return response
+    response.set_data(compress(data, encoding))
+    response.headers["Content-Encoding"] = encoding
+    return response
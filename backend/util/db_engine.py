@@ -0,0 +1,333 @@
+"""
+# Backend / Util / DB Engine
+
+Database engine used by Piccolo, which keeps a small pool of long-lived SQLite
+connections rather than opening a new connection for every query.
+
+Piccolo's regular `SQLiteEngine` opens a new `aiosqlite` connection (which
+runs in its own thread) for each query. Since every model uses `run_sync`,
+this setup cost is paid for every single query, and generally outweighs the
+cost of the query itself. Queries that run within a transaction are
+unaffected, and still use a dedicated connection.
+
+Queries can also be grouped into a single transaction using
+`write_transaction`, which makes every query on the current thread use the
+same connection until it ends. This is used both for Piccolo's `atomic`
+transactions and for request-scoped transactions (see
+`backend.util.transactions`), so that a route which makes many changes only
+commits (and syncs to disk) once.
+
+Every connection is configured using a profile of SQLite pragmas. By default
+these enable write-ahead logging so that reading doesn't block on writes, but
+each can be overridden using an environment variable named after the pragma,
+for example `ENSEMBLE_SQLITE_JOURNAL_MODE=DELETE`.
+"""
+import os
+import re
+import sqlite3
+import threading
+from queue import Empty, SimpleQueue
+from typing import Any, Callable, Iterator, Optional, cast
+from contextlib import contextmanager
+from piccolo.table import Table
+from piccolo.engine.sqlite import Atomic, SQLiteEngine, dict_factory
+
+
+POOL_SIZE = 4
+"""Maximum number of idle connections to keep open"""
+
+DEFAULT_PRAGMAS = {
+    "journal_mode": "WAL",
+    "busy_timeout": "5000",
+    "synchronous": "NORMAL",
+    "mmap_size": str(256 * 1024 * 1024),
+    # Negative sizes are in KiB rather than pages
+    "cache_size": str(-32 * 1024),
+    "temp_store": "MEMORY",
+}
+"""Default values of the pragmas applied to each connection"""
+
+PRAGMA_ENV_PREFIX = "ENSEMBLE_SQLITE_"
+"""Prefix of environment variables used to override pragmas"""
+
+
+def load_pragmas() -> dict[str, str]:
+    """
+    Returns the pragmas to apply to each connection, using the defaults unless
+    they are overridden by environment variables
+
+    ### Raises:
+    * `ValueError`: a pragma value is invalid
+
+    ### Returns:
+    * `dict[str, str]`: mapping of pragma names to values
+    """
+    pragmas: dict[str, str] = {}
+    for name, default in DEFAULT_PRAGMAS.items():
+        value = os.getenv(PRAGMA_ENV_PREFIX + name.upper(), default)
+        # Pragma values can't be given as query parameters, so make sure they
+        # can't be used to inject SQL
+        if re.fullmatch(r"-?\w+", value) is None:
+            raise ValueError(f"Invalid value for SQLite pragma {name}")
+        pragmas[name] = value
+    return pragmas
+
+
+class PooledSQLiteEngine(SQLiteEngine):
+    """
+    SQLite engine which reuses connections between queries
+    """
+
+    def __init__(
+        self,
+        path: str = "piccolo.sqlite",
+        pragmas: Optional[dict[str, str]] = None,
+        **kwargs,
+    ) -> None:
+        """
+        Create the engine
+
+        ### Args:
+        * `path` (`str`): path to the database file
+
+        * `pragmas` (`Optional[dict[str, str]]`): pragmas to apply to each
+          connection. Defaults to no pragmas.
+        """
+        super().__init__(path, **kwargs)
+        self.__pool: SimpleQueue[sqlite3.Connection] = SimpleQueue()
+        self.__pragmas = pragmas if pragmas is not None else {}
+        # Transaction that is active on each thread
+        self.__local = threading.local()
+
+    @property
+    def pragmas(self) -> dict[str, str]:
+        """
+        Pragmas applied to each connection, as they were configured
+        """
+        return dict(self.__pragmas)
+
+    def active_pragmas(self) -> dict[str, str]:
+        """
+        Returns the values of the configured pragmas, as reported by SQLite on
+        a connection from the pool. SQLite reports some values numerically,
+        for example `synchronous` is `1` when it is set to `NORMAL`.
+
+        ### Returns:
+        * `dict[str, str]`: mapping of pragma names to values
+        """
+        with self.connection() as connection:
+            return {
+                name: str(next(iter(
+                    connection.execute(f"PRAGMA {name}").fetchone().values()
+                )))
+                for name in self.__pragmas
+            }
+
+    def __connect(self) -> sqlite3.Connection:
+        """
+        Open a new connection to the database, configured the same way as
+        Piccolo's connections
+        """
+        connection = sqlite3.connect(
+            **cast(dict[str, Any], self.connection_kwargs),
+            check_same_thread=False,
+        )
+        connection.row_factory = dict_factory
+        connection.execute("PRAGMA foreign_keys = 1")
+        for name, value in self.__pragmas.items():
+            connection.execute(f"PRAGMA {name} = {value}")
+        return connection
+
+    async def get_connection(self):
+        # Used by Piccolo for transactions
+        connection = await super().get_connection()
+        for name, value in self.__pragmas.items():
+            await connection.execute(f"PRAGMA {name} = {value}")
+        return connection
+
+    @contextmanager
+    def connection(self) -> Iterator[sqlite3.Connection]:
+        """
+        Borrow a connection from the pool, opening a new one if none are
+        available. The connection is returned to the pool afterwards, unless
+        the pool is already full.
+
+        If a transaction is active on the current thread, its connection is
+        used instead.
+
+        ### Yields:
+        * `sqlite3.Connection`: connection to use
+        """
+        current = self.__current()
+        if current is not None:
+            # Queries within a transaction need to use its connection
+            yield current.connection
+            return
+        try:
+            connection = self.__pool.get_nowait()
+        except Empty:
+            connection = self.__connect()
+        try:
+            yield connection
+        except BaseException:
+            # If something went wrong, the connection could be in an unknown
+            # state, so don't reuse it
+            connection.close()
+            raise
+        if self.__pool.qsize() < POOL_SIZE:
+            self.__pool.put(connection)
+        else:
+            connection.close()
+
+    def __current(self) -> Optional["_Transaction"]:
+        """
+        Returns the transaction that is active on the current thread, if any
+        """
+        return cast(
+            Optional[_Transaction],
+            getattr(self.__local, "transaction", None),
+        )
+
+    @property
+    def in_transaction(self) -> bool:
+        """
+        Whether a transaction started using `write_transaction` is active on
+        the current thread
+        """
+        return self.__current() is not None
+
+    @contextmanager
+    def write_transaction(self) -> Iterator[sqlite3.Connection]:
+        """
+        Run queries within a transaction, which takes the write lock straight
+        away so that it can't be interrupted by other writers. It is committed
+        if the block finishes, and rolled back if it raises an exception.
+
+        Until the transaction ends, every query on the current thread uses
+        its connection, so models can be used within it as usual.
+
+        Transactions can be nested, in which case the inner transaction uses
+        a savepoint. It can be rolled back without affecting the outer
+        transaction, but isn't committed until the outer transaction is.
+
+        ### Yields:
+        * `sqlite3.Connection`: connection used by the transaction
+        """
+        current = self.__current()
+        if current is not None:
+            name = f"nested_{current.depth}"
+            current.depth += 1
+            current.connection.execute(f"SAVEPOINT {name}")
+            try:
+                yield current.connection
+            except BaseException:
+                if current.connection.in_transaction:
+                    current.connection.execute(f"ROLLBACK TO {name}")
+                    current.connection.execute(f"RELEASE {name}")
+                raise
+            else:
+                current.connection.execute(f"RELEASE {name}")
+            finally:
+                current.depth -= 1
+            return
+        with self.connection() as connection:
+            transaction = _Transaction(connection)
+            connection.execute("BEGIN IMMEDIATE")
+            self.__local.transaction = transaction
+            try:
+                yield connection
+                connection.execute("COMMIT")
+            except BaseException:
+                if connection.in_transaction:
+                    connection.execute("ROLLBACK")
+                raise
+            finally:
+                self.__local.transaction = None
+        for callback in transaction.on_commit:
+            callback()
+
+    def after_commit(self, callback: Callable[[], Any]) -> None:
+        """
+        Call a function once the transaction on the current thread has been
+        committed, or straight away if there is no transaction. This should
+        be used to let other threads know about changes, since they can't see
+        them until they are committed. The function isn't called if the
+        transaction is rolled back.
+
+        ### Args:
+        * `callback` (`Callable[[], Any]`): function to call
+        """
+        current = self.__current()
+        if current is None:
+            callback()
+        else:
+            current.on_commit.append(callback)
+
+    def atomic(self, *args, **kwargs) -> Atomic:
+        # Piccolo's transactions use a separate connection, which would need
+        # to wait for the write lock if a transaction is already active
+        return _PooledAtomic(self)
+
+    def close_all(self) -> None:
+        """
+        Close all idle connections in the pool
+        """
+        while True:
+            try:
+                self.__pool.get_nowait().close()
+            except Empty:
+                return
+
+    async def _run_in_new_connection(
+        self,
+        query: str,
+        args: Optional[list[Any]] = None,
+        query_type: str = "generic",
+        table: Optional[type[Table]] = None,
+    ):
+        # Piccolo only calls this from `run_sync`, which gives each query its
+        # own event loop, so blocking here doesn't hold up other queries
+        if args is None:
+            args = []
+        with self.connection() as connection:
+            cursor = connection.execute(query, args)
+            try:
+                if (
+                    query_type == "insert"
+                    and sqlite3.sqlite_version_info < (3, 35)
+                ):
+                    # We can't use the RETURNING clause on older versions
+                    # of SQLite
+                    assert table is not None
+                    pk = table._meta.primary_key._meta.db_column_name
+                    return [{pk: cursor.lastrowid}]
+                else:
+                    return cursor.fetchall()
+            finally:
+                cursor.close()
+
+
+class _Transaction:
+    """
+    State of a transaction started using `write_transaction`
+    """
+
+    def __init__(self, connection: sqlite3.Connection) -> None:
+        self.connection = connection
+        self.depth = 0
+        self.on_commit: list[Callable[[], Any]] = []
+
+
+class _PooledAtomic(Atomic):
+    """
+    Runs a group of Piccolo queries using `write_transaction`
+    """
+
+    async def run(self):
+        engine = cast(PooledSQLiteEngine, self.engine)
+        try:
+            with engine.write_transaction():
+                for query in self.queries:
+                    await query.run()
+        finally:
+            self.queries = []
@@ -4,12 +4,22 @@
 Contains helper code for running database queries
 """
 from backend.models.tables import _BaseTable
-from typing import TypeVar, cast
+from piccolo.columns import Column
+from piccolo.columns.combination import Combinable
+from piccolo.query.methods.insert import Insert
+from piccolo.query.methods.update import Update
+from typing import Any, Sequence, TypeVar, Union, cast
 from .exceptions import IdNotFound
 
 
 T = TypeVar('T', bound=_BaseTable)
 
+MAX_VARIABLES = 999
+"""
+Maximum number of parameters in a single query, which is the lowest limit
+used by any version of SQLite
+"""
+
 
 def id_exists(table: type[_BaseTable], id: int) -> bool:
     """
@@ -44,24 +54,101 @@ def assert_id_exists(table: type[_BaseTable], id: int, type: str = "") -> None:
         raise IdNotFound(f"{type}Id {id} not found")
 
 
-def get_by_id(table: type[T], id: int) -> T:
+def get_by_id(table: type[T], id: int, type: str = "") -> T:
     """
     Returns a row in the table that has the given ID
 
     This row can be edited as required, as long as it is saved afterwards.
 
+    This performs both the existence check and the fetch using a single
+    query, so it should be preferred over calling `assert_id_exists` followed
+    by another lookup.
+
     ### Args:
     * `table` (`type[T]`): table to search in
 
     * `id` (`int`): id to search for
 
+    * `type` (`str`, optional): name of the type of ID, used to give a more
+      helpful error message
+
     ### Returns:
     * `T`: value to search for
 
     ### Raises:
-    * `KeyError`: when the value doesn't exist
+    * `IdNotFound`: when the value doesn't exist
     """
+    if not isinstance(id, int):
+        raise TypeError(
+            f"ID {id!r} is a {id.__class__.__name__}, but should be an int - "
+            f"this probably means you're not getting database values "
+            f"correctly"
+        )
     result = table.objects().where(table.id == id).first().run_sync()
     if result is None:
+        if type:
+            raise IdNotFound(f"{type}Id {id} not found")
         raise IdNotFound(f"id {id} not found in table {table.__name__}")
     return cast(T, result)
+
+
+def bulk_update(
+    table: type[_BaseTable],
+    values: dict[Union[Column, str], Any],
+    *where: Combinable,
+) -> Update:
+    """
+    Returns a query that sets the given values on every matching row of the
+    table using a single `UPDATE` statement, rather than fetching and saving
+    each row individually.
+
+    The query isn't run, so that it can be added to a transaction, such as
+    one created using `table._meta.db.atomic()`. Otherwise, call `run_sync`
+    on it.
+
+    ### Args:
+    * `table` (`type[_BaseTable]`): table to update
+
+    * `values` (`dict[Column | str, Any]`): mapping of columns (or their
+      names) to their new values
+
+    * `*where` (`Combinable`): conditions that rows must match to be updated.
+      At least one is required, to avoid accidentally updating every row.
+
+    ### Returns:
+    * `Update`: the update query
+    """
+    if len(where) == 0:
+        raise ValueError(
+            f"No conditions given when updating {table.__name__} - this "
+            f"would update every row"
+        )
+    return table.update(values).where(*where)
+
+
+def bulk_insert(
+    table: type[T],
+    rows: Sequence[T],
+) -> list[Insert]:
+    """
+    Returns queries that insert the given rows, using as few `INSERT`
+    statements as possible. Rows are split into batches so that each
+    statement stays within SQLite's limit on the number of parameters, which
+    depends on the number of columns in the table.
+
+    As with `bulk_update`, the queries aren't run, so that they can be added
+    to a transaction.
+
+    ### Args:
+    * `table` (`type[T]`): table to insert into
+
+    * `rows` (`Sequence[T]`): rows to insert
+
+    ### Returns:
+    * `list[Insert]`: the insert queries, which is empty if there are no rows
+    """
+    batch_size = max(1, MAX_VARIABLES // len(table._meta.columns))
+    return [
+        table.insert(*rows[i:i + batch_size])
+        for i in range(0, len(rows), batch_size)
+    ]
@@ -3,8 +3,18 @@
 
 Tools for checking on the database status
 """
+import io
+from contextlib import redirect_stdout
 from piccolo.table import drop_db_tables_sync, create_db_tables_sync
-from backend.models import tables
+from piccolo.utils.sync import run_sync
+from piccolo.apps.migrations.commands.forwards import run_forwards
+from piccolo.apps.migrations.tables import Migration
+from backend.models import tables, jobs
+from backend.models.search_index import SearchIndex
+from backend.models.post_queue import Queue
+from backend.models.permissions import PermissionSet
+from backend.models.token import Token
+from backend.models.auth_config import AuthConfig
 
 
 def get_all_tables() -> list[type[tables._BaseTable]]:
@@ -28,6 +38,12 @@ def get_all_tables() -> list[type[tables._BaseTable]]:
 # List of tables to clear
 ALL_TABLES = get_all_tables()
 
+DRAIN_TIMEOUT = 30
+"""
+Maximum number of seconds to wait for background jobs to finish before
+clearing the database
+"""
+
 
 def clear_all():
     """
@@ -37,7 +53,16 @@ def clear_all():
     """
     # Make sure they all exist beforehand
     init()
+    # Let any background jobs finish, so they don't affect the new database
+    jobs.drain(DRAIN_TIMEOUT)
+    SearchIndex.drop()
     drop_db_tables_sync(*ALL_TABLES)
+    # So that migrations are applied to the new tables
+    Migration.alter().drop_table(if_exists=True).run_sync()
+    Queue.clear_cache()
+    PermissionSet.clear_cache()
+    Token.clear_cache()
+    AuthConfig.clear_cache()
     # Then recreate them
     init()
 
@@ -50,3 +75,11 @@ def init():
     safe to call during startup.
     """
     create_db_tables_sync(*ALL_TABLES, if_not_exists=True)
+    # Piccolo reports its progress even if there is nothing to do, which
+    # would be printed every time the server starts. Failures are still
+    # reported below.
+    with redirect_stdout(io.StringIO()):
+        result = run_sync(run_forwards("ensemble_backend"))
+    if not result.success:
+        raise RuntimeError(f"Failed to migrate database: {result.message}")
+    SearchIndex.init()
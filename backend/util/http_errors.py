@@ -176,6 +176,21 @@ class InternalServerError(HTTPException):
         super().__init__(500, description, traceback)
 
 
+class ServiceUnavailable(HTTPException):
+    """
+    The server is not ready to handle the request. Common causes are a server
+    that is down for maintenance or that is overloaded, or in this case, a
+    service that the server depends on being unavailable.
+    """
+
+    def __init__(
+        self,
+        description: str,
+        traceback: Optional[str] = None,
+    ) -> None:
+        super().__init__(503, description, traceback)
+
+
 codes: dict[int, tuple[str, Optional[type[HTTPException]]]] = {
     200: ("Ok", None),
     400: ("Bad Request", BadRequest),
@@ -184,4 +199,5 @@ codes: dict[int, tuple[str, Optional[type[HTTPException]]]] = {
     404: ("Not Found", NotFound),
     405: ("Method Not Allowed", MethodNotAllowed),
     500: ("Internal Server Error", InternalServerError),
+    503: ("Service Unavailable", ServiceUnavailable),
 }
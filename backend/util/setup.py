@@ -3,6 +3,7 @@
 
 Code used to initialise the server
 """
+from concurrent.futures import ThreadPoolExecutor
 from resources import consts
 from backend.types.auth import IAuthInfo
 from backend.models.auth_config import AuthConfig
@@ -78,16 +79,24 @@ def init(
         )
 
     if not skip_slow_checks:
+        # Check that we can log in with the auth system, and that an incorrect
+        # password doesn't work, making both requests at once
+        with ThreadPoolExecutor(2) as executor:
+            succeeded, failed = [
+                executor.submit(
+                    do_auth_check,
+                    address,
+                    request_type,
+                    username_param,
+                    password_param,
+                    success_regex,
+                    username,
+                    p,
+                )
+                for p in [password, password + "now_incorrect"]
+            ]
         # Make sure we can log in with the auth system
-        if not do_auth_check(
-            address,
-            request_type,
-            username_param,
-            password_param,
-            success_regex,
-            username,
-            password,
-        ):
+        if not succeeded.result():
             raise http_errors.BadRequest(
                 "Authentication request failed. This either means that your "
                 "username or password is incorrect, or that the request "
@@ -96,15 +105,7 @@ def init(
 
         # If we give an incorrect password and it still works, then something
         # has gone terribly wrong
-        if do_auth_check(
-            address,
-            request_type,
-            username_param,
-            password_param,
-            success_regex,
-            username,
-            password + "now_incorrect",
-        ):
+        if failed.result():
             raise http_errors.BadRequest(
                 "Authentication request succeeded in failure test. This "
                 "either means that your success regular expression is "
@@ -179,6 +180,7 @@ def init(
     ExamMode.initialise()
 
     # Create the main queue
+    Queue.clear_cache()
     Queue.create(
         consts.MAIN_QUEUE,
         immutable=True,
@@ -68,7 +68,7 @@ def uses_token(
                 "find it in the request header. Tokens must be given in the "
                 "'Authorization' key"
             )
-        user = Token.fromJWT(token).user
+        user = Token.authenticate(token)
         return func(user, token, *args, **kwargs)
 
     return wrapper
@@ -0,0 +1,57 @@
+"""
+# Backend / Util / Transactions
+
+Code used for running routes within a single database transaction
+
+Without a transaction, every query commits separately, which means that
+routes which make many changes sync to disk many times, and that an error
+partway through a route leaves the changes made before it in place.
+"""
+from functools import wraps
+from typing import Callable, TypeVar, ParamSpec
+from backend.models.tables import _BaseTable
+from backend.util.db_engine import PooledSQLiteEngine
+
+T = TypeVar('T')
+P = ParamSpec('P')
+
+
+def _engine() -> PooledSQLiteEngine:
+    engine = _BaseTable._meta.db
+    assert isinstance(engine, PooledSQLiteEngine)
+    return engine
+
+
+def uses_transaction(func: Callable[P, T]) -> Callable[P, T]:
+    """
+    Decorate a route function, so that all of its changes to the database are
+    made within one transaction. The transaction is committed once the route
+    returns, or rolled back if it raises an exception (including HTTP
+    errors), so the route either makes all of its changes or none of them.
+
+    This should be placed above `uses_token`, so that checking the token
+    uses the same connection.
+
+    ### Usage:
+
+    ```py
+    @app.post('/my_route')
+    @uses_transaction
+    @uses_token
+    def my_route(user: User, token: JWT) -> dict:
+        ...
+        return {}
+    ```
+
+    ### Args:
+    * `func` (`Callable[P, T]`): route callback function.
+
+    ### Returns:
+    * `Callable[P, T]`: decorated callback function
+    """
+    @wraps(func)
+    def wrapper(*args: P.args, **kwargs: P.kwargs) -> T:
+        with _engine().write_transaction():
+            return func(*args, **kwargs)
+
+    return wrapper
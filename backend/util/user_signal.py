@@ -0,0 +1,74 @@
+"""
+# Backend / Util / User Signal
+
+A way for request threads to wait until something happens to a particular
+user, such as them receiving a notification.
+
+Signals only reach threads within this process, so anything waiting on a
+signal should also re-check the database every so often.
+"""
+from threading import Condition
+from typing import Iterable
+
+
+class UserSignal:
+    """
+    Lets threads wait until the signal is raised for a particular user
+
+    Each user has a version number, which is incremented every time the
+    signal is raised for them. Waiting threads give the version they last
+    saw, so that signals raised between checking the database and starting
+    to wait aren't missed.
+    """
+
+    def __init__(self) -> None:
+        self.__condition = Condition()
+        self.__versions: dict[int, int] = {}
+
+    def version(self, user_id: int) -> int:
+        """
+        Returns the current version number for the given user
+
+        ### Args:
+        * `user_id` (`int`): ID of user
+
+        ### Returns:
+        * `int`: version number
+        """
+        with self.__condition:
+            return self.__versions.get(user_id, 0)
+
+    def notify(self, user_ids: Iterable[int]) -> None:
+        """
+        Raise the signal for the given users, waking any threads that are
+        waiting on them
+
+        ### Args:
+        * `user_ids` (`Iterable[int]`): IDs of users
+        """
+        with self.__condition:
+            for user_id in user_ids:
+                self.__versions[user_id] = self.__versions.get(user_id, 0) + 1
+            self.__condition.notify_all()
+
+    def wait(self, user_id: int, version: int, timeout: float) -> bool:
+        """
+        Wait until the signal is raised for the given user, or until the
+        timeout expires
+
+        ### Args:
+        * `user_id` (`int`): ID of user
+
+        * `version` (`int`): version number last seen by the caller, as given
+          by `version`
+
+        * `timeout` (`float`): maximum number of seconds to wait
+
+        ### Returns:
+        * `bool`: whether the signal was raised
+        """
+        with self.__condition:
+            return self.__condition.wait_for(
+                lambda: self.__versions.get(user_id, 0) != version,
+                timeout,
+            )
@@ -4,7 +4,7 @@
 Helper functions for requesting auth code
 """
 from typing import cast
-from backend.types.auth import IAuthInfo, IUserPermissions, JWT
+from backend.types.auth import IAuthInfo, IAuthRefresh, IUserPermissions, JWT
 from .consts import URL
 from .helpers import post, get
 
@@ -63,6 +63,30 @@ def logout(token: JWT) -> None:
     post(token, f"{URL}/logout", {})
 
 
+def refresh(token: JWT) -> IAuthRefresh:
+    """
+    ## POST `/auth/refresh`
+
+    Extend the lifetime of a token, so that the user stays logged in. Tokens
+    expire a week after they are created or last refreshed, so this should be
+    called regularly while the user is active.
+
+    ## Header
+    * `Authorization` (`str`): JWT of the user
+
+    ## Returns
+    Object containing:
+    * `token` (`str`): a new JWT for the same token, which expires later. The
+      old JWT still works until its original expiry.
+
+    ## Errors
+
+    ### 403
+    * Token is invalid or has expired
+    """
+    return cast(IAuthRefresh, post(token, f"{URL}/refresh", {}))
+
+
 def permissions(token: JWT) -> IUserPermissions:
     """
     ## GET `/auth/permissions`
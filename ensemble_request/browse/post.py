@@ -4,11 +4,12 @@
 Routes for browsing posts on the forum
 """
 import builtins
-from typing import cast as __cast
+from typing import Optional, cast as __cast
 from backend.types.identifiers import PostId
 from backend.types.post import (
     IPostBasicInfoList,
     IPostFullInfo,
+    IPostThread,
     IPostId,
     IPostClosed,
 )
@@ -25,11 +26,18 @@ from ..helpers import (
 __URL = f"{__URL}/browse/post"
 
 
-def list(token: JWT, search_term: str = "") -> IPostBasicInfoList:
+def list(
+    token: JWT,
+    search_term: str = "",
+    limit: Optional[int] = None,
+    before_id: Optional[PostId] = None,
+    offset: Optional[int] = None,
+) -> IPostBasicInfoList:
     """
     ## GET `/browse/post/list`
 
-    Get a list of posts visible to the give user
+    Get a list of posts visible to the give user, from newest to oldest (or
+    by relevance when searching)
 
     ## Header
     * `Authorization` (`str`): JWT of the user
@@ -37,6 +45,14 @@ def list(token: JWT, search_term: str = "") -> IPostBasicInfoList:
     ## Params
     * `search_term` (`str`): search term used for searching
                              should be empty string if not searching
+    * `limit` (`int`, optional): maximum number of posts to return, between
+      1 and 200. Defaults to 50.
+    * `before_id` (`int`, optional): only return posts older than the post
+      with this ID. To get the next page of posts, give the ID of the last
+      post in the previous page. This can't be used when searching.
+    * `offset` (`int`, optional): number of search results to skip. To get
+      the next page of search results, give the number of results received
+      so far. This can only be used when searching.
 
     ## Returns
     Object containing:
@@ -59,17 +75,28 @@ def list(token: JWT, search_term: str = "") -> IPostBasicInfoList:
 
     ## Errors
 
+    ### 400
+    * `limit` is not between 1 and 200
+    * `offset` is negative
+    * `before_id` is given when searching, or `offset` is given when not
+      searching
+
     ### 403
     * User does not have permission `PostView`
     """
+    params: dict = {"search_term": search_term}
+    if limit is not None:
+        params["limit"] = limit
+    if before_id is not None:
+        params["before_id"] = before_id
+    if offset is not None:
+        params["offset"] = offset
     return __cast(
         IPostBasicInfoList,
         __get(
             token,
             f"{__URL}/list",
-            {
-                "search_term": search_term,
-            }
+            params,
         ),
     )
 
@@ -129,6 +156,51 @@ def view(token: JWT, post_id: PostId) -> IPostFullInfo:
     )
 
 
+def thread(token: JWT, post_id: PostId) -> IPostThread:
+    """
+    # GET `/browse/post/thread`
+
+    Get the detailed info of a post, along with the detailed info of all of
+    its comments and their replies. This is equivalent to calling
+    `browse/post/view`, then `browse/comment/view` for each comment and
+    `browse/reply/view` for each reply, but only needs a single request.
+
+    ## Header
+    * `Authorization` (`str`): JWT of the user
+
+    ## Params
+    * `post_id` (`int`): identifier of the post
+
+    ## Returns
+    Object containing
+    * `post`: info about the post, in the same format as `browse/post/view`
+    * `comments`: list of info about each comment of the post, in the same
+      format as `browse/comment/view`, and in the same order as
+      `post.comments`
+    * `replies`: list of info about each reply to the comments, in the same
+      format as `browse/reply/view`, from oldest to newest
+
+    ## Errors
+
+    ### 400
+    * Invalid post ID
+
+    ### 403
+    * User does not have permission `PostView`
+    * User does not have permission to view this post
+    """
+    return __cast(
+        IPostThread,
+        __get(
+            token,
+            f"{__URL}/thread",
+            {
+                "post_id": post_id,
+            },
+        ),
+    )
+
+
 def create(
     token: JWT,
     heading: str,
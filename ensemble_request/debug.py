@@ -4,7 +4,7 @@
 Functions that shadow server routes starting at /debug
 """
 from typing import cast, NoReturn
-from backend.types.debug import IEcho, IEnabled
+from backend.types.debug import IEcho, IEnabled, IDbSettings
 from backend.types.admin import RequestType
 from backend.types.auth import IAuthInfo
 from .consts import URL
@@ -49,6 +49,35 @@ def clear() -> None:
     delete(None, f"{URL}/clear", {})
 
 
+def drain_jobs() -> None:
+    """
+    ## POST `debug/drain_jobs`
+
+    Wait until every background job (such as sending notifications to many
+    users) has finished, so that its effects can be checked.
+
+    ## Errors
+
+    ### 500
+    * Jobs didn't finish within 30 seconds
+    """
+    post(None, f"{URL}/drain_jobs", {})
+
+
+def db_settings() -> IDbSettings:
+    """
+    ## GET `debug/db_settings`
+
+    Returns the SQLite pragmas that are applied to each database connection.
+
+    ## Returns
+    Object containing:
+    * `configured`: mapping of pragma names to their configured values
+    * `active`: mapping of pragma names to the values reported by SQLite
+    """
+    return cast(IDbSettings, get(None, f"{URL}/db_settings", {}))
+
+
 def fail() -> NoReturn:
     """
     ## GET `debug/fail`
@@ -55,6 +55,8 @@ def handle_response(response: requests.Response) -> dict:
             raise http_errors.MethodNotAllowed(msg)
         case 500:
             give_error_json(http_errors.InternalServerError, response.text)
+        case 503:
+            give_error_json(http_errors.ServiceUnavailable, response.text)
         case i:
             raise ValueError(f"Unrecognised status code: {i}")
 
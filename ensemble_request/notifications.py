@@ -3,25 +3,41 @@
 
 Requests for getting notifications
 """
-from typing import cast
+import builtins
+from typing import Optional, cast
 from backend.types.auth import JWT
 from backend.types.identifiers import NotificationId
-from backend.types.notifications import INotificationList
+from backend.types.notifications import (
+    INotificationList,
+    INotificationUnreadCount,
+    INotificationPoll,
+)
 from .consts import URL
 from .helpers import get, put
 
 URL = f"{URL}/notifications"
 
 
-def list(token: JWT) -> INotificationList:
+def list(
+    token: JWT,
+    limit: Optional[int] = None,
+    before_id: Optional[NotificationId] = None,
+) -> INotificationList:
     """
     ## GET `/notifications/list`
 
-    Returns a list of notifications for a user
+    Returns a list of notifications for a user, from newest to oldest
 
     ## Header
     * `Authorization` (`JWT`): JWT of the user
 
+    ## Params
+    * `limit` (`int`, optional): maximum number of notifications to return.
+      If not given, all notifications are returned.
+    * `before_id` (`int`, optional): only return notifications older than
+      the notification with this ID. To get the next page of notifications,
+      give the ID of the last notification in the previous page.
+
     ## Returns
     Object containing:
     * `notifications`: list of objects, each containing:
@@ -40,17 +56,107 @@ def list(token: JWT) -> INotificationList:
               `post` will also be defined.
             * `queue` (`int`, optional): ID of queue related to the
               notification.
+            * `count` (`int`): number of times the notification was sent,
+              since similar unseen notifications are merged together
+
+    ## Errors
+
+    ### 400
+    * `limit` is not a positive integer
     """
+    params: dict = {}
+    if limit is not None:
+        params["limit"] = limit
+    if before_id is not None:
+        params["before_id"] = before_id
     return cast(
         INotificationList,
         get(
             token,
             f"{URL}/list",
+            params,
+        )
+    )
+
+
+def unread_count(token: JWT) -> INotificationUnreadCount:
+    """
+    ## GET `/notifications/unread_count`
+
+    Returns the number of notifications the user hasn't seen yet. This is
+    much cheaper than listing every notification.
+
+    ## Header
+    * `Authorization` (`JWT`): JWT of the user
+
+    ## Returns
+    Object containing:
+    * `unread_count` (`int`): number of unseen notifications
+    """
+    return cast(
+        INotificationUnreadCount,
+        get(
+            token,
+            f"{URL}/unread_count",
             {},
         )
     )
 
 
+def poll(
+    token: JWT,
+    after_id: Optional[NotificationId] = None,
+    timeout: Optional[float] = None,
+) -> INotificationPoll:
+    """
+    ## GET `/notifications/poll`
+
+    Waits until the user receives new notifications, then returns them. If
+    no notifications arrive before the timeout, an empty list is returned.
+    This may also return early with an empty list if the user's
+    notifications are marked as seen or unseen, so that the number of unseen
+    notifications can be updated.
+    This should be called repeatedly (giving the `last_id` from the previous
+    response), rather than repeatedly listing all notifications.
+
+    ## Header
+    * `Authorization` (`JWT`): JWT of the user
+
+    ## Params
+    * `after_id` (`int`, optional): ID of the newest notification the client
+      knows about. Any newer notifications are returned immediately. If not
+      given, only notifications sent after the request is made are returned.
+    * `timeout` (`float`, optional): maximum number of seconds to wait,
+      between 0 and 60. Defaults to 25 seconds.
+
+    ## Returns
+    Object containing:
+    * `notifications`: list of new notifications, from newest to oldest, in
+      the same format as `notifications/list`
+    * `unread_count` (`int`): number of unseen notifications
+    * `last_id` (`int`): ID of the newest notification, to give as
+      `after_id` when polling again, or `0` if there are no notifications
+
+    ## Errors
+
+    ### 400
+    * Timeout is out of range
+    """
+    params: dict = {}
+    if after_id is not None:
+        params["after_id"] = after_id
+    if timeout is not None:
+        params["timeout"] = timeout
+    return cast(
+        INotificationPoll,
+        get(
+            token,
+            f"{URL}/poll",
+            params,
+        )
+    )
+
+
 def seen(token: JWT, notification_id: NotificationId, value: bool):
     """
     ## PUT `/notifications/seen`
@@ -84,3 +190,46 @@ def seen(token: JWT, notification_id: NotificationId, value: bool):
             "value": value,
         }
     )
+
+
+def seen_many(
+    token: JWT,
+    value: bool,
+    notification_ids: Optional[builtins.list[NotificationId]] = None,
+    up_to_id: Optional[NotificationId] = None,
+):
+    """
+    ## PUT `/notifications/seen_many`
+
+    Updates whether many notifications have been seen or not, in a single
+    request. Exactly one of `notification_ids` and `up_to_id` must be given.
+    Notifications belonging to other users are ignored.
+
+    ## Header
+    * `Authorization` (`JWT`): JWT of the user
+
+    ## Body
+    * `value` (`bool`): whether the notifications should count as seen or not
+    * `notification_ids` (`list[int]`, optional): IDs of the notifications to
+      update, at most 500
+    * `up_to_id` (`int`, optional): update all of the user's notifications
+      with this ID or older
+
+    ## Errors
+
+    ### 400
+    * Neither or both of `notification_ids` and `up_to_id` given
+    * `value` isn't a boolean, `notification_ids` isn't a list of integers,
+      or `up_to_id` isn't an integer
+    * More than 500 `notification_ids` given
+    """
+    body: dict = {"value": value}
+    if notification_ids is not None:
+        body["notification_ids"] = notification_ids
+    if up_to_id is not None:
+        body["up_to_id"] = up_to_id
+    put(
+        token,
+        f"{URL}/seen_many",
+        body,
+    )
@@ -4,7 +4,12 @@
 Helper functions for requesting queue-related code
 """
 from typing import cast
-from backend.types.queue import IQueueId, IQueueFullInfo, IQueueList
+from backend.types.queue import (
+    IQueueId,
+    IQueueFullInfo,
+    IQueueList,
+    IQueueBoard,
+)
 from backend.types.identifiers import QueueId, PostId
 from backend.types.auth import JWT
 from .consts import URL
@@ -46,6 +51,35 @@ def queue_list(token: JWT) -> IQueueList:
     )
 
 
+def board(token: JWT) -> IQueueBoard:
+    """
+    ## GET `/taskboard/board`
+
+    Get every queue along with the posts in them, so that the whole taskboard
+    can be shown using a single request
+
+    ## Header
+    * `Authorization` (`JWT`): JWT of the user
+
+    ## Returns
+    Object containing:
+    * `queues`: list of objects containing:
+            * `queue_name` (`str`): the name of the queue
+            * `queue_id` (`int`): ID of the queue
+            * `view_only` (`bool`): whether this queue is view only
+            * `following` (`bool`): whether the user follows this queue
+            * `posts`: list of the posts in the queue that the user can view,
+              from oldest to newest, each containing the same info as given
+              by `browse/post/list`
+
+    ## Errors
+
+    ### 403
+    * User does not have permission `ViewTaskboard`
+    """
+    return cast(IQueueBoard, get(token, f"{URL}/board", {}))
+
+
 def queue_create(token: JWT, queue_name: str) -> IQueueId:
     """
     ## POST `/taskboard/queue_list/create`
@@ -163,7 +197,8 @@ def queue_post_list(token: JWT, queue_id: QueueId) -> IQueueFullInfo:
     ## Returns
     * `queue_id` (`int`): ID of the queue
     * `queue_name` (`str`): name of the queue
-    * `posts`: (`list[int]`): list of post IDs in this queue
+    * `posts`: (`list[int]`): list of post IDs in this queue that the user
+      can view, from oldest to newest
     * `view_only` (`bool`): whether this queue is view only
     * `following` (`bool`): whether the user follows this queue
 
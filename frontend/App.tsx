@@ -1,7 +1,7 @@
 import React from 'react';
 import { BrowserRouter as Router, Routes, Route, Navigate } from 'react-router-dom';
-import { SERVER_PATH } from './constants';
-import { APIcall, currentUser, requestOptions } from './interfaces';
+import { SERVER_PATH, TOKEN_REFRESH_MARGIN } from './constants';
+import { APIcall, currentUser, requestOptions, tokenRefresh } from './interfaces';
 import AdminPage from './pages/AdminPage';
 import BrowsePage from './pages/BrowsePage';
 import InitPage from './pages/InitPage';
@@ -25,7 +25,10 @@ export function ApiFetch<T>(apiCall: APIcall) {
   try {
     token = getCurrentUser().token;
   } catch {}
-  if (token !== null) { requestOptions.headers.Authorization = `Bearer ${token}`; }
+  if (token !== null) {
+    requestOptions.headers.Authorization = `Bearer ${token}`;
+    if (apiCall.path !== "auth/refresh") { refreshTokenIfExpiring(token); }
+  }
   // console.log(requestOptions);
   if (!apiCall.customUrl) {
     apiCall.customUrl = SERVER_PATH;
@@ -50,6 +53,34 @@ export function ApiFetch<T>(apiCall: APIcall) {
       });
   });
 }
+let refreshingToken = false;
+// Tokens expire unless they are refreshed, so refresh the token once it gets
+// close to its expiry to keep active users logged in
+function refreshTokenIfExpiring(token: string) {
+  let expiry: number;
+  try {
+    const payload = token.split('.')[1].replace(/-/g, '+').replace(/_/g, '/');
+    expiry = JSON.parse(atob(payload)).exp;
+  } catch {
+    return;
+  }
+  if (refreshingToken || expiry - Date.now() / 1000 > TOKEN_REFRESH_MARGIN) {
+    return;
+  }
+  refreshingToken = true;
+  ApiFetch<tokenRefresh>({
+    method: "POST",
+    path: "auth/refresh",
+  }).then((data) => {
+    const user = getCurrentUser();
+    if (user && user.token === token) {
+      setCurrentUser({ ...user, token: data.token });
+    }
+  }).finally(() => {
+    refreshingToken = false;
+  });
+}
+
 export function setCurrentUser(currentUser: currentUser | null) {
   window.localStorage.setItem("user", JSON.stringify(currentUser));
   window.dispatchEvent(new Event("storage"));
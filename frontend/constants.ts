@@ -1,2 +1,8 @@
 export const SERVER_PATH = process.env.BACKEND_URL || "http://127.0.0.1:5000/";
 //"http://localhost:5000/"
+
+// Refresh tokens once they are due to expire within this many seconds
+export const TOKEN_REFRESH_MARGIN = 24 * 60 * 60;
+
+// Number of posts to load at a time in the post list
+export const POST_PAGE_SIZE = 50;
@@ -101,6 +101,12 @@ export interface replyView {
   deleted: boolean
 }
 
+export interface postThread {
+  post: postView,
+  comments: commentView[],
+  replies: replyView[]
+}
+
 export interface userView {
   [key: string]: any,
   name_first: string, 
@@ -136,6 +142,10 @@ export interface userPermission {
   value: boolean|null
 }
 
+export interface tokenRefresh {
+  token: string,
+}
+
 export interface currentUser {
   token: string,
   user_id: number,
@@ -152,6 +162,10 @@ export interface queueListPosts {
   queue_name: string, queue_id: number, view_only: boolean, posts: any[], following: boolean
 }
 
+export interface taskboard {
+  queues: queueListPosts[]
+}
+
 export interface permissionGroup extends permissionHolder {
   group_id: number, 
   name: string,
@@ -171,12 +185,19 @@ export interface notification {
   comment?: number,
   reply?: number,
   queue?: number,
+  count: number,
 }
 
 export interface notifications {
   notifications: notification[]
 }
 
+export interface notificationPoll {
+  notifications: notification[],
+  unread_count: number,
+  last_id: number
+}
+
 export interface analytics {
   total_posts: number,
   total_comments: number,
@@ -1,7 +1,7 @@
 import styled from "@emotion/styled";
 import React from "react";
 import { ApiFetch, getPermission } from "../App";
-import { APIcall, postView, queueList, queueListPosts } from "../interfaces";
+import { APIcall, queueListPosts, taskboard } from "../interfaces";
 import { theme } from "../theme";
 import Navbar from "./components/Navbar";
 import QueueView from "./components/QueueView";
@@ -70,36 +70,12 @@ const TaskboardPage = (props: Props) => {
   const [queueName, setQueueName] = React.useState<string>();
 
   async function getQueues() {
-    const queueCall : APIcall = { 
+    const boardCall : APIcall = {
       method: "GET",
-      path: "taskboard/queue_list"
+      path: "taskboard/board"
     }
-    const queues = await ApiFetch(queueCall) as queueList;
-
-    let queuesWithPosts : queueListPosts[] = [];
-    for (const queue of queues.queues) {
-      const call : APIcall = {
-        method: "GET",
-        path: "taskboard/queue/post_list",
-        params: {"queue_id": queue.queue_id.toString()}
-      }
-      const queueWithPosts = await (ApiFetch(call)) as queueListPosts;
-      queuesWithPosts.push(queueWithPosts);
-    }
-    for (const queue of queuesWithPosts) {
-      let postsToFetch : postView[] = [];
-      for (const postId of queue.posts) {
-        const postCall: APIcall = {
-          method: "GET",
-          path: "browse/post/view",
-          params: { "post_id": postId.toString() }
-        }
-        const post = await ApiFetch(postCall) as postView;
-        postsToFetch.push(post);
-      }
-      queue.posts = postsToFetch;
-    }
-    setQueueList(queuesWithPosts);
+    const board = await ApiFetch(boardCall) as taskboard;
+    setQueueList(board.queues);
   }
 
   async function createQueue() {
@@ -3,7 +3,7 @@ import React from "react";
 import { useNavigate, useSearchParams } from "react-router-dom";
 import { ApiFetch, getCurrentUser, getLoggedIn, getPermission, setCurrentUser } from "../../App";
 import { Prettify } from "../../global_functions";
-import { APIcall, notification } from "../../interfaces";
+import { APIcall, notificationPoll } from "../../interfaces";
 import { theme } from "../../theme";
 import { StyledButton } from "../GlobalProps";
 
@@ -101,24 +101,30 @@ const Navbar = (props: Props) => {
   const navigate = useNavigate();
   const [numNotifs, setNumNotifs] = React.useState<number>(0);
   const [update, setUpdate] = React.useState<boolean>(false);
+  const [lastId, setLastId] = React.useState<number | null>(null);
   let [searchParams, setSearchParams] = useSearchParams();
 
 
   React.useEffect(()=>{
     if (getLoggedIn()) {
+      // Wait for new notifications rather than repeatedly listing them all
       const api: APIcall = {
         method: "GET",
-        path: "notifications/list",
+        path: "notifications/poll",
+        params: lastId === null ? {} : { "after_id": lastId.toString() },
       }
       ApiFetch(api)
         .then((data) => {
-          const notifications = data as {notifications: notification[]};
-          const newNumNotifs = notifications.notifications.filter(each => { return !each.seen }).length;
-          if (props.page === "notifications") {
-            searchParams.set("newNotifs", newNumNotifs.toString());
+          const poll = data as notificationPoll;
+          if (props.page === "notifications" && poll.notifications.length) {
+            searchParams.set("newNotifs", poll.unread_count.toString());
             setSearchParams(searchParams);
           };
-          setNumNotifs(newNumNotifs);
+          setNumNotifs(poll.unread_count);
+          setLastId(poll.last_id);
+          setUpdate(!update);
+        })
+        .catch(() => {
           setTimeout(() => {setUpdate(!update)}, 5000);
         });
     }
@@ -73,15 +73,15 @@ const NotificationsListView = (props: Props) => {
 
   async function clearAll() {
     if (notifications) {
-      const unseenNotifs = notifications.filter(each => { return !each.seen });
-      for (const notif of unseenNotifs) {
-        const api: APIcall = {
-          method: "PUT",
-          path: "notifications/seen",
-          body: {notification_id: notif.notification_id, value: true}
-        }
-        await ApiFetch(api);
+      // Mark every notification up to the newest as seen, rather than listing
+      // them, since there may be more than can be given by ID
+      const newestId = Math.max(...notifications.map(each => each.notification_id));
+      const api: APIcall = {
+        method: "PUT",
+        path: "notifications/seen_many",
+        body: {up_to_id: newestId, value: true}
       }
+      await ApiFetch(api);
       setSeen(!seen);
     }
   }
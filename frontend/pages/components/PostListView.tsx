@@ -8,6 +8,7 @@ import { theme } from "../../theme";
 import AuthorView from "./AuthorView";
 import ReactTooltip from 'react-tooltip';
 import { StyledButton, Tag } from "../GlobalProps";
+import { POST_PAGE_SIZE } from "../../constants";
 
 // Declaring and typing our props
 interface Props { }
@@ -58,26 +59,63 @@ const ConvertButton = styled(StyledButton)`
 // Exporting our example component
 const PostListView = (props: Props) => {
   const [posts, setPosts] = React.useState<postListItem[]>();
+  const [hasMore, setHasMore] = React.useState<boolean>(false);
+  const loading = React.useRef<boolean>(false);
   let [searchParams, setSearchParams] = useSearchParams();
   let [searchTerm, setSearchTerm] = React.useState<string>('');
   let [tags, setTags] = React.useState<tag[]>([]);
-  React.useEffect(()=>{
-    getTags();
+
+  // Fetch the page of posts following the posts that are already loaded.
+  // Search results are ordered by relevance, so they are paged using an
+  // offset rather than the ID of the last post.
+  async function fetchPage(loaded: postListItem[]) {
+    const params: Record<string, string> = {
+      "search_term": searchTerm,
+      "limit": POST_PAGE_SIZE.toString(),
+    };
+    if (loaded.length) {
+      if (searchTerm) {
+        params["offset"] = loaded.length.toString();
+      } else {
+        params["before_id"] = loaded[loaded.length - 1].post_id.toString();
+      }
+    }
     const api: APIcall = {
       method: "GET",
       path: "browse/post/list",
-      params: {"search_term": searchTerm}
+      params: params,
     }
-    ApiFetch(api)
-      .then((data) => {
-        const test = data as { posts: postListItem[] };
-        setPosts(test.posts);
-        if (test.posts.length && (searchParams.get('postId') === null || searchParams.get('postId') === '0')) {
-          setSearchParams({postId: test.posts[0].post_id.toString()})
+    const data = await ApiFetch(api) as { posts: postListItem[] };
+    setHasMore(data.posts.length === POST_PAGE_SIZE);
+    return data.posts;
+  }
+
+  React.useEffect(()=>{
+    getTags();
+    fetchPage([])
+      .then((firstPage) => {
+        setPosts(firstPage);
+        if (firstPage.length && (searchParams.get('postId') === null || searchParams.get('postId') === '0')) {
+          setSearchParams({postId: firstPage[0].post_id.toString()})
         }
       })
   // eslint-disable-next-line react-hooks/exhaustive-deps
   }, [searchParams, searchTerm])
+
+  // Load the next page once the list is scrolled close to the bottom
+  function onScroll(e: React.UIEvent<HTMLDivElement>) {
+    const list = e.currentTarget;
+    if (
+      !posts || !hasMore || loading.current
+      || list.scrollTop + list.clientHeight < list.scrollHeight - 200
+    ) {
+      return;
+    }
+    loading.current = true;
+    fetchPage(posts)
+      .then((nextPage) => setPosts(posts.concat(nextPage)))
+      .finally(() => { loading.current = false; });
+  }
   async function getTags() {
     const tagCall : APIcall = {
       method: "GET",
@@ -100,7 +138,7 @@ const PostListView = (props: Props) => {
 
   if (posts && posts.length > 0) {
     return (
-      <StyledLayout>
+      <StyledLayout onScroll={onScroll}>
         {searchBar}
         {
           posts.map((each) => {
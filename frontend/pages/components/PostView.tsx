@@ -1,7 +1,7 @@
 import styled from "@emotion/styled";
 import React, { useEffect } from "react";
 import { ApiFetch, getCurrentUser, getPermission } from "../../App";
-import { APIcall, commentView, postView, replyView } from "../../interfaces";
+import { APIcall, commentView, postThread, postView, replyView } from "../../interfaces";
 import TextView from "./TextView";
 import { theme } from "../../theme";
 import CommentContext from "../commentContext";
@@ -42,32 +42,20 @@ const PostView = (props: Props) => {
   async function getPost() {
     const call: APIcall = {
       method: "GET",
-      path: "browse/post/view",
+      path: "browse/post/thread",
       params: { "post_id": searchParams.get("postId") as string }
     }
-    const postToShow = await ApiFetch(call) as postView;
-    let commentArray : commentView[] = [];
-    for (const commentId of postToShow.comments) {
-      const call : APIcall = {
-        method: "GET",
-        path: "browse/comment/view",
-        params: {"comment_id": commentId.toString()}
-      }
-      const comment = await(ApiFetch(call)) as commentView;
-      commentArray.push(comment);
+    const thread = await ApiFetch(call) as postThread;
+    const postToShow = thread.post;
+    const replies = new Map<number, replyView>();
+    for (const reply of thread.replies) {
+      replies.set(reply.reply_id, reply);
     }
+    const commentArray : commentView[] = thread.comments;
     for (const comment of commentArray) {
-      let replyArray : replyView[] = [];
-      for (const replyId of comment.replies) {
-        const call : APIcall = {
-          method: "GET",
-          path: "browse/reply/view",
-          params: {"reply_id": replyId.toString()}
-        }
-        const reply = await ApiFetch(call) as replyView;
-        replyArray.push(reply);
-      }
-      comment.replies = replyArray;
+      comment.replies = (comment.replies as number[]).map(
+        (replyId) => replies.get(replyId) as replyView
+      );
     }
     setCurrentPost(postToShow);
     setComments(commentArray);
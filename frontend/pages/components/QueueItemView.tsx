@@ -2,14 +2,14 @@ import styled from "@emotion/styled";
 import React from "react";
 import { useNavigate } from "react-router-dom";
 import { ApiFetch, getPermission } from "../../App";
-import { APIcall, postView } from "../../interfaces";
+import { APIcall, postListItem } from "../../interfaces";
 import { StyledButton } from "../GlobalProps";
 import QueueContext, { UpdateContext } from "../queueContext";
 import AuthorView from "./AuthorView";
 
 // Declaring and typing our props
 interface Props {
-  postShow: postView,
+  postShow: postListItem,
   viewOnly: boolean,
   queueId: number,
 }
@@ -1,7 +1,7 @@
 import styled from "@emotion/styled";
 import React from "react";
 import { Input } from "theme-ui";
-import { APIcall, postView, queueListPosts } from "../../interfaces";
+import { APIcall, postListItem, queueListPosts } from "../../interfaces";
 import { theme } from "../../theme";
 import { StyledButton } from "../GlobalProps";
 import { UpdateContext } from "../queueContext";
@@ -147,7 +147,7 @@ const QueueView = (props: Props) => {
         
       </QueueHeader>
       { queue.posts.map((post) => {
-        const postShow = post as postView;
+        const postShow = post as postListItem;
         return (
           <QueueItemView postShow={postShow} queueId={queue.queue_id} viewOnly={queue.view_only}></QueueItemView>
         )
@@ -1,8 +1,8 @@
 from piccolo.conf.apps import AppRegistry
-from piccolo.engine.sqlite import SQLiteEngine
+from backend.util.db_engine import PooledSQLiteEngine, load_pragmas
 
 
-DB = SQLiteEngine(path="ensemble.sqlite")
+DB = PooledSQLiteEngine(path="ensemble.sqlite", pragmas=load_pragmas())
 
 
 # A list of paths to piccolo apps
@@ -0,0 +1,50 @@
+"""
+# Scripts / Benchmark queries
+
+Compares the time taken to run simple queries using Piccolo's regular SQLite
+engine and the pooled engine used by the backend. This uses a temporary
+database, so the server doesn't need to be running.
+"""
+import sys
+import tempfile
+from pathlib import Path
+from _helpers import Timer
+from piccolo.table import Table, create_db_tables_sync
+from piccolo.columns import Text
+from piccolo.engine.sqlite import SQLiteEngine
+from backend.util.db_engine import PooledSQLiteEngine
+
+QUERIES = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+
+
+def benchmark(engine: SQLiteEngine) -> float:
+    """
+    Returns the average time taken to look up a row using the given engine,
+    in milliseconds
+    """
+    class TBenchmark(Table, db=engine):
+        text = Text()
+
+    create_db_tables_sync(TBenchmark, if_not_exists=True)
+    id = TBenchmark({TBenchmark.text: "Hello"}).save().run_sync()[0]["id"]
+
+    t = Timer()
+    with t:
+        for _ in range(QUERIES):
+            TBenchmark.objects()\
+                .where(TBenchmark._meta.primary_key == id)\
+                .first()\
+                .run_sync()
+    assert t.time is not None
+    return t.time / QUERIES * 1000
+
+
+with tempfile.TemporaryDirectory() as tmp:
+    before = benchmark(SQLiteEngine(path=str(Path(tmp) / "before.sqlite")))
+    after = benchmark(
+        PooledSQLiteEngine(path=str(Path(tmp) / "after.sqlite")))
+
+print(f"📊 Ran {QUERIES} queries using each engine")
+print(f"⏱️ SQLiteEngine:       {before:.3f} ms per query")
+print(f"⏱️ PooledSQLiteEngine: {after:.3f} ms per query")
+print(f"✅ {before / after:.1f}x faster")
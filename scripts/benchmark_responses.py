@@ -0,0 +1,112 @@
+"""
+# Scripts / Benchmark responses
+
+Compares the time taken to encode large responses using Flask's regular JSON
+provider and the JSON provider used by the backend, as well as how much each
+supported encoding compresses them. Responses are generated to match the post
+list and analytics routes, so the server doesn't need to be running.
+
+Usage: `python scripts/benchmark_responses.py [posts]`
+"""
+import sys
+import random
+from _helpers import Timer
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+from backend.util.json_provider import FastJSONProvider, HAS_ORJSON
+from backend.util.compression import compress, supported_encodings
+from typing import Any, Callable
+
+POSTS = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+REPEATS = 20
+
+random.seed(0)
+
+
+def post_list() -> dict:
+    """Returns a response shaped like the one from `browse/post/list`"""
+    return {"posts": [
+        {
+            "post_id": i,
+            "author": random.randint(1, 500),
+            "heading": f"Question {i} about assignment {random.randint(1, 5)}",
+            "tags": random.sample(range(1, 30), random.randint(0, 3)),
+            "me_too": random.randint(0, 20),
+            "private": random.random() < 0.1,
+            "anonymous": random.random() < 0.2,
+            "answered": random.random() < 0.5,
+            "closed": random.random() < 0.1,
+            "deleted": False,
+            "reported": False,
+        }
+        for i in range(POSTS, 0, -1)
+    ]}
+
+
+def analytics() -> dict:
+    """Returns a response shaped like the one from `admin/analytics`"""
+    def stats() -> dict:
+        return {
+            key: [
+                {"user_id": random.randint(1, 500), "count": 100 - i}
+                for i in range(10)
+            ]
+            for key in [
+                "top_posters",
+                "top_commenters",
+                "top_repliers",
+                "top_me_too",
+                "top_thanks",
+            ]
+        }
+    return {
+        "total_posts": POSTS,
+        "total_comments": POSTS * 3,
+        "total_replies": POSTS * 5,
+        "all_users": stats(),
+        "groups": [
+            {
+                "permission_group_id": i,
+                "permission_group_name": name,
+                "stats": stats(),
+            }
+            for i, name in enumerate(["Administrator", "Moderator", "User"])
+        ],
+    }
+
+
+def average_ms(func: Callable[[], Any]) -> float:
+    """Returns the average time taken to call a function, in milliseconds"""
+    t = Timer()
+    with t:
+        for _ in range(REPEATS):
+            func()
+    assert t.time is not None
+    return t.time / REPEATS * 1000
+
+
+app = Flask(__name__)
+regular = DefaultJSONProvider(app)
+provider = FastJSONProvider(app)
+payloads = [("Post list", post_list()), ("Analytics", analytics())]
+
+with app.app_context():
+    for name, payload in payloads:
+        # Use the same arguments that Flask uses when creating responses
+        before = average_ms(
+            lambda: regular.dumps(payload, separators=(",", ":")))
+        after = average_ms(
+            lambda: provider.dumps(payload, separators=(",", ":")))
+        data = provider.dumps(payload).encode()
+        print(f"📊 {name} ({len(data) / 1024:.1f} KiB)")
+        print(f"⏱️ DefaultJSONProvider: {before:.3f} ms")
+        print(f"⏱️ FastJSONProvider:    {after:.3f} ms "
+              f"({before / after:.1f}x faster)")
+        for encoding in supported_encodings():
+            compressed = compress(data, encoding)
+            time = average_ms(lambda: compress(data, encoding))
+            print(f"🗜️ {encoding + ':':<20} {len(compressed) / 1024:.1f} KiB "
+                  f"({len(compressed) / len(data):.0%}) in {time:.3f} ms")
+
+if not HAS_ORJSON:
+    print("❗ orjson isn't installed, so the standard encoder was used")
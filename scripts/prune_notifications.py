@@ -0,0 +1,30 @@
+"""
+# Scripts / Prune Notifications
+
+Delete notifications that were seen more than a certain number of days ago.
+The server already does this every hour, so this is only needed to prune
+notifications straight away, or using a different number of days.
+
+Usage: `python scripts/prune_notifications.py [days]`
+
+If the number of days isn't given, the retention period is read from the
+`ENSEMBLE_NOTIFICATION_RETENTION_DAYS` environment variable, defaulting to
+90 days.
+"""
+import sys
+from datetime import timedelta
+import _helpers
+from backend.util.db_status import init
+from backend.models.notifications.model import retention_period
+from backend.models import Notification
+del _helpers
+
+if len(sys.argv) > 1:
+    period = timedelta(days=float(sys.argv[1]))
+else:
+    period = retention_period()
+
+init()
+pruned = Notification.prune(period)
+
+print(f"✅ Deleted {pruned} notifications seen over {period.days} days ago")
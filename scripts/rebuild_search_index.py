@@ -0,0 +1,15 @@
+"""
+# Scripts / Rebuild Search Index
+
+Re-index every post in the database, for use if the search index gets out of
+sync with the posts it represents
+"""
+import _helpers
+from backend.util.db_status import init
+from backend.models.search_index import SearchIndex
+del _helpers
+
+init()
+SearchIndex.rebuild()
+
+print("✅ Search index rebuilt")
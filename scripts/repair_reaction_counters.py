@@ -0,0 +1,15 @@
+"""
+# Scripts / Repair Reaction Counters
+
+Recalculate the number of reactions to every post, comment and reply, for use
+if the stored counts get out of sync with the reactions themselves
+"""
+import _helpers
+from backend.util.db_status import init
+from backend.models.reactions import repair_counters
+del _helpers
+
+init()
+repaired = repair_counters()
+
+print(f"✅ Reaction counters repaired ({repaired} were incorrect)")
@@ -0,0 +1,105 @@
+"""
+# Tests / Backend / DB Engine Test
+
+Tests for transactions using the pooled database engine
+
+* Changes made in a transaction are only visible once it is committed
+* Changes are rolled back if the transaction raises an exception
+* Nested transactions can be rolled back without affecting the outer one
+* Callbacks given to `after_commit` run only once the transaction commits
+"""
+import sqlite3
+import pytest
+from pathlib import Path
+from backend.util.db_engine import PooledSQLiteEngine
+
+
+@pytest.fixture
+def engine(tmp_path: Path) -> PooledSQLiteEngine:
+    """Engine using a new database, containing an empty table"""
+    engine = PooledSQLiteEngine(
+        path=str(tmp_path / "test.sqlite"),
+        pragmas={"journal_mode": "WAL"},
+    )
+    with engine.connection() as connection:
+        connection.execute("CREATE TABLE t (value INTEGER)")
+    return engine
+
+
+def values(engine: PooledSQLiteEngine) -> list[int]:
+    """
+    Returns the values in the table, as seen by a different connection
+    """
+    connection = sqlite3.connect(engine.path)
+    try:
+        return [
+            r[0] for r in
+            connection.execute("SELECT value FROM t ORDER BY value")
+        ]
+    finally:
+        connection.close()
+
+
+def insert(engine: PooledSQLiteEngine, value: int) -> None:
+    """Insert a value, in the same way as the models run queries"""
+    with engine.connection() as connection:
+        connection.execute("INSERT INTO t (value) VALUES (?)", [value])
+
+
+def test_commit(engine: PooledSQLiteEngine):
+    """Are changes only visible once the transaction is committed?"""
+    with engine.write_transaction():
+        assert engine.in_transaction
+        insert(engine, 1)
+        insert(engine, 2)
+        assert values(engine) == []
+    assert not engine.in_transaction
+    assert values(engine) == [1, 2]
+
+
+def test_rollback(engine: PooledSQLiteEngine):
+    """Are changes discarded if the transaction raises an exception?"""
+    with pytest.raises(ValueError):
+        with engine.write_transaction():
+            insert(engine, 1)
+            raise ValueError()
+    assert not engine.in_transaction
+    assert values(engine) == []
+
+
+def test_nested_rollback(engine: PooledSQLiteEngine):
+    """Can a nested transaction be rolled back by itself?"""
+    with engine.write_transaction():
+        insert(engine, 1)
+        with pytest.raises(ValueError):
+            with engine.write_transaction():
+                insert(engine, 2)
+                raise ValueError()
+        with engine.write_transaction():
+            insert(engine, 3)
+        # Nested transactions aren't committed until the outer one is
+        assert values(engine) == []
+    assert values(engine) == [1, 3]
+
+
+def test_after_commit(engine: PooledSQLiteEngine):
+    """Are callbacks run only once the transaction is committed?"""
+    called: list[int] = []
+    with engine.write_transaction():
+        engine.after_commit(lambda: called.append(len(values(engine))))
+        insert(engine, 1)
+        assert called == []
+    assert called == [1]
+    # Callbacks run straight away outside of a transaction
+    engine.after_commit(lambda: called.append(2))
+    assert called == [1, 2]
+
+
+def test_after_commit_rollback(engine: PooledSQLiteEngine):
+    """Are callbacks discarded if the transaction is rolled back?"""
+    called: list[int] = []
+    with pytest.raises(ValueError):
+        with engine.write_transaction():
+            engine.after_commit(lambda: called.append(1))
+            raise ValueError()
+    assert called == []
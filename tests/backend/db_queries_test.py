@@ -0,0 +1,38 @@
+"""
+# Tests / Backend / DB Queries Test
+
+Tests for the helpers used to build bulk queries
+
+* Inserts are split into batches within SQLite's limit on parameters
+* Updates without any conditions are rejected
+"""
+import pytest
+from backend.models.tables import TNotification
+from backend.util.db_queries import MAX_VARIABLES, bulk_insert, bulk_update
+
+
+def test_bulk_insert_batches():
+    """Does each insert stay within the limit on the number of parameters?"""
+    rows = [
+        TNotification({TNotification.user_to: 1, TNotification.notif_type: 1})
+        for _ in range(500)
+    ]
+    queries = bulk_insert(TNotification, rows)
+    assert len(queries) > 1
+    total = 0
+    for query in queries:
+        _, args = query.querystrings[0].compile_string(engine_type="sqlite")
+        assert len(args) <= MAX_VARIABLES
+        total += len(args)
+    assert total == len(rows) * (len(TNotification._meta.columns) - 1)
+
+
+def test_bulk_insert_empty():
+    """Are no queries made when there are no rows?"""
+    assert bulk_insert(TNotification, []) == []
+
+
+def test_bulk_update_requires_condition():
+    """Is an update without any conditions rejected?"""
+    with pytest.raises(ValueError):
+        bulk_update(TNotification, {TNotification.seen: True})
@@ -0,0 +1,113 @@
+"""
+# Tests / Backend / Migration Indexes Test
+
+Tests for the migration that adds indexes and unique constraints, when the
+database already contains duplicates
+
+* Duplicate tags are merged, keeping the posts that used them
+* Duplicate queues are renamed
+* Duplicate users stop the migration, naming the conflicting users
+"""
+import importlib
+import pytest
+from pathlib import Path
+from piccolo.table import create_db_tables_sync
+from piccolo.utils.sync import run_sync
+from backend.models import tables
+from backend.util.db_engine import PooledSQLiteEngine
+
+migration = importlib.import_module(
+    "backend.models.piccolo_migrations."
+    "ensemble_backend_2026_10_18t00_00_01_000000"
+)
+
+TABLES = [
+    t for t in vars(tables).values()
+    if isinstance(t, type)
+    and issubclass(t, tables._BaseTable)
+    and t is not tables._BaseTable
+]
+
+
+@pytest.fixture
+def engine(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> PooledSQLiteEngine:
+    """
+    Engine using a new database with all of the tables, which contains a
+    user, a queue and a post
+    """
+    engine = PooledSQLiteEngine(path=str(tmp_path / "test.sqlite"))
+    for table in TABLES:
+        monkeypatch.setattr(table._meta, "db", engine)
+    create_db_tables_sync(*TABLES)
+    with engine.connection() as connection:
+        connection.executescript(
+            "INSERT INTO t_permission_user (id, allowed, disallowed) "
+            "VALUES (1, '[]', '[]');"
+            "INSERT INTO t_user "
+            "(id, username, name_first, name_last, email, permissions) "
+            "VALUES (1, 'user1', 'A', 'B', 'user1@example.com', 1);"
+            "INSERT INTO t_queue (id, immutable, view_only, name) "
+            "VALUES (1, 0, 0, 'Main queue');"
+            "INSERT INTO t_post (id, author, heading, text, timestamp, "
+            "queue, private, anonymous, me_too) "
+            "VALUES (1, 1, 'Heading', 'Text', '2026-01-01', 1, 0, 0, 0);"
+        )
+    return engine
+
+
+def query(engine: PooledSQLiteEngine, sql: str) -> list[tuple]:
+    with engine.connection() as connection:
+        return [tuple(r.values()) for r in connection.execute(sql)]
+
+
+def test_duplicate_tags_merged(engine: PooledSQLiteEngine):
+    """Are duplicate tags merged into the oldest one?"""
+    with engine.connection() as connection:
+        connection.executescript(
+            "INSERT INTO t_tag (id, name) VALUES "
+            "(1, 'week1'), (2, 'week2'), (3, 'week1'), (4, 'week1');"
+            "INSERT INTO t_post_tags (tag, post) VALUES "
+            "(3, 1), (4, 1), (2, 1);"
+        )
+    run_sync(migration.create_indexes())
+    assert query(engine, "SELECT id, name FROM t_tag ORDER BY id") == [
+        (1, "week1"),
+        (2, "week2"),
+    ]
+    assert query(
+        engine, "SELECT tag, post FROM t_post_tags ORDER BY tag"
+    ) == [(1, 1), (2, 1)]
+
+
+def test_duplicate_queues_renamed(engine: PooledSQLiteEngine):
+    """Are queues with duplicate names renamed?"""
+    with engine.connection() as connection:
+        connection.execute(
+            "INSERT INTO t_queue (id, immutable, view_only, name) "
+            "VALUES (2, 0, 0, 'Main queue')"
+        )
+    run_sync(migration.create_indexes())
+    assert query(engine, "SELECT id, name FROM t_queue ORDER BY id") == [
+        (1, "Main queue"),
+        (2, "Main queue (2)"),
+    ]
+
+
+def test_duplicate_users_rejected(engine: PooledSQLiteEngine):
+    """Does the migration fail, naming users with duplicate details?"""
+    with engine.connection() as connection:
+        connection.execute(
+            "INSERT INTO t_user "
+            "(id, username, name_first, name_last, email, permissions) "
+            "VALUES (2, 'user2', 'C', 'D', 'user1@example.com', 1)"
+        )
+    with pytest.raises(ValueError, match="'user1@example.com'.* users 1, 2"):
+        run_sync(migration.create_indexes())
+    # No unique constraints are added
+    assert query(
+        engine,
+        "SELECT name FROM sqlite_master WHERE name LIKE '%_unique'",
+    ) == []
@@ -0,0 +1,43 @@
+"""
+# Tests / Backend / Permission Cache Test
+
+Tests for caching compiled permissions
+
+* Compiled permissions are used while they are up to date
+* Compiled permissions are discarded when permissions change
+* Compiled permissions expire, so changes by other processes are noticed
+"""
+import pytest
+from backend.models.permissions import permission_set
+from backend.models.permissions.permission_set import (
+    COMPILED_TTL,
+    _bump_version,
+    _compiled_entry,
+    _current_version,
+    _get_compiled,
+)
+
+
+def test_up_to_date():
+    """Are compiled permissions used while they are up to date?"""
+    compiled = {1: _compiled_entry(_current_version(), 0b101)}
+    assert _get_compiled(compiled, 1) == 0b101
+    assert _get_compiled(compiled, 2) is None
+
+
+def test_invalidated():
+    """Are compiled permissions discarded once permissions change?"""
+    compiled = {1: _compiled_entry(_current_version(), 0b101)}
+    _bump_version()
+    assert _get_compiled(compiled, 1) is None
+
+
+def test_expired(monkeypatch: pytest.MonkeyPatch):
+    """Do compiled permissions expire, even without any changes?"""
+    now = 1000.0
+    monkeypatch.setattr(permission_set.time, "monotonic", lambda: now)
+    compiled = {1: _compiled_entry(_current_version(), 0b101)}
+    now += COMPILED_TTL - 1
+    assert _get_compiled(compiled, 1) == 0b101
+    now += 2
+    assert _get_compiled(compiled, 1) is None
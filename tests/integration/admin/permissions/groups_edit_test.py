@@ -8,6 +8,7 @@ Tests for editing permission groups
 * Can't edit the admin group
 * Don't have ManageGroupPermissions permission
 * Users in edited groups get permissions
+* Users in edited groups lose permissions
 * Name updates
 """
 import pytest
@@ -115,6 +116,47 @@ def test_permissions_edited(
     )
 
 
+def test_permissions_revoked(
+    simple_users: ISimpleUsers,
+    permission_groups: IPermissionGroups,
+):
+    """Do users whose permission group was changed lose old permissions?"""
+    perms = permission_groups['mod']['permissions']
+    for p in perms:
+        if p['permission_id'] == Permission.ManagePermissionGroups.value:
+            p['value'] = True
+    permissions.groups_edit(
+        simple_users['admin']['token'],
+        permission_groups['mod']['group_id'],
+        permission_groups['mod']['name'],
+        perms,
+    )
+    # Moderators can use the permission
+    permissions.groups_edit(
+        simple_users['mod']['token'],
+        permission_groups['mod']['group_id'],
+        permission_groups['mod']['name'],
+        perms,
+    )
+    # Then it gets taken away again
+    for p in perms:
+        if p['permission_id'] == Permission.ManagePermissionGroups.value:
+            p['value'] = False
+    permissions.groups_edit(
+        simple_users['admin']['token'],
+        permission_groups['mod']['group_id'],
+        permission_groups['mod']['name'],
+        perms,
+    )
+    with pytest.raises(Forbidden):
+        permissions.groups_edit(
+            simple_users['mod']['token'],
+            permission_groups['mod']['group_id'],
+            permission_groups['mod']['name'],
+            perms,
+        )
+
+
 def test_group_name_updated(
     simple_users: ISimpleUsers,
     permission_groups: IPermissionGroups,
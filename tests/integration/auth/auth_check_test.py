@@ -0,0 +1,118 @@
+"""
+# Tests / Integration / Auth / Auth check test
+
+Tests for checking logins with the auth server, using mock.auth
+
+* Correct and incorrect logins are reported correctly
+* Remembered logins are accepted without contacting the auth server
+* Incorrect logins aren't remembered
+* The circuit breaker opens after the auth server fails repeatedly
+* The circuit breaker closes once the auth server works again
+* Connection timeouts are reported as the auth server being unavailable
+* Invalid addresses don't open the circuit breaker
+"""
+import time
+import pytest
+import requests
+from mock.auth import AUTH_URL
+from backend.util import http_errors, auth_check
+from backend.util.auth_check import do_auth_check
+from backend.util.cache import LruCache
+from backend.util.circuit_breaker import CircuitBreaker
+from typing import Optional
+
+
+BAD_ADDRESS = "http://localhost:6969/login"
+
+
+def check(
+    password: str,
+    address: str = f"{AUTH_URL}/login",
+    breaker: Optional[CircuitBreaker] = None,
+    cache: Optional[LruCache[str, bool]] = None,
+) -> bool:
+    """Check the login of admin1 using mock.auth's configuration"""
+    return do_auth_check(
+        address,
+        "get",
+        "username",
+        "password",
+        "true",
+        "admin1",
+        password,
+        breaker=breaker,
+        cache=cache,
+    )
+
+
+def test_check():
+    """Are correct and incorrect logins reported correctly?"""
+    assert check("admin1")
+    assert not check("incorrect")
+
+
+def test_cached():
+    """Are remembered logins accepted without contacting the auth server?"""
+    breaker = CircuitBreaker(1, 60)
+    cache: LruCache[str, bool] = LruCache(10, 60)
+    assert check("admin1", breaker=breaker, cache=cache)
+    # Make the auth server seem to be down
+    breaker.record_failure()
+    assert check("admin1", breaker=breaker, cache=cache)
+    with pytest.raises(http_errors.ServiceUnavailable):
+        check("incorrect", breaker=breaker, cache=cache)
+
+
+def test_incorrect_not_cached():
+    """Are failed logins checked again every time?"""
+    breaker = CircuitBreaker(1, 60)
+    cache: LruCache[str, bool] = LruCache(10, 60)
+    assert not check("incorrect", breaker=breaker, cache=cache)
+    breaker.record_failure()
+    with pytest.raises(http_errors.ServiceUnavailable):
+        check("incorrect", breaker=breaker, cache=cache)
+
+
+def test_breaker_opens():
+    """
+    Are requests rejected without being made once the auth server has failed
+    too many times?
+    """
+    breaker = CircuitBreaker(2, 60)
+    for _ in range(2):
+        with pytest.raises(http_errors.BadRequest):
+            check("admin1", BAD_ADDRESS, breaker)
+    assert breaker.is_open
+    with pytest.raises(http_errors.ServiceUnavailable):
+        check("admin1", breaker=breaker)
+
+
+def test_breaker_closes():
+    """Does the breaker close once a trial request succeeds?"""
+    breaker = CircuitBreaker(1, 0.1)
+    with pytest.raises(http_errors.BadRequest):
+        check("admin1", BAD_ADDRESS, breaker)
+    assert breaker.is_open
+    time.sleep(0.2)
+    assert check("admin1", breaker=breaker)
+    assert not breaker.is_open
+
+
+def test_connect_timeout(monkeypatch: pytest.MonkeyPatch):
+    """Is a timeout while connecting reported as a timeout?"""
+    def request(*args, **kwargs):
+        raise requests.ConnectTimeout()
+    monkeypatch.setattr(auth_check._session, "request", request)
+    breaker = CircuitBreaker(1, 60)
+    with pytest.raises(http_errors.ServiceUnavailable):
+        check("admin1", breaker=breaker)
+    assert breaker.is_open
+
+
+def test_invalid_schema():
+    """Does an address without a schema leave the breaker closed?"""
+    breaker = CircuitBreaker(1, 60)
+    with pytest.raises(http_errors.BadRequest):
+        check("admin1", AUTH_URL.removeprefix("http://") + "/login", breaker)
+    assert not breaker.is_open
+    assert check("admin1", breaker=breaker)
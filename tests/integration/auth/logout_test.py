@@ -4,6 +4,7 @@
 Tests for logging out
 
 * Token invalidated
+* Token invalidated after being used
 * No errors for invalid tokens
 """
 import pytest
@@ -25,6 +26,22 @@ def test_token_invalidated(basic_server_setup: IBasicServerSetup):
         )
 
 
+def test_used_token_invalidated(basic_server_setup: IBasicServerSetup):
+    """
+    Does a token that was recently used get invalidated when we log out?
+    """
+    profile(
+        basic_server_setup['token'],
+        basic_server_setup['user_id'],
+    )
+    logout(basic_server_setup['token'])
+    with pytest.raises(http_errors.Forbidden):
+        profile(
+            basic_server_setup['token'],
+            basic_server_setup['user_id'],
+        )
+
+
 def test_no_error_for_invalid_token():
     """Do we get no errors if the token is invalid?"""
     logout(JWT('not.a.token'))
@@ -2,15 +2,43 @@
 # Tests / Integration / Auth / Token test
 
 Tests for tokens
+
+* Tokens must be given in the correct format
+* Expired tokens are rejected
+* Tokens without an expiry are rejected
+* Refreshing a token gives a JWT that expires later
+* Invalidated tokens can't be refreshed
 """
+import jwt
+import time
 import pytest
 from requests import post as req_post
-from backend.util.http_errors import Unauthorized
+from backend.models.token import SECRET
+from backend.types.auth import JWT
+from backend.util.http_errors import Unauthorized, Forbidden
 from ensemble_request.consts import URL
 from ensemble_request.browse import post
+from ensemble_request import auth
 from ..conftest import IBasicServerSetup
 
 
+def decode(token: JWT) -> dict:
+    """Decode a JWT without checking it"""
+    return jwt.decode(token, options={"verify_signature": False})
+
+
+def resign(token: JWT, **claims) -> JWT:
+    """
+    Sign the contents of a JWT again, with some claims replaced (or removed
+    if they are `None`)
+    """
+    contents = decode(token) | claims
+    return JWT(jwt.encode(
+        {k: v for k, v in contents.items() if v is not None},
+        SECRET,
+    ))
+
+
 def test_non_bearer_token(basic_server_setup: IBasicServerSetup):
     """Tokens must start with 'Bearer '"""
     res = req_post(
@@ -39,3 +67,39 @@ def test_missing_token():
             "My text",
             [],
         )
+
+
+def test_expired_token(basic_server_setup: IBasicServerSetup):
+    """Are tokens rejected once they have expired?"""
+    token = resign(basic_server_setup["token"], exp=int(time.time()) - 10)
+    with pytest.raises(Forbidden):
+        auth.permissions(token)
+
+
+def test_token_without_expiry(basic_server_setup: IBasicServerSetup):
+    """Are tokens that don't have an expiry rejected?"""
+    token = resign(basic_server_setup["token"], exp=None)
+    with pytest.raises(Forbidden):
+        auth.permissions(token)
+
+
+@pytest.mark.core
+def test_refresh(basic_server_setup: IBasicServerSetup):
+    """Does refreshing a token give a JWT that expires later?"""
+    token = basic_server_setup["token"]
+    # Make sure the expiry time moves forward
+    time.sleep(1)
+    refreshed = auth.refresh(token)["token"]
+    assert decode(refreshed)["exp"] > decode(token)["exp"]
+    assert decode(refreshed)["token_id"] == decode(token)["token_id"]
+    auth.permissions(refreshed)
+    # The original JWT still works until it expires
+    auth.permissions(token)
+
+
+def test_refresh_invalidated(basic_server_setup: IBasicServerSetup):
+    """Can tokens be refreshed after logging out?"""
+    token = basic_server_setup["token"]
+    auth.logout(token)
+    with pytest.raises(Forbidden):
+        auth.refresh(token)
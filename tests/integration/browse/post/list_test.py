@@ -5,6 +5,10 @@ Tests for browse routes
 
 * browse/post_list returns an empty list when there are no posts
 * browse/post_list returns the correct list containing >= 1 posts
+* browse/post_list gives the correct tags and reactions for each post
+* browse/post_list can be paginated using limit and before_id
+* browse/post_list fails when the limit is invalid
+* browse/post_list only returns one page of posts by default
 * browse/create succeeds creating a post when inputs are valid
 * browse/create fails when heading/text are empty
 """
@@ -12,6 +16,7 @@ import pytest
 from ...conftest import ISimpleUsers
 from backend.util import http_errors
 from ensemble_request.browse import post
+from ensemble_request.tags import new_tag
 
 
 def test_empty_post_list(simple_users: ISimpleUsers):
@@ -57,6 +62,87 @@ def test_create_multiple_posts(simple_users: ISimpleUsers):
     assert [post2_id, post1_id] == [p["post_id"] for p in posts]
 
 
+def test_list_info_matches_each_post(simple_users: ISimpleUsers):
+    """
+    When listing many posts, does each post get its own tags and me too
+    count?
+    """
+    admin = simple_users["admin"]["token"]
+    user = simple_users["user"]["token"]
+    tag_b = new_tag(admin, "b")["tag_id"]
+    tag_a = new_tag(admin, "a")["tag_id"]
+    post1 = post.create(admin, "Head 1", "Text 1", [tag_b, tag_a])["post_id"]
+    post2 = post.create(admin, "Head 2", "Text 2", [tag_b])["post_id"]
+    post3 = post.create(admin, "Head 3", "Text 3", [])["post_id"]
+    post.react(admin, post1)
+    post.react(user, post1)
+    post.react(user, post2)
+
+    posts = post.list(user)["posts"]
+
+    assert [p["post_id"] for p in posts] == [post3, post2, post1]
+    assert [p["tags"] for p in posts] == [[], [tag_b], [tag_a, tag_b]]
+    assert [p["me_too"] for p in posts] == [0, 1, 2]
+
+
+def test_paginate_post_list(simple_users: ISimpleUsers):
+    """
+    Can we get the post list one page at a time, skipping posts that the user
+    can't see?
+    """
+    admin = simple_users["admin"]["token"]
+    user = simple_users["user"]["token"]
+    ids = [
+        post.create(admin, f"Head {i}", f"Text {i}", [], private=(i == 2))
+        ["post_id"]
+        for i in range(5)
+    ]
+
+    page1 = post.list(user, limit=2)["posts"]
+    assert [p["post_id"] for p in page1] == [ids[4], ids[3]]
+
+    page2 = post.list(user, limit=2, before_id=page1[-1]["post_id"])["posts"]
+    assert [p["post_id"] for p in page2] == [ids[1], ids[0]]
+
+    page3 = post.list(user, limit=2, before_id=page2[-1]["post_id"])["posts"]
+    assert page3 == []
+
+
+def test_invalid_limit(simple_users: ISimpleUsers):
+    """
+    Do we get a 400 error when the limit isn't positive?
+    """
+    token = simple_users["user"]["token"]
+    with pytest.raises(http_errors.BadRequest):
+        post.list(token, limit=0)
+    with pytest.raises(http_errors.BadRequest):
+        post.list(token, limit=1000)
+
+
+def test_default_page_size(simple_users: ISimpleUsers):
+    """
+    Do we only get the first page of posts if we don't give a limit?
+    """
+    token = simple_users["admin"]["token"]
+    for i in range(51):
+        post.create(token, f"Head {i}", "Text", [])
+    assert len(post.list(token)["posts"]) == 50
+
+
+def test_invalid_pagination(simple_users: ISimpleUsers):
+    """
+    Do we get a 400 error when using the wrong kind of pagination?
+    """
+    token = simple_users["admin"]["token"]
+    post_id = post.create(token, "Head", "Text", [])["post_id"]
+    with pytest.raises(http_errors.BadRequest):
+        post.list(token, offset=1)
+    with pytest.raises(http_errors.BadRequest):
+        post.list(token, "Text", before_id=post_id)
+    with pytest.raises(http_errors.BadRequest):
+        post.list(token, "Text", offset=-1)
+
+
 def test_empty_heading_text(simple_users: ISimpleUsers):
     """
     If we try to create a post without a heading or text, do we get a
@@ -3,9 +3,12 @@
 
 Tests for searching with post.list
 
+* Search results can be paginated in order of ranking
+* Search terms shorter than 3 characters match within words
+
 """
-from ...conftest import ISimpleUsers
-from ensemble_request.browse import post
+from ...conftest import ISimpleUsers, IAllUsers
+from ensemble_request.browse import post, comment, reply
 
 
 def test_simple(simple_users: ISimpleUsers):
@@ -34,3 +37,101 @@ def test_ranking(simple_users: ISimpleUsers):
     posts = post.list(token, "sir the")["posts"]
     assert len(posts) == 2
     assert [p["post_id"] for p in posts] == [post_id1, post_id2]
+
+
+def test_paginate_ranked(simple_users: ISimpleUsers):
+    """
+    Are pages of search results in order of ranking, even when better
+    matches are newer?
+    """
+    token = simple_users["user"]["token"]
+    worse = post.create(token, "head", "sir, and some other words", [])[
+        "post_id"]
+    better = post.create(token, "head", "sir sir sir", [])["post_id"]
+    worst = post.create(
+        token, "head", "sir, and a lot of other unrelated words here", [])[
+        "post_id"]
+
+    ranked = [p["post_id"] for p in post.list(token, "sir")["posts"]]
+    assert ranked == [better, worse, worst]
+    page1 = post.list(token, "sir", limit=2)["posts"]
+    page2 = post.list(token, "sir", limit=2, offset=2)["posts"]
+    assert [p["post_id"] for p in page1 + page2] == ranked
+
+
+def test_match_comments_and_replies(simple_users: ISimpleUsers):
+    """
+    Posts are found if their comments or replies contain the search term
+    """
+    token = simple_users["user"]["token"]
+    post_id1 = post.create(token, "First head", "first text", [])["post_id"]
+    post_id2 = post.create(token, "Second head", "second text", [])[
+        "post_id"]
+    post.create(token, "Third head", "third text", [])
+    comment_id = comment.create(token, post_id1, "apples")["comment_id"]
+    comment_id2 = comment.create(token, post_id2, "nothing")["comment_id"]
+    reply.create(token, comment_id2, "oranges")
+
+    posts = post.list(token, "apples")["posts"]
+    assert [p["post_id"] for p in posts] == [post_id1]
+    posts = post.list(token, "oranges")["posts"]
+    assert [p["post_id"] for p in posts] == [post_id2]
+
+    # Once the comment is edited, it no longer matches
+    comment.edit(token, comment_id, "bananas")
+    assert post.list(token, "apples")["posts"] == []
+
+
+def test_typos(simple_users: ISimpleUsers):
+    """
+    Posts are still found if the search term contains a typo
+    """
+    token = simple_users["user"]["token"]
+    post_id = post.create(token, "First head", "hello there", [])["post_id"]
+    post.create(token, "Second head", "good bye", [])
+
+    posts = post.list(token, "helo")["posts"]
+    assert [p["post_id"] for p in posts] == [post_id]
+
+
+def test_short_term(simple_users: ISimpleUsers):
+    """
+    Do search terms too short to have any trigrams still match partial words?
+    """
+    token = simple_users["user"]["token"]
+    older = post.create(token, "Lab q7", "help", [])["post_id"]
+    newer = post.create(token, "Question", "stuck on lab q7", [])["post_id"]
+    post.create(token, "Lab q8", "help", [])
+
+    posts = post.list(token, "7")["posts"]
+    assert [p["post_id"] for p in posts] == [newer, older]
+
+
+def test_edited_post(simple_users: ISimpleUsers):
+    """
+    Searches use the latest heading and text of edited posts
+    """
+    token = simple_users["user"]["token"]
+    post_id = post.create(token, "First head", "hello there", [])["post_id"]
+    post.edit(token, post_id, "Updated head", "goodbye now", [])
+
+    assert post.list(token, "hello")["posts"] == []
+    posts = post.list(token, "goodbye")["posts"]
+    assert [p["post_id"] for p in posts] == [post_id]
+    posts = post.list(token, "updated")["posts"]
+    assert [p["post_id"] for p in posts] == [post_id]
+
+
+def test_private_posts(all_users: IAllUsers):
+    """
+    Searches don't include posts that the user can't view
+    """
+    user_token1 = all_users["users"][0]["token"]
+    user_token2 = all_users["users"][1]["token"]
+    post_id = post.create(
+        user_token1, "Secret head", "secret text", [], private=True
+    )["post_id"]
+
+    assert post.list(user_token2, "secret")["posts"] == []
+    posts = post.list(user_token1, "secret")["posts"]
+    assert [p["post_id"] for p in posts] == [post_id]
@@ -0,0 +1,72 @@
+"""
+# Tests / Integration / Browse / Post / Thread
+
+Tests for post/thread
+
+* Gives the same info as viewing the post, comments and replies individually
+* Works for posts with no comments
+* Fails when the user can't view the post
+"""
+import pytest
+from ...conftest import ISimpleUsers, IMakePosts
+from backend.util import http_errors
+from ensemble_request.browse import post, comment, reply
+
+
+@pytest.mark.core
+def test_thread_matches_views(
+    simple_users: ISimpleUsers,
+    make_posts: IMakePosts,
+):
+    """
+    Does the thread give the same info as the individual view routes?
+    """
+    admin = simple_users["admin"]["token"]
+    user = simple_users["user"]["token"]
+    mod = simple_users["mod"]["token"]
+    post_id = make_posts["post1_id"]
+    c1 = comment.create(user, post_id, "first")["comment_id"]
+    c2 = comment.create(mod, post_id, "second")["comment_id"]
+    r1 = reply.create(user, c1, "reply 1")["reply_id"]
+    r2 = reply.create(mod, c2, "reply 2")["reply_id"]
+    r3 = reply.create(mod, c1, "reply 3")["reply_id"]
+    comment.react(mod, c2)
+    comment.accept(admin, c1)
+    reply.react(user, r3)
+    post.react(user, post_id)
+
+    thread = post.thread(user, post_id)
+    assert thread["post"] == post.view(user, post_id)
+    assert [c["comment_id"] for c in thread["comments"]] \
+        == thread["post"]["comments"]
+    assert thread["comments"] == [
+        comment.view(user, c) for c in thread["post"]["comments"]
+    ]
+    assert thread["replies"] == [reply.view(user, r) for r in [r1, r2, r3]]
+
+
+def test_thread_no_comments(
+    simple_users: ISimpleUsers,
+    make_posts: IMakePosts,
+):
+    """
+    Does the thread work for posts without any comments?
+    """
+    token = simple_users["user"]["token"]
+    post_id = make_posts["post1_id"]
+    thread = post.thread(token, post_id)
+    assert thread["post"] == post.view(token, post_id)
+    assert thread["comments"] == []
+    assert thread["replies"] == []
+
+
+def test_thread_private(simple_users: ISimpleUsers):
+    """
+    Do users who can't view the post get a 403 error?
+    """
+    admin = simple_users["admin"]["token"]
+    user = simple_users["user"]["token"]
+    post_id = post.create(admin, "heading", "text", [], private=True)[
+        "post_id"]
+    with pytest.raises(http_errors.Forbidden):
+        post.thread(user, post_id)
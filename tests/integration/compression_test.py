@@ -0,0 +1,68 @@
+"""
+# Tests / Integration / Compression Test
+
+Tests for compressing responses
+
+* Large responses are compressed if the client accepts gzip
+* Responses aren't compressed if the client doesn't accept any encodings
+* Small responses aren't compressed
+"""
+import requests
+from backend.types.auth import JWT
+from ensemble_request.consts import URL
+from ensemble_request.browse import post
+from .conftest import IBasicServerSetup
+
+
+def list_posts(token: JWT, accept_encoding: str) -> requests.Response:
+    """
+    List posts, accepting the given encodings
+    """
+    return requests.get(
+        f"{URL}/browse/post/list",
+        params={"search_term": ""},
+        headers={
+            "Authorization": f"Bearer {token}",
+            "Accept-Encoding": accept_encoding,
+        },
+    )
+
+
+def make_many_posts(token: JWT) -> None:
+    """
+    Create enough posts that listing them gives a large response
+    """
+    for i in range(20):
+        post.create(token, f"Post number {i}", "Text", [])
+
+
+def test_large_response_compressed(basic_server_setup: IBasicServerSetup):
+    """Are large responses compressed using gzip?"""
+    token = basic_server_setup["token"]
+    make_many_posts(token)
+    res = list_posts(token, "gzip")
+    assert res.headers["Content-Encoding"] == "gzip"
+    assert "Accept-Encoding" in res.headers["Vary"]
+    # Requests decompresses it automatically
+    assert res.json() == post.list(token)
+    assert int(res.headers["Content-Length"]) < len(res.content)
+
+
+def test_not_accepted(basic_server_setup: IBasicServerSetup):
+    """Are responses left uncompressed if the client doesn't accept it?"""
+    token = basic_server_setup["token"]
+    make_many_posts(token)
+    res = list_posts(token, "identity")
+    assert "Content-Encoding" not in res.headers
+    assert res.json() == post.list(token)
+
+
+def test_small_response_not_compressed():
+    """Are small responses left uncompressed?"""
+    res = requests.get(
+        f"{URL}/debug/echo",
+        params={"value": "Hello"},
+        headers={"Accept-Encoding": "gzip"},
+    )
+    assert "Content-Encoding" not in res.headers
+    assert res.json() == {"value": "Hello"}
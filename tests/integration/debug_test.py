@@ -4,7 +4,7 @@
 Tests for debug routes
 """
 import pytest
-from ensemble_request.debug import echo, fail, enabled
+from ensemble_request.debug import echo, fail, enabled, db_settings
 from backend.util import http_errors
 
 
@@ -27,3 +27,14 @@ def test_fail():
         assert e.code == 500
         assert e.description == "You brought this upon yourself."
         assert e.heading == "Internal Server Error"
+
+
+def test_db_settings():
+    """Are the configured database settings applied?"""
+    settings = db_settings()
+    assert settings["configured"].keys() == settings["active"].keys()
+    for name in ["journal_mode", "busy_timeout", "mmap_size", "cache_size"]:
+        assert (
+            settings["active"][name].lower()
+            == settings["configured"][name].lower()
+        )
@@ -49,6 +49,7 @@ def test_commenter_notified_when_accepted(
             'comment': comment,
             'reply': None,
             'queue': None,
+            'count': 1,
         },
     ])
 
@@ -88,6 +89,7 @@ def test_op_and_commenter_notified_when_accepted_by_mod(
             'comment': comment,
             'reply': None,
             'queue': None,
+            'count': 1,
         },
         expect.DictContainingItems({
             "heading": "New comment on your post",
@@ -111,6 +113,7 @@ def test_op_and_commenter_notified_when_accepted_by_mod(
             'comment': comment,
             'reply': None,
             'queue': None,
+            'count': 1,
         },
     ])
 
@@ -151,6 +154,7 @@ def test_op_who_is_commenter_notified_when_accepted_by_mod(
             'comment': comment,
             'reply': None,
             'queue': None,
+            'count': 1,
         },
     ])
 
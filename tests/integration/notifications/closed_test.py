@@ -35,6 +35,7 @@ def test_closed_post_notification(
             'comment': None,
             'reply': None,
             'queue': None,
+            'count': 1,
         },
     ])
 
@@ -43,6 +43,7 @@ def test_notification_on_comment(
         'comment': comment,
         'reply': None,
         'queue': None,
+        'count': 1,
     }]
 
 
@@ -80,6 +81,7 @@ def test_notification_on_reply(
         'comment': comment,
         'reply': reply,
         'queue': None,
+        'count': 1,
     }]
 
 
@@ -117,6 +119,7 @@ def test_reply_op_notified(
         'comment': comment,
         'reply': reply,
         'queue': None,
+        'count': 1,
     }
 
 
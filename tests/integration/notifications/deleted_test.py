@@ -35,6 +35,7 @@ def test_deleted_post_notification(
             'comment': None,
             'reply': None,
             'queue': None,
+            'count': 1,
         },
     ])
 
@@ -82,6 +83,7 @@ def test_deleted_comment_notification(
             'comment': comment,
             'reply': None,
             'queue': None,
+            'count': 1,
         },
     ])
 
@@ -144,6 +146,7 @@ def test_deleted_reply_notification(
             'comment': comment,
             'reply': reply,
             'queue': None,
+            'count': 1,
         },
     ])
 
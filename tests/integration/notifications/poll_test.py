@@ -0,0 +1,115 @@
+"""
+# Tests / Integration / Notifications / Poll test
+
+Tests for polling for new notifications
+
+* Unread count starts at zero and counts unseen notifications
+* Notifications newer than `after_id` are returned immediately
+* Polling with no new notifications times out with an empty list
+* Polling returns as soon as a new notification is created
+* Polling returns when a notification is marked as seen
+* BadRequest for an invalid timeout
+"""
+import time
+import pytest
+from threading import Thread
+from backend.types.notifications import INotificationPoll
+from backend.util import http_errors
+from ..conftest import ISimpleUsers, IMakePosts
+from ensemble_request import notifications, browse
+
+
+def test_unread_count(simple_users: ISimpleUsers, make_posts: IMakePosts):
+    """Does the unread count match the number of unseen notifications?"""
+    admin = simple_users['admin']['token']
+    assert notifications.unread_count(admin)['unread_count'] == 0
+    browse.comment.create(
+        simple_users['user']['token'],
+        make_posts['post1_id'],
+        "My reply",
+    )
+    assert notifications.unread_count(admin)['unread_count'] == 1
+    n = notifications.list(admin)['notifications'][0]
+    notifications.seen(admin, n['notification_id'], True)
+    assert notifications.unread_count(admin)['unread_count'] == 0
+
+
+@pytest.mark.core
+def test_poll_after_id(simple_users: ISimpleUsers, make_posts: IMakePosts):
+    """Are notifications newer than after_id returned immediately?"""
+    admin = simple_users['admin']['token']
+    first = notifications.poll(admin, timeout=0)
+    assert first['notifications'] == []
+    assert first['last_id'] == 0
+    browse.comment.create(
+        simple_users['user']['token'],
+        make_posts['post1_id'],
+        "My reply",
+    )
+    result = notifications.poll(admin, first['last_id'], timeout=0)
+    assert result['notifications'] \
+        == notifications.list(admin)['notifications']
+    assert result['unread_count'] == 1
+    assert result['last_id'] == result['notifications'][0]['notification_id']
+    # Nothing newer than the last notification
+    result = notifications.poll(admin, result['last_id'], timeout=0)
+    assert result['notifications'] == []
+    assert result['unread_count'] == 1
+
+
+def test_poll_timeout(simple_users: ISimpleUsers):
+    """Does polling give no notifications once the timeout expires?"""
+    start = time.monotonic()
+    result = notifications.poll(simple_users['admin']['token'], timeout=0.5)
+    assert time.monotonic() - start >= 0.5
+    assert result['notifications'] == []
+
+
+def test_poll_wakes(simple_users: ISimpleUsers, make_posts: IMakePosts):
+    """Does polling return as soon as a notification is created?"""
+    admin = simple_users['admin']['token']
+    results: list[INotificationPoll] = []
+    poller = Thread(
+        target=lambda: results.append(notifications.poll(admin, timeout=30)))
+    start = time.monotonic()
+    poller.start()
+    # Give the poll time to start waiting
+    time.sleep(0.5)
+    browse.comment.create(
+        simple_users['user']['token'],
+        make_posts['post1_id'],
+        "My reply",
+    )
+    poller.join()
+    assert time.monotonic() - start < 10
+    assert len(results[0]['notifications']) == 1
+
+
+def test_poll_wakes_seen(simple_users: ISimpleUsers, make_posts: IMakePosts):
+    """Does polling return when a notification is marked as seen?"""
+    admin = simple_users['admin']['token']
+    browse.comment.create(
+        simple_users['user']['token'],
+        make_posts['post1_id'],
+        "My reply",
+    )
+    n = notifications.list(admin)['notifications'][0]
+    results: list[INotificationPoll] = []
+    poller = Thread(target=lambda: results.append(
+        notifications.poll(admin, n['notification_id'], timeout=30)))
+    start = time.monotonic()
+    poller.start()
+    time.sleep(0.5)
+    notifications.seen(admin, n['notification_id'], True)
+    poller.join()
+    assert time.monotonic() - start < 10
+    assert results[0]['notifications'] == []
+    assert results[0]['unread_count'] == 0
+
+
+def test_poll_invalid_timeout(simple_users: ISimpleUsers):
+    """Are out of range timeouts rejected?"""
+    with pytest.raises(http_errors.BadRequest):
+        notifications.poll(simple_users['admin']['token'], timeout=-1)
+    with pytest.raises(http_errors.BadRequest):
+        notifications.poll(simple_users['admin']['token'], timeout=1000)
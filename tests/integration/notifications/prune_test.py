@@ -0,0 +1,63 @@
+"""
+# Tests / Integration / Notifications / Prune test
+
+Tests for the script that deletes old notifications
+
+* Seen notifications older than the retention period are deleted
+* Unseen notifications are kept
+* Notifications newer than the retention period are kept
+"""
+import subprocess
+import sys
+from ..conftest import ISimpleUsers, IMakePosts
+from ensemble_request import notifications, browse
+
+
+def prune(days: float) -> int:
+    """
+    Run the prune script, deleting seen notifications older than the given
+    number of days, and return the number of notifications it deleted
+    """
+    result = subprocess.run(
+        [sys.executable, 'scripts/prune_notifications.py', str(days)],
+        capture_output=True,
+        text=True,
+    )
+    assert result.returncode == 0
+    return int(result.stdout.split()[2])
+
+
+def test_prune(simple_users: ISimpleUsers, make_posts: IMakePosts):
+    """
+    Are seen notifications deleted, while unseen ones are kept?
+    """
+    admin = simple_users['admin']['token']
+    for text in ["First", "Second"]:
+        browse.comment.create(
+            simple_users['user']['token'],
+            make_posts['post1_id'],
+            text,
+        )
+    notifs = notifications.list(admin)['notifications']
+    notifications.seen(admin, notifs[1]['notification_id'], True)
+    assert prune(0) == 1
+    assert notifications.list(admin)['notifications'] == notifs[:1]
+
+
+def test_prune_keeps_recent(
+    simple_users: ISimpleUsers,
+    make_posts: IMakePosts,
+):
+    """
+    Are seen notifications newer than the retention period kept?
+    """
+    admin = simple_users['admin']['token']
+    browse.comment.create(
+        simple_users['user']['token'],
+        make_posts['post1_id'],
+        "My reply",
+    )
+    notif = notifications.list(admin)['notifications'][0]
+    notifications.seen(admin, notif['notification_id'], True)
+    assert prune(1) == 0
+    assert len(notifications.list(admin)['notifications']) == 1
@@ -4,8 +4,12 @@
 Tests for notifications when posts get added to a queue
 
 * Mods get notified if a post gets added to a queue they follow
+* All followers of a queue get notified
 * Mods don't get notified if they were the one doing the adding
 * Mods don't get notified if they aren't following the queue
+
+Notifications are sent by a background job, so the tests wait for jobs to
+finish before checking them.
 """
 from datetime import datetime
 import jestspectation as expect
@@ -14,8 +18,9 @@ from ..conftest import (
     IMakePosts,
     IDefaultQueues,
     IBasicServerSetup,
+    IAllUsers,
 )
-from ensemble_request import notifications, taskboard
+from ensemble_request import notifications, taskboard, debug
 
 
 def test_followers_notified(
@@ -36,6 +41,7 @@ def test_followers_notified(
         default_queues['main'],
         make_posts['post1_id'],
     )
+    debug.drain_jobs()
 
     notifs = notifications.list(simple_users['mod']['token'])
 
@@ -54,10 +60,37 @@ def test_followers_notified(
             "comment": None,
             "reply": None,
             "queue": default_queues['main'],
+            "count": 1,
         },
     ])
 
 
+def test_all_followers_notified(
+    all_users: IAllUsers,
+    make_posts: IMakePosts,
+    default_queues: IDefaultQueues,
+):
+    """
+    Does every follower of a queue get one notification when a post is added
+    to the queue?
+    """
+    followers = all_users['mods'] + all_users['admins'][1:]
+    for u in followers:
+        taskboard.queue_follow(u['token'], default_queues['main'])
+
+    taskboard.queue_post_add(
+        all_users['admins'][0]['token'],
+        default_queues['main'],
+        make_posts['post1_id'],
+    )
+    debug.drain_jobs()
+
+    for u in followers:
+        notifs = notifications.list(u['token'])['notifications']
+        assert len(notifs) == 1
+        assert notifs[0]['post'] == make_posts['post1_id']
+
+
 def test_non_followers_not_notified(
     basic_server_setup: IBasicServerSetup,
     make_posts: IMakePosts,
@@ -72,6 +105,7 @@ def test_non_followers_not_notified(
         default_queues['main'],
         make_posts['post1_id'],
     )
+    debug.drain_jobs()
 
     notifs = notifications.list(basic_server_setup['token'])
 
@@ -96,6 +130,7 @@ def test_mover_not_notified(
         default_queues['main'],
         make_posts['post1_id'],
     )
+    debug.drain_jobs()
 
     notifs = notifications.list(basic_server_setup['token'])
 
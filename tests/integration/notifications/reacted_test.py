@@ -9,6 +9,8 @@ Tests for notifications when reacting to content
 * Not notified of own reaction to post
 * Not notified of own reaction to comment
 * Not notified of own reaction to reply
+* Reactions to the same thing are merged while unseen
+* Merged reactions are returned as new notifications when polling
 """
 from datetime import datetime
 import jestspectation as expect
@@ -41,6 +43,7 @@ def test_notified_post(
             "comment": None,
             "reply": None,
             "queue": None,
+            "count": 1,
         }]
     )
 
@@ -75,6 +78,7 @@ def test_notified_comment(
             "comment": comment,
             "reply": None,
             "queue": None,
+            "count": 1,
         }]
     )
 
@@ -114,6 +118,7 @@ def test_notified_reply(
             "comment": comment,
             "reply": reply,
             "queue": None,
+            "count": 1,
         }]
     )
 
@@ -236,3 +241,75 @@ def test_not_notified_unreact_reply(
     assert len(
         notifications.list(simple_users['admin']['token'])['notifications']
     ) == 1
+
+
+def test_reactions_merged(
+    simple_users: ISimpleUsers,
+    make_posts: IMakePosts,
+):
+    """
+    Are reactions to the same post merged into one unseen notification?
+    """
+    admin = simple_users['admin']['token']
+    browse.post.react(simple_users['user']['token'], make_posts['post1_id'])
+    browse.post.react(simple_users['mod']['token'], make_posts['post1_id'])
+
+    notifs = notifications.list(admin)['notifications']
+    assert len(notifs) == 1
+    assert notifs[0]['count'] == 2
+    assert notifs[0]['heading'] == "Your post received 2 me toos"
+
+
+def test_reactions_not_merged_when_seen(
+    simple_users: ISimpleUsers,
+    make_posts: IMakePosts,
+):
+    """
+    Are reactions sent as a new notification once the previous one is seen?
+    """
+    admin = simple_users['admin']['token']
+    browse.post.react(simple_users['user']['token'], make_posts['post1_id'])
+    first = notifications.list(admin)['notifications'][0]
+    notifications.seen(admin, first['notification_id'], True)
+    browse.post.react(simple_users['mod']['token'], make_posts['post1_id'])
+
+    notifs = notifications.list(admin)['notifications']
+    assert len(notifs) == 2
+    assert [n['count'] for n in notifs] == [1, 1]
+
+
+def test_reactions_not_merged_different_targets(
+    simple_users: ISimpleUsers,
+    make_posts: IMakePosts,
+):
+    """
+    Are reactions to different posts kept as separate notifications?
+    """
+    browse.post.react(simple_users['user']['token'], make_posts['post1_id'])
+    browse.post.react(simple_users['user']['token'], make_posts['post2_id'])
+
+    notifs = notifications.list(simple_users['admin']['token'])[
+        'notifications']
+    assert len(notifs) == 2
+
+
+def test_merged_reactions_polled(
+    simple_users: ISimpleUsers,
+    make_posts: IMakePosts,
+):
+    """
+    Is a merged notification returned when polling for notifications newer
+    than the one it replaced?
+    """
+    admin = simple_users['admin']['token']
+    browse.post.react(simple_users['user']['token'], make_posts['post1_id'])
+    first = notifications.list(admin)['notifications'][0]
+    browse.post.react(simple_users['mod']['token'], make_posts['post1_id'])
+
+    notifs = notifications.poll(
+        admin, first['notification_id'], 0)['notifications']
+    assert len(notifs) == 1
+    assert notifs[0]['notification_id'] > first['notification_id']
+    assert notifs[0]['count'] == 2
+    # The old notification is replaced, rather than kept alongside it
+    assert notifications.list(admin)['notifications'] == notifs
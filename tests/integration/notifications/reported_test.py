@@ -6,11 +6,23 @@ Tests for notifications that a post was reported
 * Mods all get notification
 * Admin who makes report doesn't get notified
 * Mod whose post is reported doesn't get notified
+* Users' own permissions are used to choose who gets notified
+
+Notifications are sent by a background job, so the tests wait for jobs to
+finish before checking them.
 """
 from datetime import datetime
 import jestspectation as expect
-from ensemble_request import notifications, browse
-from ..conftest import ISimpleUsers, IBasicServerSetup, IMakePosts, IAllUsers
+from ensemble_request import notifications, browse, debug
+from ensemble_request.admin.permissions import set_permissions
+from backend.models.permissions import Permission
+from ..conftest import (
+    ISimpleUsers,
+    IBasicServerSetup,
+    IMakePosts,
+    IAllUsers,
+    IPermissionGroups,
+)
 
 
 def test_mod_notified(
@@ -22,6 +34,7 @@ def test_mod_notified(
         all_users['users'][0]['token'],
         make_posts['post1_id'],
     )
+    debug.drain_jobs()
     expected = expect.Equals([{
         "notification_id": expect.Any(int),
         "timestamp": expect.FloatApprox(
@@ -36,6 +49,7 @@ def test_mod_notified(
         "comment": None,
         "reply": None,
         "queue": None,
+        "count": 1,
     }])
     # Mods got notified
     notifs = notifications.list(all_users['mods'][0]['token'])['notifications']
@@ -54,6 +68,7 @@ def test_reporter_not_notified(
 ):
     """Does the person who submitted the report not get notified?"""
     browse.post.report(basic_server_setup['token'], make_posts['post1_id'])
+    debug.drain_jobs()
     assert notifications.list(
         basic_server_setup['token'])['notifications'] == []
 
@@ -64,5 +79,53 @@ def test_reported_op_not_notified(
 ):
     """Does the person whose post got reported not get notified?"""
     browse.post.report(simple_users['user']['token'], make_posts['post1_id'])
+    debug.drain_jobs()
     assert notifications.list(
         simple_users['admin']['token'])['notifications'] == []
+
+
+def test_individual_permissions(
+    all_users: IAllUsers,
+    permission_groups: IPermissionGroups,
+    make_posts: IMakePosts,
+):
+    """
+    Do users with the ViewReports permission get notified, even if their
+    group doesn't have it, and are users who are denied it not notified?
+    """
+    admin_token = all_users['admins'][0]['token']
+    set_permissions(
+        admin_token,
+        all_users['users'][1]['user_id'],
+        [
+            {
+                "permission_id": p.value,
+                "value": True if p == Permission.ViewReports else None,
+            }
+            for p in Permission
+        ],
+        permission_groups['user']['group_id'],
+    )
+    set_permissions(
+        admin_token,
+        all_users['mods'][0]['user_id'],
+        [
+            {
+                "permission_id": p.value,
+                "value": False if p == Permission.ViewReports else None,
+            }
+            for p in Permission
+        ],
+        permission_groups['mod']['group_id'],
+    )
+    browse.post.report(
+        all_users['users'][0]['token'],
+        make_posts['post1_id'],
+    )
+    debug.drain_jobs()
+    assert len(notifications.list(
+        all_users['users'][1]['token'])['notifications']) == 1
+    assert len(notifications.list(
+        all_users['mods'][0]['token'])['notifications']) == 0
+    assert len(notifications.list(
+        all_users['mods'][1]['token'])['notifications']) == 1
@@ -8,10 +8,19 @@ Tests for notification routes
 * Marking a notification as unseen works correctly
 * Can't mark info for other user's notifications
 * BadRequest for invalid notification ID
+* Listing notifications can be paginated
+* BadRequest for an invalid limit
+* Marking many notifications as seen by ID works correctly
+* Marking all notifications up to an ID as seen works correctly
+* Marking many notifications ignores other users' notifications
+* BadRequest when marking many without giving exactly one selection
+* BadRequest when marking many using values of the wrong type
+* BadRequest when marking too many notifications by ID
 """
 import pytest
 from backend.types.identifiers import NotificationId
 from backend.util import http_errors
+from backend.routes.notifications import MAX_SEEN_MANY
 from ..conftest import IBasicServerSetup, ISimpleUsers, IMakePosts
 from ensemble_request import notifications, browse
 
@@ -103,3 +112,122 @@ def test_see_notification_invalid_id(basic_server_setup: IBasicServerSetup):
             NotificationId(-1),
             True,
         )
+
+
+def make_notifs(
+    simple_users: ISimpleUsers,
+    make_posts: IMakePosts,
+    n: int,
+) -> list[NotificationId]:
+    """
+    Comment on the admin's post the given number of times, returning the IDs
+    of the admin's notifications from newest to oldest
+    """
+    for i in range(n):
+        browse.comment.create(
+            simple_users['user']['token'],
+            make_posts['post1_id'],
+            f"My reply {i}",
+        )
+    return [
+        notif['notification_id'] for notif in
+        notifications.list(simple_users['admin']['token'])['notifications']
+    ]
+
+
+def test_list_pagination(simple_users: ISimpleUsers, make_posts: IMakePosts):
+    """Can we get the notifications one page at a time?"""
+    token = simple_users['admin']['token']
+    ids = make_notifs(simple_users, make_posts, 5)
+    assert ids == sorted(ids, reverse=True)
+    page = notifications.list(token, limit=2)['notifications']
+    assert [n['notification_id'] for n in page] == ids[:2]
+    page = notifications.list(
+        token, limit=2, before_id=page[-1]['notification_id'])['notifications']
+    assert [n['notification_id'] for n in page] == ids[2:4]
+    page = notifications.list(
+        token, limit=2, before_id=page[-1]['notification_id'])['notifications']
+    assert [n['notification_id'] for n in page] == ids[4:]
+
+
+def test_list_invalid_limit(basic_server_setup: IBasicServerSetup):
+    """Do we get an error if the limit isn't positive?"""
+    with pytest.raises(http_errors.BadRequest):
+        notifications.list(basic_server_setup['token'], limit=0)
+
+
+@pytest.mark.core
+def test_see_many_ids(simple_users: ISimpleUsers, make_posts: IMakePosts):
+    """Can we mark a selection of notifications as seen?"""
+    token = simple_users['admin']['token']
+    ids = make_notifs(simple_users, make_posts, 3)
+    notifications.seen_many(token, True, notification_ids=ids[:2])
+    seen = [n['seen'] for n in notifications.list(token)['notifications']]
+    assert seen == [True, True, False]
+    notifications.seen_many(token, False, notification_ids=[ids[0]])
+    seen = [n['seen'] for n in notifications.list(token)['notifications']]
+    assert seen == [False, True, False]
+
+
+def test_see_many_up_to(simple_users: ISimpleUsers, make_posts: IMakePosts):
+    """Can we mark all notifications up to a given ID as seen?"""
+    token = simple_users['admin']['token']
+    ids = make_notifs(simple_users, make_posts, 3)
+    notifications.seen_many(token, True, up_to_id=ids[1])
+    seen = [n['seen'] for n in notifications.list(token)['notifications']]
+    assert seen == [False, True, True]
+
+
+def test_see_many_wrong_user(
+    simple_users: ISimpleUsers,
+    make_posts: IMakePosts,
+):
+    """Are other users' notifications left alone?"""
+    ids = make_notifs(simple_users, make_posts, 2)
+    user = simple_users['user']['token']
+    notifications.seen_many(user, True, notification_ids=ids)
+    notifications.seen_many(user, True, up_to_id=ids[0])
+    assert notifications.unread_count(
+        simple_users['admin']['token'])['unread_count'] == 2
+
+
+def test_see_many_invalid(basic_server_setup: IBasicServerSetup):
+    """Do we get an error unless exactly one selection is given?"""
+    with pytest.raises(http_errors.BadRequest):
+        notifications.seen_many(basic_server_setup['token'], True)
+    with pytest.raises(http_errors.BadRequest):
+        notifications.seen_many(
+            basic_server_setup['token'],
+            True,
+            notification_ids=[NotificationId(1)],
+            up_to_id=NotificationId(1),
+        )
+
+
+def test_see_many_invalid_types(basic_server_setup: IBasicServerSetup):
+    """Do we get an error if the values given are the wrong type?"""
+    token = basic_server_setup['token']
+    with pytest.raises(http_errors.BadRequest):
+        notifications.seen_many(token, True, up_to_id="x")  # type: ignore
+    with pytest.raises(http_errors.BadRequest):
+        notifications.seen_many(
+            token, True, notification_ids=["x"])  # type: ignore
+    with pytest.raises(http_errors.BadRequest):
+        notifications.seen_many(
+            token, True, notification_ids=1)  # type: ignore
+    with pytest.raises(http_errors.BadRequest):
+        notifications.seen_many(
+            token, "yes", up_to_id=NotificationId(1))  # type: ignore
+
+
+def test_see_many_too_many(basic_server_setup: IBasicServerSetup):
+    """Do we get an error if too many notification IDs are given?"""
+    ids = [NotificationId(i) for i in range(1, MAX_SEEN_MANY + 2)]
+    with pytest.raises(http_errors.BadRequest):
+        notifications.seen_many(
+            basic_server_setup['token'], True, notification_ids=ids)
+    notifications.seen_many(
+        basic_server_setup['token'],
+        True,
+        notification_ids=ids[:MAX_SEEN_MANY],
+    )
@@ -51,6 +51,7 @@ def test_commenter_notified_when_unaccepted(
             'comment': comment,
             'reply': None,
             'queue': None,
+            'count': 1,
         },
     ]
 
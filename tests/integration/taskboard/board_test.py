@@ -0,0 +1,111 @@
+"""
+# Tests / Integration / Taskboard / Board
+
+Tests for taskboard/board
+
+* Gives the same queues as the queue list
+* Gives the same posts as viewing each queue individually
+* Posts have the same info as when listing posts
+* Private posts are only shown to users who can view them, in the same way
+  as when viewing each queue individually
+* No permission
+"""
+import pytest
+from backend.models.permissions import Permission
+from backend.types.auth import JWT
+from backend.types.identifiers import PostId
+from backend.util.http_errors import Forbidden
+from ensemble_request.admin.permissions import set_permissions
+from ensemble_request.taskboard import (
+    board,
+    queue_list,
+    queue_follow,
+    queue_post_add,
+    queue_post_list,
+)
+from ensemble_request.browse import post
+from tests.integration.conftest import (
+    ISimpleUsers,
+    IMakeQueues,
+    IMakePosts,
+    IPermissionGroups,
+)
+
+
+@pytest.mark.core
+def test_matches_queues(
+    simple_users: ISimpleUsers,
+    make_queues: IMakeQueues,
+    make_posts: IMakePosts,
+):
+    """
+    Does the board give the same info as listing the queues and the posts in
+    each of them?
+    """
+    token = simple_users["admin"]["token"]
+    queue_follow(token, make_queues["queue1_id"])
+    queue_post_add(token, make_queues["queue1_id"], make_posts["post2_id"])
+    result = board(token)["queues"]
+    assert [
+        {k: v for k, v in q.items() if k != "posts"} for q in result
+    ] == queue_list(token)["queues"]
+    for q in result:
+        assert [p["post_id"] for p in q["posts"]] \
+            == queue_post_list(token, q["queue_id"])["posts"]
+    posts = {p["post_id"]: p for p in post.list(token)["posts"]}
+    assert [p for q in result for p in q["posts"]] == [
+        posts[make_posts["post1_id"]],
+        posts[make_posts["post2_id"]],
+    ]
+
+
+def test_private_posts(
+    simple_users: ISimpleUsers,
+    permission_groups: IPermissionGroups,
+):
+    """
+    Are private posts only shown to their authors and to users who are
+    allowed to view them?
+    """
+    admin = simple_users["admin"]["token"]
+    user = simple_users["user"]["token"]
+    # Let the user view the taskboard and each queue, without letting them
+    # view private posts
+    set_permissions(
+        admin,
+        simple_users["user"]["user_id"],
+        [
+            {
+                "permission_id": p.value,
+                "value": True if p in [
+                    Permission.ViewTaskboard,
+                    Permission.FollowQueue,
+                ] else None,
+            }
+            for p in Permission
+        ],
+        permission_groups["user"]["group_id"],
+    )
+    hidden = post.create(admin, "heading", "text", [], private=True)[
+        "post_id"]
+    own = post.create(user, "heading", "text", [], private=True)["post_id"]
+    shown = post.create(admin, "heading", "text", [])["post_id"]
+
+    def post_ids(token: JWT) -> list[PostId]:
+        return [
+            p["post_id"] for q in board(token)["queues"] for p in q["posts"]
+        ]
+
+    assert post_ids(user) == [own, shown]
+    assert post_ids(admin) == [hidden, own, shown]
+    for q in board(user)["queues"]:
+        assert [p["post_id"] for p in q["posts"]] \
+            == queue_post_list(user, q["queue_id"])["posts"]
+
+
+def test_no_permission(simple_users: ISimpleUsers):
+    """
+    Users without permission to view the taskboard get a 403 error
+    """
+    with pytest.raises(Forbidden):
+        board(simple_users["user"]["token"])
@@ -6,6 +6,7 @@ Tests for the deleting queues
 * Invalid ID
 * No permission
 * Delete queue success
+* Posts in the deleted queue are moved to the main queue
 """
 import pytest
 from backend.types.identifiers import QueueId
@@ -13,12 +14,17 @@ from backend.util.http_errors import BadRequest, Forbidden
 from ensemble_request.taskboard import (
     queue_list,
     queue_delete,
+    queue_post_add,
+    queue_post_list,
 )
+from tests.integration.helpers import get_queue
 from tests.integration.conftest import (
     IBasicServerSetup,
     ISimpleUsers,
     IMakeQueues,
+    IMakePosts,
 )
+from resources import consts
 
 
 def test_no_permission(
@@ -48,3 +54,22 @@ def test_success(
     # Main queue, Answered queue, Closed queue, Reported Queue
     # Deleted queue, and make_queues[2]
     assert len(queue_list(token)['queues']) == 6
+
+
+def test_posts_moved_to_main_queue(
+    basic_server_setup: IBasicServerSetup,
+    make_queues: IMakeQueues,
+    make_posts: IMakePosts,
+):
+    """Posts in a deleted queue get sent back to the main queue"""
+    token = basic_server_setup['token']
+    queue_id = make_queues['queue1_id']
+    post_ids = [make_posts['post1_id'], make_posts['post2_id']]
+    for post_id in post_ids:
+        queue_post_add(token, queue_id, post_id)
+    queue_delete(token, queue_id)
+    main_queue = get_queue(queue_list(token)['queues'], consts.MAIN_QUEUE)
+    assert main_queue is not None
+    assert sorted(
+        queue_post_list(token, main_queue['queue_id'])['posts']
+    ) == sorted(post_ids)
@@ -8,10 +8,13 @@ refer to tests/integration/notifications/queue_added_test.py
 
 * Users can follow queues
 * Users can unfollow queues
+* Unfollowing a queue doesn't unfollow other queues
+* Following a queue from many requests at once doesn't give errors
 * Bad request for invalid queue ID
 * Forbidden for permission error
 """
 import pytest
+from concurrent.futures import ThreadPoolExecutor
 from ..conftest import IDefaultQueues, IBasicServerSetup, ISimpleUsers
 from backend.util import http_errors
 from backend.types.identifiers import QueueId
@@ -62,6 +65,40 @@ def test_unfollow_queue(
     )['following']
 
 
+def test_unfollow_one_queue(
+    basic_server_setup: IBasicServerSetup,
+    default_queues: IDefaultQueues,
+):
+    """
+    Unfollowing a queue leaves other queues followed
+    """
+    token = basic_server_setup['token']
+    taskboard.queue_follow(token, default_queues['main'])
+    taskboard.queue_follow(token, default_queues['answered'])
+    taskboard.queue_follow(token, default_queues['main'])
+    assert not taskboard.queue_post_list(
+        token, default_queues['main'])['following']
+    assert taskboard.queue_post_list(
+        token, default_queues['answered'])['following']
+
+
+def test_follow_concurrently(
+    basic_server_setup: IBasicServerSetup,
+    default_queues: IDefaultQueues,
+):
+    """
+    Following a queue from many requests at once succeeds for all of them
+    """
+    token = basic_server_setup['token']
+
+    def follow(_: int) -> None:
+        taskboard.queue_follow(token, default_queues['main'])
+
+    with ThreadPoolExecutor(8) as executor:
+        # Raises an exception if any of the requests failed
+        list(executor.map(follow, range(8)))
+
+
 def test_cant_follow_invalid_queue(basic_server_setup: IBasicServerSetup):
     """Error if we try to follow an invalid queue"""
     with pytest.raises(http_errors.BadRequest):
@@ -10,6 +10,8 @@ Tests for editing a user profile
 * Can't edit own profile if no permission (for all profile edit routes)
 * Can set pronouns to None
 * Can't set email to another user's email
+* Can set another user's email to their current email
+* Can't set another user's email to own email
 """
 
 from typing import Any, Callable, cast
@@ -242,3 +244,28 @@ def test_set_duplicate_own_email(basic_server_setup: IBasicServerSetup):
             basic_server_setup['user_id']
         )['email']
     )
+
+
+def test_admin_set_same_email(simple_users: ISimpleUsers):
+    """Can an admin set a user's email to that user's current email?"""
+    profile_edit_email(
+        simple_users['admin']['token'],
+        simple_users['user']['user_id'],
+        profile(
+            simple_users['admin']['token'],
+            simple_users['user']['user_id']
+        )['email']
+    )
+
+
+def test_admin_set_duplicate_own_email(simple_users: ISimpleUsers):
+    """Do we get an error if an admin sets a user's email to their own?"""
+    with pytest.raises(http_errors.BadRequest):
+        profile_edit_email(
+            simple_users['admin']['token'],
+            simple_users['user']['user_id'],
+            profile(
+                simple_users['admin']['token'],
+                simple_users['admin']['user_id']
+            )['email']
+        )